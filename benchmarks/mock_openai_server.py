@@ -0,0 +1,327 @@
+"""
+Mock OpenAI Server
+Local OpenAI-compatible chat completions endpoint for benchmarks and dry runs
+
+Answers POST /v1/chat/completions with a response that matches the
+requested JSON schema (single-row or packed), after a simulated latency.
+A configurable share of requests gets a 429 or a malformed JSON body.
+Rate limit headers are sent with every response, so the client-side
+rate limiter can be exercised as well.
+
+Examples:
+    python benchmarks/mock_openai_server.py --port 8089 --latency lognormal:0.8:0.4
+    OPENAI_API_KEY=mock OPENAI_BASE_URL=http://127.0.0.1:8089/v1 python cli.py input.xlsx
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Characters per token used for the simulated usage
+CHARS_PER_TOKEN = 4
+
+# Packed prompts mark each entry with its row id
+ROW_ID_PATTERN = re.compile(r"row_id=(\d+)")
+
+
+class LatencyDistribution:
+    """
+    Simulated request latency
+
+    Specs: "fixed:SECONDS", "uniform:LOW:HIGH", "lognormal:MEDIAN:SIGMA"
+    or a plain number (fixed).
+    """
+
+    def __init__(self, spec="fixed:0"):
+        """
+        Initialize the distribution
+
+        Args:
+            spec: Distribution spec (see class docstring)
+        """
+        parts = str(spec).split(":")
+        if len(parts) == 1:
+            parts = ["fixed", parts[0]]
+        self.kind = parts[0]
+        try:
+            self.params = [float(value) for value in parts[1:]]
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec}")
+
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2}.get(self.kind)
+        if expected is None or len(self.params) != expected:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        self.spec = spec
+
+    def sample(self):
+        """Return one latency in seconds"""
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return random.uniform(*self.params)
+        median, sigma = self.params
+        if median <= 0:
+            return 0.0
+        return random.lognormvariate(0, sigma) * median
+
+
+def sample_value(schema):
+    """Return a placeholder value of the type a JSON schema property asks for"""
+    types = schema.get("type", "string")
+    if isinstance(types, list):
+        types = next((t for t in types if t != "null"), "null")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if types == "integer":
+        return 6
+    if types == "number":
+        return 1.0
+    if types == "boolean":
+        return False
+    if types == "array":
+        return []
+    if types == "object":
+        return build_object(schema)
+    if types == "null":
+        return None
+    return "mock"
+
+
+def build_object(schema, overrides=None):
+    """Build an object with every property of a JSON schema"""
+    obj = {name: sample_value(prop) for name, prop in schema.get("properties", {}).items()}
+    obj.update(overrides or {})
+    return obj
+
+
+def build_content(request):
+    """
+    Build the message content for a chat completion request
+
+    Packed requests (schema with an "entries" array) get one entry per
+    row_id found in the user prompt.
+    """
+    response_format = request.get("response_format") or {}
+    schema = (response_format.get("json_schema") or {}).get("schema") or {}
+    properties = schema.get("properties", {})
+
+    if "entries" in properties:
+        item_schema = properties["entries"].get("items", {})
+        user_prompt = request["messages"][-1]["content"]
+        entries = [
+            build_object(item_schema, {"row_id": int(row_id)})
+            for row_id in ROW_ID_PATTERN.findall(user_prompt)
+        ]
+        return json.dumps({"entries": entries}, ensure_ascii=False)
+
+    return json.dumps(build_object(schema), ensure_ascii=False)
+
+
+class MockOpenAIServer:
+    """
+    Threaded mock server, usable from the command line or in-process
+
+    Example:
+        server = MockOpenAIServer(latency="uniform:0.05:0.2", rate_limit_rate=0.01)
+        server.start()
+        client = OpenAI(api_key="mock", base_url=server.base_url)
+        ...
+        server.stop()
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency="fixed:0",
+                 rate_limit_rate=0.0, malformed_rate=0.0,
+                 requests_per_minute=10000, tokens_per_minute=10000000):
+        """
+        Initialize the server (not started)
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 = any free port)
+            latency: Latency spec (see LatencyDistribution)
+            rate_limit_rate: Share of requests answered with 429
+            malformed_rate: Share of requests answered with invalid JSON content
+            requests_per_minute: Value of the x-ratelimit-limit-requests header
+            tokens_per_minute: Value of the x-ratelimit-limit-tokens header
+        """
+        self.latency = LatencyDistribution(latency)
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+        self.counts = {"requests": 0, "rate_limited": 0, "malformed": 0}
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self):
+        """Base URL to pass to the OpenAI client"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """Serve in a background thread"""
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever,
+            name="mock-openai",
+            daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve on the calling thread"""
+        self.httpd.serve_forever()
+
+    def stop(self):
+        """Shut the server down"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _rate_limit_headers(self):
+        return {
+            "x-ratelimit-limit-requests": str(self.requests_per_minute),
+            "x-ratelimit-remaining-requests": str(self.requests_per_minute - 1),
+            "x-ratelimit-reset-requests": "60ms",
+            "x-ratelimit-limit-tokens": str(self.tokens_per_minute),
+            "x-ratelimit-remaining-tokens": str(self.tokens_per_minute - 1000),
+            "x-ratelimit-reset-tokens": "60ms"
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in two writes; with Nagle's algorithm the
+            # body waits for the client's delayed ACK (~40 ms per response)
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                # Keep benchmark output readable
+                pass
+
+            def _send_json(self, status, payload, headers=None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+                    return
+
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+
+                server._count("requests")
+                time.sleep(server.latency.sample())
+
+                headers = server._rate_limit_headers()
+                if random.random() < server.rate_limit_rate:
+                    server._count("rate_limited")
+                    headers["retry-after"] = "1"
+                    headers["x-ratelimit-remaining-requests"] = "0"
+                    self._send_json(429, {"error": {
+                        "message": "Rate limit reached (mock)",
+                        "type": "requests",
+                        "code": "rate_limit_exceeded"
+                    }}, headers)
+                    return
+
+                if random.random() < server.malformed_rate:
+                    server._count("malformed")
+                    content = '{"cleaned_court": "mock", "cleaned_date": '
+                else:
+                    content = build_content(request)
+
+                prompt_chars = sum(len(m.get("content") or "") for m in request.get("messages", []))
+                prompt_tokens = prompt_chars // CHARS_PER_TOKEN + 1
+                completion_tokens = len(content) // CHARS_PER_TOKEN + 1
+
+                self._send_json(200, {
+                    "id": f"chatcmpl-mock-{time.monotonic_ns()}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "mock"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                        "prompt_tokens_details": {"cached_tokens": 0}
+                    }
+                }, headers)
+
+        return Handler
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(description="Mock OpenAI chat completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument(
+        "--latency", default="fixed:0.2",
+        help="fixed:SECONDS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA (default: fixed:0.2)"
+    )
+    parser.add_argument(
+        "--rate-limit-rate", type=float, default=0.0,
+        help="Share of requests answered with 429 (default: 0)"
+    )
+    parser.add_argument(
+        "--malformed-rate", type=float, default=0.0,
+        help="Share of responses with invalid JSON content (default: 0)"
+    )
+    return parser
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+    server = MockOpenAIServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate
+    )
+    print(f"Mock OpenAI server on {server.base_url} (latency {args.latency})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Requests: {server.counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Throughput Benchmarks
+End-to-end benchmarks of the processing modes against the mock OpenAI server
+
+Scales the example workbook to synthetic workbooks of the requested sizes,
+then runs every processing mode (sequential, concurrent, packed, stream,
+batch) through LLMProcessor and DataHandler, exactly as cli.py does, and
+reports rows/s, peak traced memory and time spent saving. No API key is
+needed: requests go to benchmarks/mock_openai_server.py, started in-process.
+
+Examples:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --sizes 10000 100000 1000000 --process-rows 5000
+    python benchmarks/run_benchmarks.py --latency lognormal:0.05:0.5 --rate-limit-rate 0.02
+    python benchmarks/run_benchmarks.py --output results.json --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd
+from openpyxl import Workbook
+from openai import OpenAI
+from mock_openai_server import MockOpenAIServer, build_content
+from src.config import STREAM_CHUNK_SIZE
+from src.data_handler import DataHandler
+from src.llm_processor import LLMProcessor
+from src.concurrent_processor import ConcurrentProcessor
+from src.batch_api import BatchRunner, LocalBatchBackend
+from src.rate_limiter import RateLimiter
+from src.metrics import MetricsCollector
+
+DEFAULT_SOURCE = os.path.join(ROOT_DIR, "example_data", "1899_tables_raw_bycolumn_8columns.xlsx")
+
+# Processing modes and their settings
+MODES = {
+    "sequential": {"workers": 1, "pack_size": 1},
+    "concurrent": {"workers": 8, "pack_size": 1},
+    "packed": {"workers": 8, "pack_size": 5},
+    "stream": {"workers": 8, "pack_size": 1, "stream": True},
+    "batch": {"batch": True}
+}
+
+# Relative rows/s drop reported as a regression by --compare
+REGRESSION_THRESHOLD = 0.10
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(description="Benchmark the processing modes end to end.")
+    parser.add_argument(
+        "--source", default=DEFAULT_SOURCE,
+        help="Workbook whose rows are repeated to build the synthetic inputs"
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000],
+        help="Rows in the synthetic workbooks (default: 10000)"
+    )
+    parser.add_argument(
+        "--modes", nargs="+", choices=list(MODES), default=list(MODES),
+        help="Modes to run (default: all)"
+    )
+    parser.add_argument(
+        "--process-rows", type=int, default=2000,
+        help="Rows processed per run, 0 for the whole workbook (default: 2000)"
+    )
+    parser.add_argument(
+        "--latency", default="fixed:0.02",
+        help="Mock server latency spec (default: fixed:0.02)"
+    )
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Share of mock requests answered with 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Share of mock responses with invalid JSON")
+    parser.add_argument(
+        "--work-dir", default=os.path.join(tempfile.gettempdir(), "firm_cleaner_benchmarks"),
+        help="Directory for synthetic workbooks and outputs (workbooks are reused)"
+    )
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="Skip memory tracing (faster on very large workbooks)")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="Flag rows/s regressions against a previous --output file")
+    return parser
+
+
+def make_workbook(source, rows, path):
+    """
+    Write a workbook with the source rows repeated up to the given row count
+
+    Args:
+        source: Source workbook path
+        rows: Number of data rows
+        path: Output path (reused if it already exists)
+
+    Returns:
+        str: Path of the workbook
+    """
+    if os.path.exists(path):
+        return path
+
+    sample = pd.read_excel(source)
+    records = sample.astype(object).where(sample.notna(), None).values.tolist()
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([str(col) for col in sample.columns])
+    for i in range(rows):
+        sheet.append(records[i % len(records)])
+
+    tmp_path = f"{os.path.splitext(path)[0]}.tmp.xlsx"
+    workbook.save(tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+class Timer:
+    """Accumulates the time spent in wrapped methods"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+
+    def wrap(self, func):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - started
+                self.calls += 1
+        return timed
+
+
+def run_mode(mode, workbook, server, process_rows, output_dir, trace_memory):
+    """
+    Run one processing mode on a workbook
+
+    Args:
+        mode: Key of MODES
+        workbook: Input workbook path
+        server: Running MockOpenAIServer
+        process_rows: Rows to process (0 = all)
+        output_dir: Fresh directory for progress files and journals
+        trace_memory: Measure the peak traced memory
+
+    Returns:
+        dict: Measurements of the run
+    """
+    settings = MODES[mode]
+    client = OpenAI(api_key="mock", base_url=server.base_url)
+    llm_processor = LLMProcessor(client=client)
+    llm_processor.metrics = MetricsCollector()
+    if not settings.get("batch"):
+        llm_processor.rate_limiter = RateLimiter(max_concurrency=settings["workers"])
+
+    data_handler = DataHandler()
+    data_handler.output_dir = output_dir
+    save_timer = Timer()
+    commit_timer = Timer()
+    data_handler.auto_save = save_timer.wrap(data_handler.auto_save)
+    data_handler.update_row = commit_timer.wrap(data_handler.update_row)
+
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    load_seconds = 0.0
+    stats = {"processed": 0, "failed": 0}
+
+    try:
+        if settings.get("stream"):
+            engine = ConcurrentProcessor(llm_processor, data_handler,
+                                         settings["workers"], settings["pack_size"])
+            remaining = process_rows or None
+            load_started = time.perf_counter()
+            for chunk in data_handler.iter_excel_chunks(workbook, chunk_size=STREAM_CHUNK_SIZE):
+                load_seconds += time.perf_counter() - load_started
+                rows = data_handler.find_unprocessed_rows()
+                if remaining is not None:
+                    rows = rows[:remaining]
+                    remaining -= len(rows)
+                chunk_stats = engine.run(rows)
+                stats["processed"] += chunk_stats["processed"]
+                stats["failed"] += chunk_stats["failed"]
+                if remaining == 0:
+                    break
+                load_started = time.perf_counter()
+        else:
+            load_started = time.perf_counter()
+            data_handler.load_excel(workbook)
+            load_seconds = time.perf_counter() - load_started
+
+            rows = data_handler.find_unprocessed_rows()
+            if process_rows:
+                rows = rows[:process_rows]
+
+            if settings.get("batch"):
+                backend = LocalBatchBackend(lambda body: build_content(body))
+                runner = BatchRunner(llm_processor, data_handler, backend=backend,
+                                     work_dir=os.path.join(output_dir, "batches"))
+                stats = runner.run(rows, poll_interval=0)
+            else:
+                engine = ConcurrentProcessor(llm_processor, data_handler,
+                                             settings["workers"], settings["pack_size"])
+                stats = engine.run(rows)
+    finally:
+        data_handler.close()
+        elapsed = time.perf_counter() - started
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    rows_done = stats["processed"] + stats["failed"]
+    process_seconds = max(elapsed - load_seconds, 1e-9)
+    snapshot = llm_processor.metrics.snapshot()
+    return {
+        "mode": mode,
+        "rows": rows_done,
+        "failed": stats["failed"],
+        "seconds": round(elapsed, 3),
+        "load_seconds": round(load_seconds, 3),
+        "rows_per_second": round(rows_done / process_seconds, 2),
+        "save_seconds": round(save_timer.seconds, 3),
+        "save_share": round(save_timer.seconds / process_seconds, 4),
+        "journal_seconds": round(commit_timer.seconds, 3),
+        "peak_memory_mb": round(peak / 2 ** 20, 1) if peak is not None else None,
+        "requests": snapshot["requests"],
+        "latency_p95": snapshot["latency_p95"]
+    }
+
+
+def print_results(results):
+    """Print the results as a table"""
+    header = (f"{'size':>8} {'mode':<11} {'rows':>6} {'rows/s':>9} {'load s':>7} "
+              f"{'save s':>7} {'save %':>7} {'journal s':>9} {'peak MB':>8} {'requests':>8}")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        peak = "-" if result["peak_memory_mb"] is None else f"{result['peak_memory_mb']:.1f}"
+        print(
+            f"{result['size']:>8} {result['mode']:<11} {result['rows']:>6} "
+            f"{result['rows_per_second']:>9.1f} {result['load_seconds']:>7.2f} "
+            f"{result['save_seconds']:>7.2f} {result['save_share']:>7.1%} "
+            f"{result['journal_seconds']:>9.2f} {peak:>8} {result['requests']:>8}"
+        )
+
+
+def compare_results(results, baseline_path):
+    """
+    Report runs whose rows/s dropped by more than REGRESSION_THRESHOLD
+
+    Returns:
+        int: Number of regressions
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["size"], r["mode"]): r for r in json.load(f)}
+
+    regressions = 0
+    for result in results:
+        previous = baseline.get((result["size"], result["mode"]))
+        if previous is None or not previous["rows_per_second"]:
+            continue
+        change = result["rows_per_second"] / previous["rows_per_second"] - 1
+        if change < -REGRESSION_THRESHOLD:
+            regressions += 1
+            print(
+                f"REGRESSION {result['mode']} @ {result['size']} rows: "
+                f"{previous['rows_per_second']:.1f} -> {result['rows_per_second']:.1f} rows/s "
+                f"({change:+.1%})"
+            )
+    return regressions
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+    source = os.path.abspath(args.source)
+    work_dir = os.path.abspath(args.work_dir)
+    output_path = os.path.abspath(args.output) if args.output else None
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+    os.makedirs(work_dir, exist_ok=True)
+
+    # DataHandler creates ./output on construction; keep it out of the repo
+    os.chdir(work_dir)
+
+    server = MockOpenAIServer(
+        latency=args.latency,
+        rate_limit_rate=args.rate_limit_rate,
+        malformed_rate=args.malformed_rate
+    ).start()
+    print(f"Mock server on {server.base_url} (latency {args.latency})", flush=True)
+
+    results = []
+    try:
+        for size in args.sizes:
+            workbook = os.path.join(work_dir, f"synthetic_{size}.xlsx")
+            print(f"Preparing {workbook}...", flush=True)
+            make_workbook(source, size, workbook)
+
+            for mode in args.modes:
+                print(f"Running {mode} on {size} rows...", flush=True)
+                output_dir = tempfile.mkdtemp(prefix=f"{mode}_{size}_", dir=work_dir)
+                result = run_mode(mode, workbook, server, args.process_rows,
+                                  output_dir, not args.no_tracemalloc)
+                result["size"] = size
+                results.append(result)
+    finally:
+        server.stop()
+
+    print()
+    print_results(results)
+    print(f"\nMock server: {server.counts}")
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if compare_path and compare_results(results, compare_path):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Startup Benchmarks
+Cold-start timings of the GUI, measured in fresh interpreters
+
+Each repetition starts a new Python process and records:
+- gui_import: importing main.py (what runs before the window can be built)
+- window: until the window is built and painted once (needs a display)
+- backend: until main.BACKEND_MODULES (pandas, openpyxl, OpenAI SDK) are
+  imported, which the GUI does on a background thread
+All times are from the start of the import of main.py. The slowest modules
+of a `python -X importtime` run are listed as well. The child processes run
+in a temporary directory with a placeholder API key, so the output/ and
+cache files they create are thrown away and no request is made.
+
+Examples:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --repeat 10 --output startup.json
+    python benchmarks/startup_benchmark.py --compare startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the measured interpreter; prints the timings as JSON
+CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import main
+timings = {"gui_import": time.perf_counter() - start, "window": None}
+try:
+    root = main.tk.Tk()
+except main.tk.TclError:
+    root = None
+if root is None:
+    main.import_backend()
+else:
+    app = main.FirmRegistryCleanerGUI(root)
+    root.update()
+    timings["window"] = time.perf_counter() - start
+    app.backend_ready.wait()
+timings["backend"] = time.perf_counter() - start
+print(json.dumps(timings))
+if root is not None:
+    app.ui_updates.stop()
+    root.destroy()
+"""
+
+# Phases reported, in order
+PHASES = ["gui_import", "window", "backend"]
+
+# Relative slowdown of a phase's median reported as a regression by --compare
+REGRESSION_THRESHOLD = 0.20
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(description="Measure GUI cold-start time.")
+    parser.add_argument(
+        "--repeat", type=int, default=5,
+        help="Fresh interpreters started per measurement (default: 5)"
+    )
+    parser.add_argument(
+        "--top", type=int, default=10,
+        help="Slowest modules listed from -X importtime (default: 10, 0 to skip)"
+    )
+    parser.add_argument("--output", help="Write the medians as JSON")
+    parser.add_argument("--compare", help="Flag slowdowns against a previous --output file")
+    return parser
+
+
+def run_child(work_dir):
+    """Run CHILD_SCRIPT in a fresh interpreter and return its timings"""
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "benchmark"))
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, ROOT_DIR],
+        cwd=work_dir, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top):
+    """
+    Return the top-level imports of main and its backend that take longest
+
+    Returns:
+        list: (module, cumulative seconds) pairs, slowest first
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main; main.import_backend()"],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented below the module that triggered them
+        if not cumulative.strip().isdigit() or name[1:].startswith(" "):
+            continue
+        modules.append((name.strip(), int(cumulative) / 1e6))
+    modules.sort(key=lambda item: item[1], reverse=True)
+    return modules[:top]
+
+
+def compare_results(medians, baseline_path):
+    """
+    Report phases whose median grew by more than REGRESSION_THRESHOLD
+
+    Returns:
+        int: Number of regressions
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = 0
+    for phase in PHASES:
+        previous, current = baseline.get(phase), medians.get(phase)
+        if not previous or current is None:
+            continue
+        change = current / previous - 1
+        if change > REGRESSION_THRESHOLD:
+            regressions += 1
+            print(f"REGRESSION {phase}: {previous:.3f}s -> {current:.3f}s ({change:+.1%})")
+    return regressions
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="startup_") as work_dir:
+        for number in range(args.repeat):
+            runs.append(run_child(work_dir))
+            print(f"Run {number + 1}/{args.repeat}: " + ", ".join(
+                f"{phase} {'-' if runs[-1][phase] is None else f'{runs[-1][phase]:.3f}s'}"
+                for phase in PHASES
+            ), flush=True)
+
+    medians = {}
+    for phase in PHASES:
+        values = [run[phase] for run in runs if run[phase] is not None]
+        medians[phase] = statistics.median(values) if values else None
+
+    print()
+    print(f"{'phase':<11} {'median s':>9} {'min s':>7} {'max s':>7}")
+    for phase in PHASES:
+        values = [run[phase] for run in runs if run[phase] is not None]
+        if not values:
+            print(f"{phase:<11} {'-':>9}  (no display)")
+            continue
+        print(f"{phase:<11} {medians[phase]:>9.3f} {min(values):>7.3f} {max(values):>7.3f}")
+
+    if args.top:
+        print("\nSlowest imports (cumulative):")
+        for name, seconds in slowest_imports(args.top):
+            print(f"{seconds:>8.3f}s  {name}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(medians, f, indent=2)
+
+    if args.compare and compare_results(medians, args.compare):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
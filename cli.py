@@ -0,0 +1,745 @@
+"""
+Hungarian Firm Registry LLM Data Cleaner
+Headless Command-Line Runner
+
+Processes a workbook (or a range of its rows) without the GUI, so cleaning
+can run on servers and from cron. Resumes from the first unprocessed row.
+Does not import tkinter.
+
+Examples:
+    python cli.py example_data/1899_tables_raw_bycolumn_8columns.xlsx
+    python cli.py input.xlsx --model gpt-4o --workers 8 --format json
+    python cli.py input.xlsx --start 1000 --end 2000 --pack-size auto
+    python cli.py input.xlsx --batch-api
+    python cli.py huge_export.xlsx --stream --chunk-size 2000 --format parquet
+    python cli.py input.xlsx --cascade
+    python cli.py input.xlsx --only-stale   # after editing the prompts
+    python cli.py gazettes_1890s/ --corpus --workers 16
+    python cli.py input.xlsx --worker --queue /shared/input_queue.sqlite3   # on each host
+    python cli.py input.xlsx --merge --queue /shared/input_queue.sqlite3
+"""
+
+import argparse
+import os
+import signal
+import sys
+import time
+from src.config import (
+    AVAILABLE_MODELS,
+    DEFAULT_MODEL,
+    DEFAULT_MAX_WORKERS,
+    MAX_WORKERS_LIMIT,
+    DEFAULT_PACK_SIZE,
+    MAX_PACK_SIZE,
+    BATCH_POLL_INTERVAL,
+    CACHE_PATH,
+    STREAM_CHUNK_SIZE,
+    RATE_LIMIT_REQUESTS_PER_MINUTE,
+    RATE_LIMIT_TOKENS_PER_MINUTE,
+    CASCADE_MODELS,
+    EXPORT_FORMATS,
+    PARTITION_COLUMNS,
+    RULES_MODEL_NAME,
+    GAZETTEER_ENABLED,
+    GAZETTEER_PATH
+)
+
+# Seconds between progress lines
+PROGRESS_INTERVAL = 5.0
+
+
+def parse_pack_size(value):
+    """Parse --pack-size: an integer or 'auto'"""
+    if value == "auto":
+        return value
+    try:
+        size = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("must be an integer or 'auto'")
+    if not 1 <= size <= MAX_PACK_SIZE:
+        raise argparse.ArgumentTypeError(f"must be between 1 and {MAX_PACK_SIZE}")
+    return size
+
+
+def build_parser():
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(
+        description="Clean a Hungarian firm registry workbook with an OpenAI model (no GUI)."
+    )
+    parser.add_argument("input", help="Input Excel file (.xlsx/.xls), or a directory with --corpus")
+    parser.add_argument(
+        "--model", choices=AVAILABLE_MODELS, default=DEFAULT_MODEL,
+        help=f"OpenAI model (default: {DEFAULT_MODEL})"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_MAX_WORKERS,
+        help=f"Concurrent requests, 1-{MAX_WORKERS_LIMIT} (default: {DEFAULT_MAX_WORKERS})"
+    )
+    parser.add_argument(
+        "--pack-size", type=parse_pack_size, default=DEFAULT_PACK_SIZE,
+        help="Rows per request, or 'auto' to tune it from measured tokens "
+             f"(default: {DEFAULT_PACK_SIZE})"
+    )
+    parser.add_argument(
+        "--start", type=int, default=None,
+        help="First row to process (default: first unprocessed row)"
+    )
+    parser.add_argument(
+        "--end", type=int, default=None,
+        help="Stop before this row (default: last row)"
+    )
+    parser.add_argument(
+        "--reprocess", action="store_true",
+        help="Also process rows in the range that already have results"
+    )
+    parser.add_argument(
+        "--only-stale", action="store_true",
+        help="Process pending rows and rows cleaned with other prompts, schemas or model, "
+             "or whose input cells changed since (with --worker, use a new --queue)"
+    )
+    parser.add_argument(
+        "--retry-failed", action="store_true",
+        help="Also process rows whose last attempt returned an error"
+    )
+    parser.add_argument(
+        "--format", choices=["xlsx", "json", "ndjson", "parquet", "arrow"],
+        action="append", dest="formats",
+        help="Extra timestamped export when done; repeatable "
+             "(the progress file output/<name>_cleaned.xlsx is always written; "
+             "parquet and arrow need pyarrow)"
+    )
+    parser.add_argument(
+        "--partition-by", choices=sorted(PARTITION_COLUMNS), default=None,
+        help="Write the parquet export as a directory partitioned by year or court"
+    )
+    parser.add_argument(
+        "--cascade", action="store_true",
+        help=f"Send every row to {CASCADE_MODELS[0]} first and re-send rows failing the "
+             f"local checks to {', '.join(CASCADE_MODELS[1:])} (overrides --model)"
+    )
+    parser.add_argument(
+        "--batch-api", action="store_true",
+        help="Submit the rows through the OpenAI Batch API and wait for the results"
+    )
+    parser.add_argument(
+        "--poll-interval", type=float, default=BATCH_POLL_INTERVAL,
+        help=f"Seconds between Batch API status checks (default: {BATCH_POLL_INTERVAL})"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Do not use the local LLM response cache"
+    )
+    parser.add_argument(
+        "--no-gazetteer", action="store_true",
+        help="Do not snap courts, locations and names to the spellings of earlier "
+             f"results ({GAZETTEER_PATH})"
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Read and process the workbook chunk by chunk with bounded memory "
+             "(for very large files; not combinable with --batch-api)"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=STREAM_CHUNK_SIZE,
+        help=f"Rows per chunk in --stream mode (default: {STREAM_CHUNK_SIZE})"
+    )
+    parser.add_argument(
+        "--corpus", action="store_true",
+        help="Process every workbook in the input directory as one job, sharing the "
+             "request window and rate limits (not combinable with --stream or --batch-api)"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=None,
+        help="Processes loading and saving workbooks in --corpus mode (default: all cores)"
+    )
+    parser.add_argument(
+        "--worker", action="store_true",
+        help="Lease rows from the shared work queue (--queue) and store the results "
+             "there; run one per process or host"
+    )
+    parser.add_argument(
+        "--merge", action="store_true",
+        help="Write the work queue's results into the progress file"
+    )
+    parser.add_argument(
+        "--queue", default=None,
+        help="SQLite work queue on a filesystem all workers share "
+             "(default: output/<name>_queue.sqlite3)"
+    )
+    parser.add_argument(
+        "--metrics-file", default=None,
+        help="Write latency/token/cost metrics to this file during and after the run "
+             "(.csv for CSV, otherwise Prometheus text format)"
+    )
+    parser.add_argument(
+        "--rpm", type=int, default=RATE_LIMIT_REQUESTS_PER_MINUTE,
+        help="Initial requests-per-minute limit, corrected from the API's rate limit "
+             f"headers (default: {RATE_LIMIT_REQUESTS_PER_MINUTE})"
+    )
+    parser.add_argument(
+        "--tpm", type=int, default=RATE_LIMIT_TOKENS_PER_MINUTE,
+        help="Initial tokens-per-minute limit, corrected from the API's rate limit "
+             f"headers (default: {RATE_LIMIT_TOKENS_PER_MINUTE})"
+    )
+    return parser
+
+
+def current_prompt_fingerprints(args):
+    """Return the prompt fingerprints of the models this run may answer rows with"""
+    from src.fingerprint import prompt_fingerprint
+
+    models = CASCADE_MODELS if args.cascade else [args.model]
+    return {prompt_fingerprint(model) for model in [*models, RULES_MODEL_NAME]}
+
+
+def select_rows(data_handler, args):
+    """
+    Select the rows to process
+
+    Without --reprocess only pending rows (and failed ones with
+    --retry-failed) between --start and --end are returned, so a run
+    resumes where the previous one stopped. --only-stale adds the rows
+    whose prompt or input fingerprint is out of date.
+
+    Args:
+        data_handler: DataHandler with the loaded workbook (or current chunk)
+        args: Parsed command-line arguments
+
+    Returns:
+        list: Row indices
+    """
+    if args.reprocess:
+        return [
+            idx for idx in data_handler.get_dataframe().index
+            if (args.start is None or idx >= args.start)
+            and (args.end is None or idx < args.end)
+        ]
+
+    if args.only_stale:
+        return data_handler.find_stale_rows(
+            current_prompt_fingerprints(args),
+            start=args.start,
+            end=args.end,
+            include_failed=args.retry_failed
+        )
+
+    return data_handler.find_unprocessed_rows(
+        start=args.start,
+        end=args.end,
+        include_failed=args.retry_failed
+    )
+
+
+class ProgressPrinter:
+    """
+    Prints a progress line every PROGRESS_INTERVAL seconds
+
+    With a metrics collector the line ends with its summary, and the
+    metrics file (if any) is rewritten at the same interval.
+    """
+
+    def __init__(self, total=None, metrics=None, metrics_file=None):
+        self.total = total
+        self.metrics = metrics
+        self.metrics_file = metrics_file
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._last_print = 0.0
+
+    def __call__(self, row_index, cleaned_data):
+        self.done += 1
+        if "error" in cleaned_data:
+            self.failed += 1
+            print(f"  row {row_index}: {cleaned_data['error']}", file=sys.stderr)
+
+        now = time.monotonic()
+        if now - self._last_print >= PROGRESS_INTERVAL or self.done == self.total:
+            self._last_print = now
+            self.print_line()
+
+    def print_line(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        if self.total is None:
+            # Streaming mode: the total is not known until the end
+            line = f"{self.done} rows ({self.failed} failed) | {rate:.2f} rows/s"
+        else:
+            remaining = (self.total - self.done) / rate if rate > 0 else 0.0
+            line = (
+                f"{self.done}/{self.total} rows ({self.failed} failed) | "
+                f"{rate:.2f} rows/s | ~{remaining / 60:.1f} min left"
+            )
+
+        if self.metrics is not None:
+            line += f" | {self.metrics.status_text(row_rate=False)}"
+            if self.metrics_file:
+                self.metrics.export(self.metrics_file)
+        print(line, flush=True)
+
+
+def build_engine(args, llm_processor, data_handler):
+    """Create the concurrent engine for the --workers/--pack-size options"""
+    from src.concurrent_processor import ConcurrentProcessor
+    from src.pack_tuner import PackSizeTuner
+
+    pack_size = DEFAULT_PACK_SIZE
+    if args.pack_size == "auto":
+        llm_processor.pack_tuner = PackSizeTuner()
+    else:
+        pack_size = args.pack_size
+
+    return ConcurrentProcessor(
+        llm_processor,
+        data_handler,
+        max_workers=args.workers,
+        pack_size=pack_size
+    )
+
+
+def install_interrupt_handler(engine):
+    """Make Ctrl+C stop the engine after in-flight rows; a second Ctrl+C aborts"""
+    def handle_interrupt(signum, frame):
+        if engine.stop_requested:
+            raise KeyboardInterrupt
+        print("Stopping: finishing in-flight rows (Ctrl+C again to abort)...", flush=True)
+        engine.stop()
+
+    return signal.signal(signal.SIGINT, handle_interrupt)
+
+
+def print_pack_summary(llm_processor):
+    """Print the pack size measurements of an auto-tuned run"""
+    if llm_processor.pack_tuner is None:
+        return
+    for entry in llm_processor.pack_tuner.summary():
+        print(
+            f"  pack size {entry['pack_size']}: {entry['rows']} rows, "
+            f"{entry['tokens_per_row']} tokens/row, {entry['error_rate']:.1%} fallback"
+        )
+
+
+def print_cascade_summary(llm_processor):
+    """Print the rows answered per model of a --cascade run"""
+    if not llm_processor.cascade_models:
+        return
+    stats = llm_processor.cascade_stats
+    answered = ", ".join(f"{model}: {count}" for model, count in stats["models"].items())
+    print(f"  cascade: {answered or 'no rows'}; {stats['escalated']} escalations")
+
+
+def print_reask_summary(llm_processor):
+    """Print the partial re-asks of rows that failed field validation"""
+    stats = llm_processor.reask_stats
+    if stats["rows"]:
+        print(f"  partial re-asks: {stats['rows']} rows, {stats['repaired']} fully repaired")
+
+
+def export_metrics(args, llm_processor):
+    """Write the final metrics file (--metrics-file)"""
+    if args.metrics_file and llm_processor.metrics is not None:
+        print(f"Metrics: {llm_processor.metrics.export(args.metrics_file)}")
+
+
+def seed_gazetteer(llm_processor, data_handler):
+    """Add the earlier results of a loaded workbook to the gazetteer (once per workbook)"""
+    from src.work_queue import workbook_key
+
+    if llm_processor.gazetteer is None:
+        return
+    results, input_fields = data_handler.accepted_results()
+    llm_processor.gazetteer.learn_workbook(
+        workbook_key(data_handler.file_path), results, input_fields
+    )
+
+
+def save_gazetteer(llm_processor):
+    """Write the gazetteer with the names learned in this run"""
+    gazetteer = llm_processor.gazetteer
+    if gazetteer is None:
+        return
+    gazetteer.save(GAZETTEER_PATH)
+    print(f"  gazetteer: {len(gazetteer)} names, {gazetteer.stats['snapped']} snapped this run")
+
+
+def run_concurrent(args, llm_processor, data_handler, rows):
+    """Process rows with the concurrent engine; Ctrl+C stops after in-flight rows"""
+    engine = build_engine(args, llm_processor, data_handler)
+
+    previous_handler = install_interrupt_handler(engine)
+    try:
+        progress = ProgressPrinter(len(rows), llm_processor.metrics, args.metrics_file)
+        stats = engine.run(rows, on_row_done=progress)
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+
+    print_pack_summary(llm_processor)
+    print_cascade_summary(llm_processor)
+    print_reask_summary(llm_processor)
+    save_gazetteer(llm_processor)
+    export_metrics(args, llm_processor)
+    return stats
+
+
+def run_streaming(args, llm_processor, data_handler):
+    """
+    Process the workbook chunk by chunk
+
+    The next chunks are parsed in the background while the current one is
+    being processed; only a few chunks are in memory at any time.
+    """
+    engine = build_engine(args, llm_processor, data_handler)
+    stats = {"processed": 0, "failed": 0, "stopped": False}
+    progress = ProgressPrinter(metrics=llm_processor.metrics, metrics_file=args.metrics_file)
+
+    previous_handler = install_interrupt_handler(engine)
+    try:
+        for chunk in data_handler.iter_excel_chunks(args.input, chunk_size=args.chunk_size):
+            if engine.stop_requested:
+                stats["stopped"] = True
+                break
+
+            rows = select_rows(data_handler, args)
+            chunk_stats = engine.run(rows, on_row_done=progress)
+            stats["processed"] += chunk_stats["processed"]
+            stats["failed"] += chunk_stats["failed"]
+            if chunk_stats["stopped"]:
+                stats["stopped"] = True
+                break
+
+            if args.end is not None and chunk.index[-1] >= args.end - 1:
+                break
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+
+    progress.print_line()
+    print_pack_summary(llm_processor)
+    print_cascade_summary(llm_processor)
+    print_reask_summary(llm_processor)
+    save_gazetteer(llm_processor)
+    export_metrics(args, llm_processor)
+    return stats
+
+
+def run_corpus(args, llm_processor, paths):
+    """
+    Process every workbook of a directory with one shared engine
+
+    Workbooks are loaded, pre-cleaned and saved in a process pool; each
+    keeps its own progress file and journal in output/.
+    """
+    from src.corpus import CorpusProcessor
+
+    if not paths:
+        print(f"No workbooks found in {args.input}")
+        return {"processed": 0, "failed": 0, "files": 0}
+    print(f"{len(paths)} workbooks in {args.input}", flush=True)
+
+    # Pack size and tuner are set up as for a single workbook
+    engine = build_engine(args, llm_processor, None)
+    corpus = CorpusProcessor(
+        llm_processor,
+        max_workers=engine.max_workers,
+        pack_size=engine.pack_size,
+        processes=args.processes
+    )
+
+    def on_file_loaded(data_handler, row_count):
+        seed_gazetteer(llm_processor, data_handler)
+        counts = data_handler.get_status_counts()
+        print(
+            f"Loaded {data_handler.file_path}: {data_handler.get_row_count()} rows "
+            f"({counts['done']} done), {row_count} to process",
+            flush=True
+        )
+
+    def on_file_saved(data_handler):
+        print(f"Progress file: {data_handler.auto_save_path}", flush=True)
+
+    previous_handler = install_interrupt_handler(corpus)
+    try:
+        progress = ProgressPrinter(metrics=llm_processor.metrics, metrics_file=args.metrics_file)
+        stats = corpus.run(
+            paths,
+            lambda data_handler: select_rows(data_handler, args),
+            on_row_done=progress,
+            on_file_loaded=on_file_loaded,
+            on_file_saved=on_file_saved
+        )
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+
+    progress.print_line()
+    print_pack_summary(llm_processor)
+    print_cascade_summary(llm_processor)
+    print_reask_summary(llm_processor)
+    save_gazetteer(llm_processor)
+    export_metrics(args, llm_processor)
+    if stats["file_errors"]:
+        print(f"{stats['file_errors']} workbooks failed to load or save", file=sys.stderr)
+    return stats
+
+
+def queue_path(args):
+    """Return the work queue path for --worker/--merge"""
+    from src.work_queue import workbook_key
+
+    return args.queue or os.path.join("output", f"{workbook_key(args.input)}_queue.sqlite3")
+
+
+def run_worker(args, llm_processor, data_handler):
+    """
+    Process rows leased from the shared work queue
+
+    The workbook is only read; results go to the queue, so workers on
+    several processes or hosts never write the same files.
+    """
+    from src.work_queue import WorkQueue, QueueWorker, workbook_key
+
+    queue = WorkQueue(queue_path(args))
+    try:
+        key = workbook_key(args.input)
+        added = queue.enqueue(key, select_rows(data_handler, args), retry_failed=args.retry_failed)
+        counts = queue.counts(key)
+        print(
+            f"Queue {queue.path}: {added} rows added, {counts['pending']} pending, "
+            f"{counts['leased']} leased, {counts['done']} done, {counts['failed']} failed",
+            flush=True
+        )
+
+        engine = build_engine(args, llm_processor, data_handler)
+        worker = QueueWorker(
+            llm_processor,
+            data_handler,
+            queue,
+            max_workers=engine.max_workers,
+            pack_size=engine.pack_size
+        )
+        print(f"Worker {worker.worker_id}", flush=True)
+
+        previous_handler = install_interrupt_handler(worker)
+        try:
+            progress = ProgressPrinter(metrics=llm_processor.metrics, metrics_file=args.metrics_file)
+            stats = worker.run(on_row_done=progress)
+        finally:
+            signal.signal(signal.SIGINT, previous_handler)
+
+        progress.print_line()
+        if stats["heartbeat_errors"]:
+            print(
+                f"{stats['heartbeat_errors']} lease renewals failed, last: "
+                f"{worker.last_heartbeat_error}; other workers may have taken over rows",
+                file=sys.stderr
+            )
+        print_pack_summary(llm_processor)
+        print_cascade_summary(llm_processor)
+        print_reask_summary(llm_processor)
+        export_metrics(args, llm_processor)
+        print(f"Run with --merge to write the results into {data_handler.auto_save_path}")
+        return stats
+    finally:
+        queue.close()
+
+
+def run_merge(args, data_handler):
+    """Write the work queue's results into the loaded workbook"""
+    from src.work_queue import WorkQueue, merge_results, workbook_key
+
+    queue = WorkQueue(queue_path(args))
+    try:
+        merged = merge_results(queue, data_handler)
+        counts = queue.counts(workbook_key(args.input))
+    finally:
+        queue.close()
+    print(
+        f"Merged {merged} rows; queue: {counts['pending']} pending, {counts['leased']} leased, "
+        f"{counts['done']} done, {counts['failed']} failed",
+        flush=True
+    )
+    return {"processed": merged, "failed": 0}
+
+
+def run_batch(args, llm_processor, data_handler, rows):
+    """Process rows through the Batch API"""
+    from src.batch_api import BatchRunner
+
+    runner = BatchRunner(llm_processor, data_handler)
+
+    def on_status(statuses):
+        summary = ", ".join(f"{batch_id}: {status}" for batch_id, status in statuses.items())
+        print(f"Batch status: {summary}", flush=True)
+
+    stats = runner.run(rows, poll_interval=args.poll_interval, on_status=on_status)
+    save_gazetteer(llm_processor)
+    return stats
+
+
+def create_llm_processor(args):
+    """Create the LLM processor (response cache, rate limiter, metrics) for the command-line options"""
+    from src.llm_processor import LLMProcessor
+    from src.rate_limiter import RateLimiter
+    from src.metrics import MetricsCollector
+
+    cache = None
+    if not args.no_cache:
+        from src.response_cache import ResponseCache
+        cache = ResponseCache(CACHE_PATH)
+    llm_processor = LLMProcessor(model=args.model, cache=cache)
+    llm_processor.metrics = MetricsCollector()
+    if GAZETTEER_ENABLED and not args.no_gazetteer:
+        from src.gazetteer import Gazetteer
+        llm_processor.gazetteer = Gazetteer.load(GAZETTEER_PATH)
+    if args.cascade:
+        llm_processor.cascade_models = CASCADE_MODELS
+    if not args.batch_api:
+        # The Batch API has its own quota; interactive calls are paced client-side
+        llm_processor.rate_limiter = RateLimiter(
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+            max_concurrency=args.workers
+        )
+    return llm_processor
+
+
+def print_done(stats):
+    """Print the final counts"""
+    print(
+        f"Done: {stats['processed']} processed, {stats['failed']} failed"
+        + (" (stopped)" if stats.get("stopped") else ""),
+        flush=True
+    )
+
+
+def write_exports(args, data_handler):
+    """
+    Write the extra exports requested with --format
+
+    In --stream mode only the chunked formats (ndjson, parquet, arrow) are
+    available; they stream the progress file again instead of loading it.
+    """
+    for output_format in args.formats or []:
+        if data_handler.streaming and output_format not in EXPORT_FORMATS:
+            print(f"{output_format} export is not available in --stream mode; "
+                  "use the progress file or --format ndjson/parquet/arrow.")
+            continue
+        try:
+            if output_format == "xlsx":
+                path = data_handler.save_excel()
+            elif output_format == "json":
+                path = data_handler.save_json()
+            elif output_format == "ndjson":
+                path = data_handler.save_ndjson()
+            elif output_format == "parquet":
+                path = data_handler.save_parquet(partition_by=args.partition_by)
+            else:
+                path = data_handler.save_arrow()
+        except ImportError as e:
+            print(f"Skipped {output_format} export: {e}")
+            continue
+        except Exception as e:
+            # The run itself is finished and saved; report and try the other formats
+            print(f"{output_format} export failed: {e}", file=sys.stderr)
+            continue
+        print(f"Saved: {path}")
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.stream and args.batch_api:
+        parser.error("--stream cannot be combined with --batch-api")
+    if args.cascade and args.batch_api:
+        parser.error("--cascade cannot be combined with --batch-api")
+    if args.corpus and (args.stream or args.batch_api):
+        parser.error("--corpus cannot be combined with --stream or --batch-api")
+    if args.partition_by and "parquet" not in (args.formats or []):
+        parser.error("--partition-by needs --format parquet")
+    if args.only_stale and args.reprocess:
+        parser.error("--only-stale and --reprocess are alternatives")
+    if args.worker and args.merge:
+        parser.error("--worker and --merge are separate steps")
+    if (args.worker or args.merge) and (args.corpus or args.stream or args.batch_api):
+        parser.error("--worker/--merge cannot be combined with --corpus, --stream or --batch-api")
+
+    if args.corpus:
+        from src.corpus import find_workbooks
+        try:
+            paths = find_workbooks(args.input)
+        except ValueError as e:
+            parser.error(str(e))
+        stats = run_corpus(args, create_llm_processor(args), paths)
+        print_done(stats)
+        if args.formats:
+            print("Extra exports are not available in --corpus mode; use the progress files.")
+        return 1 if stats["failed"] or stats.get("file_errors") else 0
+
+    from src.data_handler import DataHandler
+
+    data_handler = DataHandler()
+    stats = {"processed": 0, "failed": 0}
+
+    if args.stream:
+        print(f"Streaming {args.input} in chunks of {args.chunk_size} rows...", flush=True)
+        try:
+            stats = run_streaming(args, create_llm_processor(args), data_handler)
+            print_done(stats)
+        finally:
+            print("Writing progress file...", flush=True)
+            data_handler.close()
+        print(f"Progress file: {data_handler.auto_save_path}")
+        write_exports(args, data_handler)
+        return 1 if stats["failed"] else 0
+
+    if args.worker:
+        # Workers only read the workbook; --merge writes the progress file
+        print(f"Loading {args.input}...", flush=True)
+        data_handler.load_excel(args.input, read_only=True)
+        llm_processor = create_llm_processor(args)
+        # Workers share the gazetteer file read-only; it is updated by single-host runs
+        seed_gazetteer(llm_processor, data_handler)
+        stats = run_worker(args, llm_processor, data_handler)
+        print_done(stats)
+        return 1 if stats["failed"] else 0
+
+    print(f"Loading {args.input}...", flush=True)
+    data_handler.load_excel(args.input)
+
+    if args.merge:
+        try:
+            run_merge(args, data_handler)
+        finally:
+            data_handler.close()
+        print(f"Progress file: {data_handler.auto_save_path}")
+        return 0
+    total_rows = data_handler.get_row_count()
+
+    counts = data_handler.get_status_counts()
+    rows = select_rows(data_handler, args)
+    print(
+        f"{total_rows} rows loaded ({counts['done']} done, {counts['failed']} failed, "
+        f"{counts['pending']} pending, {counts['skipped']} empty), {len(rows)} to process",
+        flush=True
+    )
+
+    try:
+        if rows:
+            llm_processor = create_llm_processor(args)
+            seed_gazetteer(llm_processor, data_handler)
+            if args.batch_api:
+                stats = run_batch(args, llm_processor, data_handler, rows)
+            else:
+                stats = run_concurrent(args, llm_processor, data_handler, rows)
+            print_done(stats)
+    finally:
+        # Export everything processed to the progress file
+        data_handler.close()
+
+    print(f"Progress file: {data_handler.auto_save_path}")
+    write_exports(args, data_handler)
+
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
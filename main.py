@@ -8,12 +8,59 @@ firm registry data using OpenAI's language models.
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
+import importlib
 import json
-import threading
 import os
-from src.data_handler import DataHandler
-from src.llm_processor import LLMProcessor
-from src.config import AVAILABLE_MODELS, DEFAULT_MODEL, EVENT_TYPES
+import threading
+from src.virtual_table import VirtualTable
+from src.gui_updates import UpdateQueue
+from src.config import (
+    AVAILABLE_MODELS,
+    DEFAULT_MODEL,
+    EVENT_TYPES,
+    DEFAULT_MAX_WORKERS,
+    MAX_WORKERS_LIMIT,
+    DEFAULT_PACK_SIZE,
+    MAX_PACK_SIZE,
+    CACHE_ENABLED,
+    CACHE_PATH,
+    CASCADE_MODELS,
+    EXPORT_FORMATS,
+    GAZETTEER_ENABLED,
+    GAZETTEER_PATH
+)
+
+# Modules that pull in pandas, openpyxl and the OpenAI SDK. They are imported
+# on a background thread once the window is up, not at startup.
+BACKEND_MODULES = [
+    "src.data_handler",
+    "src.llm_processor",
+    "src.concurrent_processor",
+    "src.response_cache",
+    "src.rate_limiter",
+    "src.metrics",
+    "src.gazetteer"
+]
+
+
+# File menu entries that need the data handler (disabled if it failed to load)
+DATA_MENU_ITEMS = [
+    "Open Excel...",
+    "Save Excel",
+    "Save JSON",
+    "Export NDJSON...",
+    "Export Parquet...",
+    "Export Metrics..."
+]
+
+# Milliseconds between checks whether the worker threads have finished on close
+CLOSE_POLL_INTERVAL_MS = 100
+
+
+def import_backend():
+    """Import BACKEND_MODULES (later imports of them are then instant)"""
+    for name in BACKEND_MODULES:
+        importlib.import_module(name)
 
 
 class FirmRegistryCleanerGUI:
@@ -25,21 +72,77 @@ class FirmRegistryCleanerGUI:
         self.root.title("Hungarian Firm Registry LLM Data Cleaner")
         self.root.geometry("1400x900")
         
-        # Data components
-        self.data_handler = DataHandler()
+        # Data components, created by the background loader (see data_handler)
+        self._data_handler = None
         self.llm_processor = None
+        self.backend_ready = threading.Event()
+        self.backend_error = None  # Set if the background loader failed
         
         # Processing state
         self.is_processing = False
         self.stop_requested = False
         self.current_row_index = 0
+        self.concurrent_processor = None
+        self.load_cancel = None  # threading.Event while a workbook is loading
+        # Threads that write to the data handler; close waits for them
+        self.process_thread = None
+        self.load_thread = None
+        self.lookup_thread = None
+        self.closing = False
         
         # Setup GUI
         self._setup_menu()
         self._setup_gui()
         
-        # Try to initialize LLM processor
-        self._initialize_llm()
+        # Updates from worker threads are coalesced and applied at a fixed rate
+        self.ui_updates = UpdateQueue(self.root, on_rows_changed=self.table.refresh_rows)
+        self.ui_updates.start()
+        
+        # Export pending progress when the window is closed
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Import the data and LLM modules and create the client without
+        # blocking the window
+        self.status_var.set("Loading...")
+        self._loader_thread = threading.Thread(
+            target=self._load_backend,
+            args=(self.model_var.get(), self.workers_var.get())
+        )
+        self._loader_thread.daemon = True
+        self._loader_thread.start()
+    
+    @property
+    def data_handler(self):
+        """The DataHandler; waits for the background loader if it is still running (None if it failed)"""
+        if not self.backend_ready.is_set():
+            self.status_var.set("Loading...")
+            self.root.update_idletasks()
+            self.backend_ready.wait()
+        return self._data_handler
+    
+    def _load_backend(self, model, workers):
+        """Import the heavy modules and create the data handler and LLM processor (runs in thread)"""
+        try:
+            import_backend()
+            from src.data_handler import DataHandler
+            self._data_handler = DataHandler()
+        except Exception as e:
+            self.backend_error = f"Failed to load: {str(e)}"
+            self.ui_updates.post("backend", self._on_backend_failed)
+            return
+        finally:
+            self.backend_ready.set()
+        
+        self._initialize_llm(model, workers)
+    
+    def _on_backend_failed(self):
+        """Keep the window in a visible "failed to load" state; only Exit and About stay usable"""
+        self.status_var.set(f"✗ {self.backend_error}")
+        for button in (self.open_button, self.lookup_button, self.play_button):
+            button.config(state="disabled")
+        for label in DATA_MENU_ITEMS:
+            self.file_menu.entryconfig(label, state="disabled")
+        messagebox.showerror("Startup Error", self.backend_error)
     
     def _setup_menu(self):
         """Setup menu bar"""
@@ -48,12 +151,16 @@ class FirmRegistryCleanerGUI:
         
         # File menu
         file_menu = tk.Menu(menubar, tearoff=0)
+        self.file_menu = file_menu
         menubar.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="Open Excel...", command=self.open_file)
         file_menu.add_command(label="Save Excel", command=self.save_excel)
         file_menu.add_command(label="Save JSON", command=self.save_json)
+        file_menu.add_command(label="Export NDJSON...", command=self.export_ndjson)
+        file_menu.add_command(label="Export Parquet...", command=self.export_parquet)
+        file_menu.add_command(label="Export Metrics...", command=self.export_metrics)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.on_close)
         
         # Help menu
         help_menu = tk.Menu(menubar, tearoff=0)
@@ -91,11 +198,12 @@ class FirmRegistryCleanerGUI:
         self.model_dropdown.bind("<<ComboboxSelected>>", self.on_model_change)
         
         # Buttons
-        ttk.Button(
+        self.open_button = ttk.Button(
             control_frame,
             text="📂 Open File",
             command=self.open_file
-        ).grid(row=0, column=2, padx=5)
+        )
+        self.open_button.grid(row=0, column=2, padx=5)
         
         self.lookup_button = ttk.Button(
             control_frame,
@@ -119,13 +227,48 @@ class FirmRegistryCleanerGUI:
         )
         self.stop_button.grid(row=0, column=5, padx=5)
         
+        # Number of concurrent requests used by Play
+        ttk.Label(control_frame, text="Workers:").grid(row=0, column=6, padx=(15, 5))
+        self.workers_var = tk.IntVar(value=DEFAULT_MAX_WORKERS)
+        self.workers_spinbox = ttk.Spinbox(
+            control_frame,
+            from_=1,
+            to=MAX_WORKERS_LIMIT,
+            textvariable=self.workers_var,
+            state="readonly",
+            width=4
+        )
+        self.workers_spinbox.grid(row=0, column=7, padx=5)
+        
+        # Number of rows packed into one request by Play
+        ttk.Label(control_frame, text="Rows/request:").grid(row=0, column=8, padx=(15, 5))
+        self.pack_size_var = tk.IntVar(value=DEFAULT_PACK_SIZE)
+        self.pack_size_spinbox = ttk.Spinbox(
+            control_frame,
+            from_=1,
+            to=MAX_PACK_SIZE,
+            textvariable=self.pack_size_var,
+            state="readonly",
+            width=4
+        )
+        self.pack_size_spinbox.grid(row=0, column=9, padx=5)
+        
+        # Cascade mode: cheapest model first, failing rows re-sent to stronger ones
+        self.cascade_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            control_frame,
+            text="Cascade",
+            variable=self.cascade_var,
+            command=self.on_cascade_toggle
+        ).grid(row=0, column=10, padx=(15, 5))
+        
         # Status label
         self.status_var = tk.StringVar(value="Ready. Please open an Excel file.")
         ttk.Label(
             control_frame,
             textvariable=self.status_var,
             foreground="blue"
-        ).grid(row=0, column=6, padx=20)
+        ).grid(row=0, column=11, padx=20)
         
         # === Excel Viewer ===
         excel_frame = ttk.LabelFrame(main_frame, text="Excel Data", padding="5")
@@ -133,21 +276,9 @@ class FirmRegistryCleanerGUI:
         excel_frame.columnconfigure(0, weight=1)
         excel_frame.rowconfigure(0, weight=1)
         
-        # Treeview for Excel data
-        self.tree = ttk.Treeview(excel_frame, show="tree headings", selectmode="browse")
-        
-        # Scrollbars
-        tree_scroll_y = ttk.Scrollbar(excel_frame, orient="vertical", command=self.tree.yview)
-        tree_scroll_x = ttk.Scrollbar(excel_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=tree_scroll_y.set, xscrollcommand=tree_scroll_x.set)
-        
-        # Grid layout
-        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        tree_scroll_y.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        tree_scroll_x.grid(row=1, column=0, sticky=(tk.W, tk.E))
-        
-        # Bind selection event
-        self.tree.bind("<<TreeviewSelect>>", self.on_row_select)
+        # Virtualized table for Excel data (only visible rows are materialized)
+        self.table = VirtualTable(excel_frame, on_select=self.on_row_select)
+        self.table.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # === Separator ===
         ttk.Separator(main_frame, orient="horizontal").grid(
@@ -169,18 +300,54 @@ class FirmRegistryCleanerGUI:
         )
         self.json_output.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
     
-    def _initialize_llm(self):
-        """Initialize LLM processor with error handling"""
+    def _initialize_llm(self, model, workers):
+        """Initialize LLM processor with error handling (runs in the loader thread)"""
+        from src.llm_processor import LLMProcessor
+        from src.response_cache import ResponseCache
+        from src.rate_limiter import RateLimiter
+        from src.metrics import MetricsCollector
+        from src.gazetteer import Gazetteer
+        
         try:
-            self.llm_processor = LLMProcessor(model=self.model_var.get())
-            self.status_var.set("Ready. Please open an Excel file.")
+            cache = ResponseCache(CACHE_PATH) if CACHE_ENABLED else None
+            llm_processor = LLMProcessor(model=model, cache=cache)
+            llm_processor.rate_limiter = RateLimiter(max_concurrency=workers)
+            llm_processor.metrics = MetricsCollector()
+            if GAZETTEER_ENABLED:
+                llm_processor.gazetteer = Gazetteer.load(GAZETTEER_PATH)
+            self.ui_updates.post("llm", lambda: self._on_llm_ready(llm_processor))
         except Exception as e:
-            self.status_var.set(f"⚠ LLM Error: {str(e)}")
-            messagebox.showerror(
-                "API Key Error",
+            self._update_status(f"⚠ LLM Error: {str(e)}")
+            message = (
                 f"Failed to initialize OpenAI API:\n{str(e)}\n\n"
                 "Please ensure your .env file contains a valid OPENAI_API_KEY."
             )
+            # Dialogs are opened by the Tk thread, not the loader thread
+            self.ui_updates.post("llm-error", lambda: messagebox.showerror("API Key Error", message))
+    
+    def _on_llm_ready(self, llm_processor):
+        """Adopt the LLM processor and apply choices made while it was loading"""
+        self.llm_processor = llm_processor
+        if llm_processor.model != self.model_var.get():
+            llm_processor.set_model(self.model_var.get())
+        if self.cascade_var.get():
+            llm_processor.cascade_models = CASCADE_MODELS
+        self._seed_gazetteer()
+        if self.data_handler.get_row_count() == 0:
+            self.status_var.set("Ready. Please open an Excel file.")
+    
+    def _seed_gazetteer(self):
+        """Add the earlier results of the open workbook to the gazetteer (once per workbook)"""
+        from src.work_queue import workbook_key
+        
+        if self.llm_processor is None or self.llm_processor.gazetteer is None:
+            return
+        if self.data_handler.get_row_count() == 0:
+            return
+        results, input_fields = self.data_handler.accepted_results()
+        self.llm_processor.gazetteer.learn_workbook(
+            workbook_key(self.data_handler.file_path), results, input_fields
+        )
     
     def on_model_change(self, event=None):
         """Handle model selection change"""
@@ -188,8 +355,28 @@ class FirmRegistryCleanerGUI:
             self.llm_processor.set_model(self.model_var.get())
             self.status_var.set(f"Model changed to: {self.model_var.get()}")
     
+    def on_cascade_toggle(self):
+        """Handle the cascade checkbox"""
+        if not self.llm_processor:
+            return
+        if self.cascade_var.get():
+            self.llm_processor.cascade_models = CASCADE_MODELS
+            self.status_var.set(f"Cascade: {' -> '.join(CASCADE_MODELS)}")
+        else:
+            self.llm_processor.cascade_models = None
+            self.status_var.set(f"Cascade off, using {self.model_var.get()}")
+    
     def open_file(self):
-        """Open and load Excel file"""
+        """Open an Excel file and load it in the background"""
+        if self.closing:
+            return
+        if self.is_processing or self.load_cancel is not None:
+            messagebox.showwarning(
+                "Busy",
+                "Wait for the current run or file load to finish (or stop it) first."
+            )
+            return
+        
         file_path = filedialog.askopenfilename(
             title="Select Excel File",
             filetypes=[
@@ -202,79 +389,119 @@ class FirmRegistryCleanerGUI:
         if not file_path:
             return
         
+        # Resolve the data handler (waits for startup) before the loader starts
+        data_handler = self.data_handler
+        if data_handler is None:
+            return
+        
+        self.load_cancel = threading.Event()
+        self.status_var.set("Loading Excel file...")
+        self._set_loading_mode(True)
+        self.load_thread = threading.Thread(
+            target=self._load_file,
+            args=(data_handler, file_path, self.load_cancel)
+        )
+        self.load_thread.daemon = True
+        self.load_thread.start()
+    
+    def _load_file(self, data_handler, file_path, cancel_event):
+        """Load a workbook, showing its chunks as they are read (runs in thread)"""
+        from src.data_handler import LoadCancelled
+        
+        name = os.path.basename(file_path)
+        rows_read = [0]
+        
+        def on_chunk(chunk):
+            rows_read[0] += len(chunk)
+            self._update_status(f"Loading {name}: {rows_read[0]:,} rows read... (Stop to cancel)")
+            self.ui_updates.post(f"chunk-{rows_read[0]}", lambda: self.table.append_rows(chunk))
+        
+        def restore(message):
+            # Show the previously loaded workbook again, if any
+            if data_handler.get_dataframe() is not None:
+                self._populate_treeview(data_handler.get_dataframe())
+            else:
+                self.table.clear()
+            self.status_var.set(message)
+        
         try:
-            self.status_var.set("Loading Excel file...")
-            self.root.update()
-            
             # Load data (will auto-load progress if exists)
-            df = self.data_handler.load_excel(file_path)
-            
-            # Update treeview
-            self._populate_treeview(df)
-            
-            # Check if we loaded progress
-            if os.path.exists(self.data_handler.auto_save_path):
-                first_unprocessed = self.data_handler.find_first_unprocessed_row()
-                if first_unprocessed >= 0:
-                    self.status_var.set(f"Loaded progress: {first_unprocessed}/{len(df)} rows done. Select row {first_unprocessed} to resume.")
-                    # Select the first unprocessed row
-                    self._select_treeview_row(first_unprocessed)
-                else:
-                    self.status_var.set(f"All {len(df)} rows already processed!")
-            else:
-                self.status_var.set(f"Loaded {len(df)} rows from {file_path}")
-            
+            df = data_handler.load_excel(file_path, on_chunk=on_chunk, cancel_event=cancel_event)
+        except LoadCancelled:
+            self.ui_updates.post("loaded", lambda: restore(f"Loading {name} cancelled"))
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load file:\n{str(e)}")
-            self.status_var.set("Error loading file")
-    
-    def _populate_treeview(self, df):
-        """Populate treeview with dataframe data"""
-        # Clear existing data
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Setup columns
-        columns = list(df.columns)
-        self.tree["columns"] = columns
-        
-        # Format columns
-        self.tree.column("#0", width=50, minwidth=50, stretch=False)
-        for col in columns:
-            self.tree.column(col, width=150, minwidth=100, stretch=True)
-            self.tree.heading(col, text=col, anchor=tk.W)
-        
-        # Add data
-        for idx, row in df.iterrows():
-            values = [str(val) if val is not None else "" for val in row]
-            self.tree.insert("", "end", text=str(idx), values=values)
-    
-    def on_row_select(self, event=None):
-        """Handle row selection in treeview"""
-        selection = self.tree.selection()
-        if selection:
-            item = selection[0]
-            row_text = self.tree.item(item, "text")
-            self.current_row_index = int(row_text)
+            message = f"Failed to load file:\n{str(e)}"
+            self.ui_updates.post("loaded", lambda: restore("Error loading file"))
+            self.ui_updates.post("load-error", lambda: messagebox.showerror("Error", message))
+        else:
+            self.ui_updates.post("loaded", lambda: self._on_file_loaded(df, file_path))
+        finally:
+            self.ui_updates.post("loading", lambda: self._set_loading_mode(False))
+    
+    def _on_file_loaded(self, df, file_path):
+        """Show a loaded workbook and where to resume"""
+        # Update treeview
+        self._populate_treeview(df, keep_view=True)
+        self._seed_gazetteer()
+        
+        # Check if we loaded progress
+        if self.data_handler.has_progress:
+            first_unprocessed = self.data_handler.find_first_unprocessed_row()
+            if first_unprocessed >= 0:
+                self.status_var.set(
+                    f"Loaded progress: {self._format_status_counts()}. "
+                    f"Select row {first_unprocessed} to resume."
+                )
+                # Select the first unprocessed row
+                self.table.select_row(first_unprocessed)
+            else:
+                self.status_var.set(f"All {len(df)} rows already processed!")
+        else:
+            self.status_var.set(f"Loaded {len(df)} rows from {file_path}")
+    
+    def _set_loading_mode(self, loading):
+        """Disable everything that uses the workbook while one is loading (Tk thread)"""
+        state = "disabled" if loading else "normal"
+        self.open_button.config(state=state)
+        self.lookup_button.config(state=state)
+        self.play_button.config(state=state)
+        self.stop_button.config(state="normal" if loading else "disabled")
+        if not loading:
+            self.load_cancel = None
+    
+    def _format_status_counts(self):
+        """Return the row status counts as a short status text"""
+        counts = self.data_handler.get_status_counts()
+        text = (
+            f"{counts['done']}/{self.data_handler.get_row_count()} done, "
+            f"{counts['failed']} failed, {counts['pending']} pending"
+        )
+        if counts['skipped']:
+            text += f", {counts['skipped']} empty"
+        return text
+    
+    def _populate_treeview(self, df, keep_view=False):
+        """Show dataframe data in the table"""
+        self.table.set_dataframe(df, keep_view=keep_view)
+    
+    def on_row_select(self, row_index):
+        """Handle row selection in the table"""
+        self.current_row_index = row_index
     
     def lookup_selected_row(self):
         """Process the selected row"""
         if not self._validate_ready():
             return
         
-        selection = self.tree.selection()
-        if not selection:
+        row_index = self.table.get_selected_row()
+        if row_index is None:
             messagebox.showwarning("No Selection", "Please select a row to process.")
             return
         
-        # Get row index
-        item = selection[0]
-        row_index = int(self.tree.item(item, "text"))
-        
         # Process row in thread to keep GUI responsive
-        thread = threading.Thread(target=self._process_single_row, args=(row_index,))
-        thread.daemon = True
-        thread.start()
+        self.lookup_thread = threading.Thread(target=self._process_single_row, args=(row_index,))
+        self.lookup_thread.daemon = True
+        self.lookup_thread.start()
     
     def _process_single_row(self, row_index):
         """Process a single row (runs in thread)"""
@@ -283,10 +510,10 @@ class FirmRegistryCleanerGUI:
             self._disable_buttons()
             
             # Get row data
-            row_data = self.data_handler.get_row(row_index)
+            row_data = self.data_handler.get_input_row(row_index)
             
-            # Process with LLM
-            cleaned_data = self.llm_processor.process_row(row_data)
+            # Process with LLM (an explicit lookup asks again rather than reusing a cached answer)
+            cleaned_data = self.llm_processor.process_row(row_data, refresh=True)
             
             # Update dataframe
             self.data_handler.update_row(row_index, cleaned_data)
@@ -298,7 +525,7 @@ class FirmRegistryCleanerGUI:
             self._update_treeview_row(row_index)
             self._display_json(cleaned_data)
             
-            self._update_status(f"✓ Processed row {row_index} (auto-saved)")
+            self._update_status(f"✓ Processed row {row_index} (saved to journal)")
             
         except Exception as e:
             error_msg = f"Error processing row {row_index}: {str(e)}"
@@ -314,22 +541,29 @@ class FirmRegistryCleanerGUI:
         if not self._validate_ready():
             return
         
-        selection = self.tree.selection()
-        if not selection:
+        start_index = self.table.get_selected_row()
+        if start_index is None:
             messagebox.showwarning("No Selection", "Please select starting row.")
             return
         
-        # Get starting row
-        item = selection[0]
-        start_index = int(self.tree.item(item, "text"))
+        # Pending rows and rows whose last attempt failed; done rows are skipped
+        rows_to_process = self.data_handler.find_unprocessed_rows(
+            start=start_index,
+            include_failed=True
+        )
+        if not rows_to_process:
+            messagebox.showinfo(
+                "Nothing to Process",
+                f"All rows from row {start_index} onwards are already processed.\n\n"
+                "Use Lookup to re-process a single row."
+            )
+            return
         
         # Confirm
-        total_rows = self.data_handler.get_row_count()
-        rows_to_process = total_rows - start_index
-        
         if not messagebox.askyesno(
             "Confirm Auto-Processing",
-            f"Process {rows_to_process} rows starting from row {start_index}?\n\n"
+            f"Process {len(rows_to_process)} rows starting from row {start_index}?\n"
+            f"(Rows that are already processed are skipped.)\n\n"
             f"This will use the OpenAI API and may incur costs."
         ):
             return
@@ -337,78 +571,118 @@ class FirmRegistryCleanerGUI:
         # Start processing in thread
         self.is_processing = True
         self.stop_requested = False
-        thread = threading.Thread(
+        self.process_thread = threading.Thread(
             target=self._auto_process_rows,
-            args=(start_index,)
+            args=(rows_to_process,)
         )
-        thread.daemon = True
-        thread.start()
+        self.process_thread.daemon = True
+        self.process_thread.start()
     
-    def _auto_process_rows(self, start_index):
-        """Auto-process rows from start_index onwards (runs in thread)"""
+    def _auto_process_rows(self, row_indices):
+        """Auto-process the given rows (runs in thread)"""
         try:
             self._update_status("Auto-processing started...")
             self._set_processing_mode(True)
             
-            total_rows = self.data_handler.get_row_count()
+            from src.concurrent_processor import ConcurrentProcessor
+            
+            # Each run starts at the chosen worker count (the spinbox may have changed)
+            workers = self.workers_var.get()
+            if self.llm_processor.rate_limiter is not None:
+                self.llm_processor.rate_limiter.concurrency.reset(workers)
+            
+            self.concurrent_processor = ConcurrentProcessor(
+                self.llm_processor,
+                self.data_handler,
+                max_workers=workers,
+                pack_size=self.pack_size_var.get()
+            )
+            if self.stop_requested:
+                self.concurrent_processor.stop()
+            
+            completed = [0]
             
-            for row_index in range(start_index, total_rows):
-                if self.stop_requested:
-                    self._update_status("⏹ Processing stopped by user")
-                    break
+            def on_row_done(row_index, cleaned_data):
+                completed[0] += 1
+                
+                # Update progress
+                if "error" in cleaned_data:
+                    self._update_status(f"Error at row {row_index}: {cleaned_data['error']}")
+                else:
+                    done = completed[0]
+                    # Built when the coalesced update is applied, not for every row
+                    self.ui_updates.post("status", lambda: self.status_var.set(
+                        f"Processed {done}/{len(row_indices)} rows "
+                        f"(last: row {row_index}) | {self._format_status_counts()} | "
+                        f"{self.llm_processor.metrics.status_text()}"
+                    ))
                 
-                try:
-                    # Update progress
-                    progress = f"Processing row {row_index + 1}/{total_rows}"
-                    self._update_status(progress)
-                    
-                    # Select row in GUI
-                    self._select_treeview_row(row_index)
-                    
-                    # Get row data
-                    row_data = self.data_handler.get_row(row_index)
-                    
-                    # Process with LLM
-                    cleaned_data = self.llm_processor.process_row(row_data)
-                    
-                    # Update dataframe
-                    self.data_handler.update_row(row_index, cleaned_data)
-                    
-                    # Auto-save after each row
-                    self.data_handler.auto_save()
-                    
-                    # Update GUI
-                    self._update_treeview_row(row_index)
-                    self._display_json(cleaned_data)
-                    
-                except Exception as e:
-                    error_msg = f"Error at row {row_index}: {str(e)}"
-                    self._update_status(error_msg)
-                    self._display_json({"error": str(e)})
-                    
-                    # Ask user if they want to continue
-                    if not messagebox.askyesno(
-                        "Error",
-                        f"{error_msg}\n\nContinue processing?"
-                    ):
-                        break
+                # Update GUI
+                self._select_treeview_row(row_index)
+                self._update_treeview_row(row_index)
+                self._display_json(cleaned_data)
+            
+            stats = self.concurrent_processor.run(
+                row_indices,
+                on_row_done=on_row_done
+            )
             
-            if not self.stop_requested:
+            if stats["stopped"]:
+                self._update_status(
+                    f"⏹ Processing stopped by user ({stats['processed']} processed, "
+                    f"{stats['failed']} failed)"
+                )
+            elif stats["failed"]:
+                self._update_status(
+                    f"✓ Auto-processing completed with {stats['failed']} failed rows"
+                )
+                messagebox.showwarning(
+                    "Complete",
+                    f"Processed {stats['processed']} rows, {stats['failed']} failed.\n\n"
+                    "Failed rows show the error in the output view."
+                )
+            else:
                 self._update_status("✓ Auto-processing completed")
                 messagebox.showinfo("Complete", "All rows processed successfully!")
             
+        except Exception as e:
+            error_msg = f"Auto-processing failed: {str(e)}"
+            self._update_status(f"✗ {error_msg}")
+            messagebox.showerror("Processing Error", error_msg)
+        
         finally:
+            # Export everything processed in this run to the progress file
+            self.data_handler.auto_save(force=True)
+            self.concurrent_processor = None
             self.is_processing = False
             self.stop_requested = False
             self._set_processing_mode(False)
     
     def stop_auto_processing(self):
-        """Request stop of auto-processing"""
+        """Request stop of auto-processing (or cancel loading a file)"""
+        if self.load_cancel is not None:
+            self.load_cancel.set()
+            self._update_status("Cancelling file load...")
+            return
+        
         self.stop_requested = True
-        self._update_status("Stopping after current row...")
+        if self.concurrent_processor is not None:
+            self.concurrent_processor.stop()
+        self._update_status("Stopping: cancelling queued rows, finishing in-flight ones...")
     
     def _validate_ready(self):
         """Check if system is ready to process"""
+        if self.closing:
+            return False
+        
+        if self.llm_processor is None and self._loader_thread.is_alive():
+            messagebox.showinfo("Not Ready", "Still loading, please try again in a moment.")
+            return False
+        
+        if self.data_handler is None:
+            messagebox.showerror("Not Ready", self.backend_error or "Failed to load.")
+            return False
+        
         if self.llm_processor is None:
             messagebox.showerror(
                 "Not Ready",
@@ -426,27 +700,12 @@ class FirmRegistryCleanerGUI:
         return True
     
     def _update_treeview_row(self, row_index):
-        """Update a specific row in the treeview"""
-        df = self.data_handler.get_dataframe()
-        row = df.iloc[row_index]
-        
-        # Find item in treeview
-        for item in self.tree.get_children():
-            if self.tree.item(item, "text") == str(row_index):
-                values = [str(val) if val is not None else "" for val in row]
-                self.tree.item(item, values=values)
-                break
+        """Redraw a specific row in the table (thread-safe)"""
+        self.ui_updates.mark_row_changed(row_index)
     
     def _select_treeview_row(self, row_index):
-        """Select a specific row in treeview (thread-safe)"""
-        def select():
-            for item in self.tree.get_children():
-                if self.tree.item(item, "text") == str(row_index):
-                    self.tree.selection_set(item)
-                    self.tree.see(item)
-                    break
-        
-        self.root.after(0, select)
+        """Select a specific row in the table (thread-safe)"""
+        self.ui_updates.post("select", lambda: self.table.select_row(row_index))
     
     def _display_json(self, data):
         """Display JSON data in output textbox (thread-safe)"""
@@ -455,11 +714,11 @@ class FirmRegistryCleanerGUI:
             json_str = json.dumps(data, ensure_ascii=False, indent=2)
             self.json_output.insert(1.0, json_str)
         
-        self.root.after(0, display)
+        self.ui_updates.post("json", display)
     
     def _update_status(self, message):
         """Update status label (thread-safe)"""
-        self.root.after(0, lambda: self.status_var.set(message))
+        self.ui_updates.post("status", lambda: self.status_var.set(message))
     
     def _disable_buttons(self):
         """Disable processing buttons (thread-safe)"""
@@ -467,7 +726,7 @@ class FirmRegistryCleanerGUI:
             self.lookup_button.config(state="disabled")
             self.play_button.config(state="disabled")
         
-        self.root.after(0, disable)
+        self.ui_updates.post("buttons", disable)
     
     def _enable_buttons(self):
         """Enable processing buttons (thread-safe)"""
@@ -476,7 +735,7 @@ class FirmRegistryCleanerGUI:
                 self.lookup_button.config(state="normal")
                 self.play_button.config(state="normal")
         
-        self.root.after(0, enable)
+        self.ui_updates.post("buttons", enable)
     
     def _set_processing_mode(self, processing):
         """Set GUI to processing mode (thread-safe)"""
@@ -486,18 +745,31 @@ class FirmRegistryCleanerGUI:
                 self.play_button.config(state="disabled")
                 self.stop_button.config(state="normal")
                 self.model_dropdown.config(state="disabled")
+                self.workers_spinbox.config(state="disabled")
+                self.pack_size_spinbox.config(state="disabled")
             else:
                 self.lookup_button.config(state="normal")
                 self.play_button.config(state="normal")
                 self.stop_button.config(state="disabled")
                 self.model_dropdown.config(state="readonly")
+                self.workers_spinbox.config(state="readonly")
+                self.pack_size_spinbox.config(state="readonly")
         
-        self.root.after(0, set_mode)
+        self.ui_updates.post("buttons", set_mode)
     
-    def save_excel(self):
-        """Save processed data to Excel"""
+    def _has_data(self):
+        """Return True if a workbook is loaded; tell the user otherwise"""
+        if self.data_handler is None:
+            messagebox.showerror("Not Ready", self.backend_error or "Failed to load.")
+            return False
         if self.data_handler.get_row_count() == 0:
             messagebox.showwarning("No Data", "No data to save.")
+            return False
+        return True
+    
+    def save_excel(self):
+        """Save processed data to Excel"""
+        if not self._has_data():
             return
         
         try:
@@ -509,8 +781,7 @@ class FirmRegistryCleanerGUI:
     
     def save_json(self):
         """Save processed data to JSON"""
-        if self.data_handler.get_row_count() == 0:
-            messagebox.showwarning("No Data", "No data to save.")
+        if not self._has_data():
             return
         
         try:
@@ -520,6 +791,114 @@ class FirmRegistryCleanerGUI:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save JSON:\n{str(e)}")
     
+    def export_ndjson(self):
+        """Export processed data as newline-delimited JSON, chunk by chunk"""
+        self._export_chunked("NDJSON", "ndjson", lambda path: self.data_handler.save_ndjson(path))
+    
+    def export_parquet(self):
+        """Export processed data to Parquet (needs pyarrow)"""
+        self._export_chunked("Parquet", "parquet", lambda path: self.data_handler.save_parquet(path))
+    
+    def _export_chunked(self, title, output_format, save):
+        """Ask for a target file and run one of the chunked exports"""
+        if not self._has_data():
+            return
+        
+        extension = EXPORT_FORMATS[output_format]
+        file_path = filedialog.asksaveasfilename(
+            title=f"Export {title}",
+            defaultextension=extension,
+            filetypes=[(f"{title} files", f"*{extension}"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        try:
+            output_path = save(file_path)
+            messagebox.showinfo("Saved", f"{title} file saved to:\n{output_path}")
+            self.status_var.set(f"✓ Saved to {output_path}")
+        except ImportError as e:
+            messagebox.showerror("Missing Dependency", str(e))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export {title}:\n{str(e)}")
+    
+    def export_metrics(self):
+        """Export latency, token and cost metrics to CSV or Prometheus text"""
+        if self.llm_processor is None or self.llm_processor.metrics is None:
+            messagebox.showwarning("No Metrics", "No requests have been made yet.")
+            return
+        
+        file_path = filedialog.asksaveasfilename(
+            title="Export Metrics",
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV files", "*.csv"),
+                ("Prometheus text files", "*.prom"),
+                ("All files", "*.*")
+            ]
+        )
+        if not file_path:
+            return
+        
+        try:
+            output_path = self.llm_processor.metrics.export(file_path)
+            self.status_var.set(f"✓ Metrics exported to {output_path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export metrics:\n{str(e)}")
+    
+    def on_close(self):
+        """Stop processing and loading, then export pending progress and quit"""
+        if self.closing:
+            return
+        if self.is_processing:
+            if not messagebox.askyesno(
+                "Processing Running",
+                "Auto-processing is still running. Stop and exit?"
+            ):
+                return
+            self.stop_auto_processing()
+        if self.load_cancel is not None:
+            self.load_cancel.set()
+        
+        self.closing = True
+        self.status_var.set("Closing: finishing in-flight rows...")
+        self._finish_close()
+    
+    def _worker_threads_running(self):
+        """Return True while a processing, lookup or file loading thread is running"""
+        return any(
+            thread is not None and thread.is_alive()
+            for thread in (self.process_thread, self.lookup_thread, self.load_thread)
+        )
+    
+    def _finish_close(self):
+        """
+        Save and quit once the worker threads have returned
+        
+        In-flight rows are still committed (and journaled) by the engine
+        after a stop, and a load may still replace the working frame, so
+        the progress file is only written and the window only destroyed
+        when they are done. The Tk loop keeps running meanwhile, so the
+        threads' GUI updates still have a live window to go to.
+        """
+        if self._worker_threads_running():
+            self.root.after(CLOSE_POLL_INTERVAL_MS, self._finish_close)
+            return
+        
+        self.ui_updates.stop()
+        try:
+            if self.data_handler is not None:
+                self.data_handler.close()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save progress:\n{str(e)}")
+        if self.llm_processor is not None and self.llm_processor.gazetteer is not None:
+            try:
+                self.llm_processor.gazetteer.save(GAZETTEER_PATH)
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to save the gazetteer:\n{str(e)}")
+        
+        self.root.destroy()
+    
     def show_about(self):
         """Show about dialog"""
         about_text = """Hungarian Firm Registry LLM Data Cleaner
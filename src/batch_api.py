@@ -0,0 +1,410 @@
+"""
+Batch API Module
+Submits whole workbooks through the OpenAI Batch API and merges the results
+"""
+
+import json
+import os
+import time
+import uuid
+from src.config import (
+    BATCH_COMPLETION_WINDOW,
+    BATCH_POLL_INTERVAL,
+    BATCH_MAX_REQUESTS
+)
+
+# Batch statuses after which no more progress will be made
+FINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class OpenAIBatchBackend:
+    """Runs batch files on the OpenAI Batch API"""
+
+    def __init__(self, client, completion_window=BATCH_COMPLETION_WINDOW):
+        """
+        Initialize the backend
+
+        Args:
+            client: OpenAI client (usually LLMProcessor.client)
+            completion_window: Batch completion window
+        """
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, input_path):
+        """
+        Upload a JSONL request file and create a batch
+
+        Args:
+            input_path: Path to the JSONL request file
+
+        Returns:
+            str: Batch ID
+        """
+        with open(input_path, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def get_status(self, batch_id):
+        """Return the current status string of a batch"""
+        return self.client.batches.retrieve(batch_id).status
+
+    def download_output(self, batch_id, output_path):
+        """
+        Download the output (and error) file of a finished batch
+
+        Failed requests are reported in a separate error file by the API;
+        both are written to output_path since they share the line format.
+
+        Args:
+            batch_id: Batch ID
+            output_path: Destination JSONL path
+
+        Returns:
+            str: Path of the downloaded file
+        """
+        batch = self.client.batches.retrieve(batch_id)
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    content = self.client.files.content(file_id).text
+                    f.write(content)
+                    if content and not content.endswith('\n'):
+                        f.write('\n')
+
+        return output_path
+
+
+class LocalBatchBackend:
+    """
+    Local stand-in for the Batch API
+
+    Consumes a request JSONL file and immediately produces an output JSONL
+    file in the Batch API format, answering each request with
+    complete(body) -> message content. Useful for testing the batch
+    workflow without an API key.
+    """
+
+    def __init__(self, complete):
+        """
+        Initialize the backend
+
+        Args:
+            complete: Callable taking a request body and returning the message content
+        """
+        self.complete = complete
+        self._outputs = {}
+
+    def submit(self, input_path):
+        """Process a request file synchronously and return a batch ID"""
+        batch_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        lines = []
+
+        with open(input_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                lines.append(self._answer(request))
+
+        self._outputs[batch_id] = lines
+        return batch_id
+
+    def get_status(self, batch_id):
+        """Local batches complete during submit"""
+        return "completed" if batch_id in self._outputs else "failed"
+
+    def download_output(self, batch_id, output_path):
+        """Write the stored output lines to output_path"""
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for line in self._outputs[batch_id]:
+                f.write(json.dumps(line, ensure_ascii=False) + '\n')
+        return output_path
+
+    def _answer(self, request):
+        """Build one Batch API output line for a request"""
+        body = request["body"]
+        try:
+            content = self.complete(body)
+        except Exception as e:
+            return {
+                "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+                "custom_id": request["custom_id"],
+                "response": None,
+                "error": {"code": "local_error", "message": str(e)}
+            }
+
+        return {
+            "id": f"batch_req_{uuid.uuid4().hex[:12]}",
+            "custom_id": request["custom_id"],
+            "response": {
+                "status_code": 200,
+                "request_id": uuid.uuid4().hex,
+                "body": {
+                    "object": "chat.completion",
+                    "model": body.get("model"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop"
+                    }]
+                }
+            },
+            "error": None
+        }
+
+
+class BatchRunner:
+    """Writes, submits, polls and merges Batch API jobs for one workbook"""
+
+    def __init__(self, llm_processor, data_handler, backend=None, work_dir=None):
+        """
+        Initialize the batch runner
+
+        Args:
+            llm_processor: LLMProcessor that builds and parses the requests
+            data_handler: DataHandler with the loaded workbook
+            backend: Batch backend (default: OpenAI Batch API with the processor's client)
+            work_dir: Directory for request/output files (default: the output directory)
+        """
+        self.llm_processor = llm_processor
+        self.data_handler = data_handler
+        self.backend = backend or OpenAIBatchBackend(llm_processor.client)
+        self.work_dir = work_dir or data_handler.output_dir
+
+        if not os.path.exists(self.work_dir):
+            os.makedirs(self.work_dir)
+
+    def _file_prefix(self):
+        """Return the file name prefix derived from the input workbook"""
+        base_name = os.path.basename(self.data_handler.file_path or "workbook")
+        name, ext = os.path.splitext(base_name)
+        return os.path.join(self.work_dir, f"{name}_batch")
+
+    def manifest_path(self):
+        """Return the path of the manifest recording submitted batch IDs"""
+        return f"{self._file_prefix()}_manifest.json"
+
+    def write_requests(self, row_indices=None, max_requests=BATCH_MAX_REQUESTS):
+        """
+        Write unprocessed rows as Batch API JSONL request files
+
+        Rows the pre-cleaning rules resolve completely are written back
+        directly instead of being submitted.
+
+        Args:
+            row_indices: Rows to include (default: all unprocessed rows)
+            max_requests: Maximum requests per file
+
+        Returns:
+            list: Paths of the written request files
+        """
+        if row_indices is None:
+            row_indices = self.data_handler.find_unprocessed_rows()
+
+        paths = []
+        f = None
+        count = 0
+        try:
+            for row_index in row_indices:
+                row_data = self.data_handler.get_input_row(row_index)
+                resolved = self.llm_processor.resolve_locally(row_data)
+                if resolved is not None:
+                    self.data_handler.update_row(row_index, resolved)
+                    continue
+
+                if count % max_requests == 0:
+                    if f is not None:
+                        f.close()
+                    path = f"{self._file_prefix()}_requests_{len(paths):03d}.jsonl"
+                    paths.append(path)
+                    f = open(path, 'w', encoding='utf-8')
+
+                request = self.llm_processor.build_batch_request(row_index, row_data)
+                f.write(json.dumps(request, ensure_ascii=False) + '\n')
+                count += 1
+        finally:
+            if f is not None:
+                f.close()
+
+        return paths
+
+    def submit(self, request_paths):
+        """
+        Submit request files and record the batch IDs in the manifest
+
+        The manifest is rewritten after each file, so an interrupted
+        submission still lists every batch that was created.
+
+        Args:
+            request_paths: Paths returned by write_requests
+
+        Returns:
+            list: Batch IDs
+        """
+        batch_ids = []
+        for path in request_paths:
+            batch_ids.append(self.backend.submit(path))
+            self._write_manifest(batch_ids)
+
+        return batch_ids
+
+    def _write_manifest(self, batch_ids):
+        """Record the submitted batch IDs"""
+        with open(self.manifest_path(), 'w', encoding='utf-8') as f:
+            json.dump(
+                {"model": self.llm_processor.model, "batch_ids": batch_ids},
+                f,
+                indent=2
+            )
+
+    def load_manifest(self):
+        """
+        Return the batch IDs of a previous submission, if any
+
+        Returns:
+            list: Batch IDs (empty if nothing was submitted)
+        """
+        if not os.path.exists(self.manifest_path()):
+            return []
+        with open(self.manifest_path(), 'r', encoding='utf-8') as f:
+            return json.load(f).get("batch_ids", [])
+
+    def submitted_model(self):
+        """
+        Return the model the recorded batches were submitted with
+
+        Returns:
+            str: Model from the manifest (default: the processor's model)
+        """
+        if os.path.exists(self.manifest_path()):
+            with open(self.manifest_path(), 'r', encoding='utf-8') as f:
+                model = json.load(f).get("model")
+            if model:
+                return model
+        return self.llm_processor.model
+
+    def clear_manifest(self):
+        """Forget the recorded batches once their results are merged"""
+        if os.path.exists(self.manifest_path()):
+            os.remove(self.manifest_path())
+
+    def wait(self, batch_ids, poll_interval=BATCH_POLL_INTERVAL, on_status=None):
+        """
+        Poll until every batch reaches a final status
+
+        Args:
+            batch_ids: Batch IDs to wait for
+            poll_interval: Seconds between polls
+            on_status: Optional callback(statuses) after each poll
+
+        Returns:
+            dict: Final status per batch ID
+        """
+        statuses = {}
+        while True:
+            for batch_id in batch_ids:
+                if statuses.get(batch_id) not in FINAL_BATCH_STATUSES:
+                    statuses[batch_id] = self.backend.get_status(batch_id)
+
+            if on_status is not None:
+                on_status(dict(statuses))
+
+            if all(status in FINAL_BATCH_STATUSES for status in statuses.values()):
+                return statuses
+
+            time.sleep(poll_interval)
+
+    def merge_results(self, batch_ids, merged_rows=None):
+        """
+        Download batch outputs and merge them through DataHandler.update_row
+
+        Args:
+            batch_ids: Finished batch IDs
+            merged_rows: Optional set that receives the merged row indices
+
+        Returns:
+            dict: Counts of merged and failed rows
+        """
+        stats = {"processed": 0, "failed": 0}
+        model = self.submitted_model()
+
+        for batch_id in batch_ids:
+            output_path = f"{self._file_prefix()}_output_{batch_id}.jsonl"
+            self.backend.download_output(batch_id, output_path)
+
+            with open(output_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    row_index, cleaned_data = self.llm_processor.parse_batch_result(
+                        json.loads(line), model
+                    )
+                    if "error" not in cleaned_data:
+                        row_data = self.data_handler.get_input_row(row_index)
+                        self.llm_processor.apply_precleaned(cleaned_data, row_data)
+                        self.llm_processor.snap_entities(cleaned_data, row_data)
+                        self.llm_processor.stamp_fingerprints(cleaned_data, row_data)
+                    self.data_handler.update_row(row_index, cleaned_data)
+                    if merged_rows is not None:
+                        merged_rows.add(row_index)
+                    if "error" in cleaned_data:
+                        stats["failed"] += 1
+                    else:
+                        stats["processed"] += 1
+
+        self.data_handler.auto_save(force=True)
+        return stats
+
+    def run(self, row_indices=None, poll_interval=BATCH_POLL_INTERVAL, on_status=None):
+        """
+        Write, submit, wait for and merge a complete batch job
+
+        Batches recorded in the manifest by an earlier, interrupted run are
+        waited for and merged first; their rows are not submitted again.
+
+        Args:
+            row_indices: Rows to include (default: all unprocessed rows)
+            poll_interval: Seconds between polls
+            on_status: Optional callback(statuses) after each poll
+
+        Returns:
+            dict: Counts of merged and failed rows
+        """
+        stats = {"processed": 0, "failed": 0}
+
+        previous_ids = self.load_manifest()
+        if previous_ids:
+            merged_rows = set()
+            previous = self._wait_and_merge(previous_ids, poll_interval, on_status, merged_rows)
+            stats["processed"] += previous["processed"]
+            stats["failed"] += previous["failed"]
+            if row_indices is not None:
+                row_indices = [idx for idx in row_indices if idx not in merged_rows]
+
+        request_paths = self.write_requests(row_indices)
+        if not request_paths:
+            return stats
+
+        batch_ids = self.submit(request_paths)
+        current = self._wait_and_merge(batch_ids, poll_interval, on_status)
+        stats["processed"] += current["processed"]
+        stats["failed"] += current["failed"]
+        return stats
+
+    def _wait_and_merge(self, batch_ids, poll_interval, on_status, merged_rows=None):
+        """Wait for batches, merge what they finished and clear the manifest"""
+        statuses = self.wait(batch_ids, poll_interval=poll_interval, on_status=on_status)
+
+        # Expired and cancelled batches still return the requests they finished
+        finished = [batch_id for batch_id, status in statuses.items() if status != "failed"]
+        stats = self.merge_results(finished, merged_rows)
+        self.clear_manifest()
+        return stats
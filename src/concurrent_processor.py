@@ -0,0 +1,165 @@
+"""
+Concurrent Processor Module
+Keeps several LLM requests in flight and commits results as they arrive
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.config import (
+    DEFAULT_MAX_WORKERS,
+    MAX_WORKERS_LIMIT,
+    DEFAULT_PACK_SIZE,
+    MAX_PACK_SIZE
+)
+
+
+class ConcurrentProcessor:
+    """Processes rows on a thread pool on behalf of the Play loop"""
+
+    def __init__(self, llm_processor, data_handler, max_workers=DEFAULT_MAX_WORKERS,
+                 pack_size=DEFAULT_PACK_SIZE):
+        """
+        Initialize the concurrent processor
+
+        Args:
+            llm_processor: LLMProcessor used by the worker threads
+            data_handler: DataHandler that receives the results
+            max_workers: Number of requests kept in flight
+            pack_size: Rows per request; ignored if the processor has a pack_tuner
+        """
+        self.llm_processor = llm_processor
+        self.data_handler = data_handler
+        self.max_workers = max(1, min(int(max_workers), MAX_WORKERS_LIMIT))
+        self.pack_size = max(1, min(int(pack_size), MAX_PACK_SIZE))
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        """
+        Request stop: queued rows are cancelled, in-flight rows are finished
+
+        A stop requested before run() starts is kept, so run() returns
+        without submitting anything.
+        """
+        self._stop_event.set()
+
+    @property
+    def stop_requested(self):
+        """Return True once stop() has been called"""
+        return self._stop_event.is_set()
+
+    def run(self, row_indices, on_row_done=None):
+        """
+        Process rows concurrently
+
+        Rows are read from the DataHandler on the calling thread, sent to the
+        API from the worker threads, and written back on the calling thread
+        in completion order, so the DataFrame is only ever touched by one thread.
+
+        Args:
+            row_indices: Iterable of row indices to process
+            on_row_done: Optional callback(row_index, cleaned_data) per finished row
+
+        Returns:
+            dict: Counts of processed and failed rows, and whether the run was stopped
+        """
+        stats = {"processed": 0, "failed": 0, "stopped": False}
+        rows = iter(row_indices)
+        pending = {}
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="llm-worker"
+        ) as executor:
+            self._submit_rows(executor, rows, pending)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row_indices = pending.pop(future)
+                    if future.cancelled():
+                        continue
+                    self._commit(row_indices, future, stats, on_row_done)
+
+                if self._stop_event.is_set():
+                    # Drop rows that have not started; in-flight ones are still committed
+                    for future in list(pending):
+                        if future.cancel():
+                            pending.pop(future)
+                    stats["stopped"] = True
+                else:
+                    self._submit_rows(executor, rows, pending)
+
+        # A stop before or during submission leaves nothing pending to notice it
+        stats["stopped"] = self._stop_event.is_set()
+        return stats
+
+    def _next_pack_size(self):
+        """Return the number of rows for the next request"""
+        tuner = getattr(self.llm_processor, "pack_tuner", None)
+        if tuner is not None:
+            return tuner.suggest()
+        return self.pack_size
+
+    def _window_size(self):
+        """
+        Return the number of requests to keep in flight
+
+        With a rate limiter on the LLM processor its AIMD controller sets
+        the window (never more than max_workers threads).
+        """
+        rate_limiter = getattr(self.llm_processor, "rate_limiter", None)
+        if rate_limiter is not None:
+            return max(1, min(self.max_workers, rate_limiter.concurrency.limit))
+        return self.max_workers
+
+    def _submit_rows(self, executor, rows, pending):
+        """Top up the in-flight window (see _window_size)"""
+        window = self._window_size()
+        while len(pending) < window and not self._stop_event.is_set():
+            pack_size = self._next_pack_size()
+            chunk = []
+            for row_index in rows:
+                chunk.append((row_index, self.data_handler.get_input_row(row_index)))
+                if len(chunk) >= pack_size:
+                    break
+            if not chunk:
+                return
+
+            future = executor.submit(
+                self.llm_processor.process_rows_packed, chunk, time.monotonic(),
+                pack_size=pack_size
+            )
+            pending[future] = [row_index for row_index, row_data in chunk]
+
+    def _commit(self, row_indices, future, stats, on_row_done):
+        """Write the rows of a finished request back to the DataHandler"""
+        try:
+            results = future.result()
+        except Exception as e:
+            results = {row_index: {"error": str(e)} for row_index in row_indices}
+
+        finished = []
+        failed = 0
+        for row_index in row_indices:
+            cleaned_data = results.get(row_index, {"error": "No result returned for row"})
+            self.data_handler.update_row(row_index, cleaned_data)
+            if "error" in cleaned_data:
+                stats["failed"] += 1
+                failed += 1
+            else:
+                stats["processed"] += 1
+            finished.append((row_index, cleaned_data))
+
+        # Record before the callbacks so progress lines include these rows
+        self._record_rows(len(row_indices), failed)
+        if on_row_done is not None:
+            for row_index, cleaned_data in finished:
+                on_row_done(row_index, cleaned_data)
+        self.data_handler.auto_save()
+
+    def _record_rows(self, count, failed):
+        """Report finished rows to the LLM processor's metrics collector, if any"""
+        metrics = getattr(self.llm_processor, "metrics", None)
+        if metrics is not None:
+            metrics.record_rows(count, failed)
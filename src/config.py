@@ -3,6 +3,8 @@ Configuration file for LLM Data Cleaner
 Contains prompts, model settings, and column mappings
 """
 
+import copy
+import os
 from datetime import datetime
 
 # OpenAI Model Options
@@ -44,7 +46,19 @@ OUTPUT_COLUMNS = [
     "names_outgoing",
     "gazette_references",
     "model_used",
-    "cleaning_date"
+    "cleaning_date",
+    "prompt_fingerprint",
+    "input_fingerprint",
+    "inherited_fields"
+]
+
+# Output columns describing how a row was produced rather than its content
+METADATA_COLUMNS = [
+    "model_used",
+    "cleaning_date",
+    "prompt_fingerprint",
+    "input_fingerprint",
+    "inherited_fields"
 ]
 
 # Event Classification Types
@@ -151,6 +165,234 @@ RESPONSE_FORMAT = {
     }
 }
 
+# Packed mode: several rows per request so the instructions are sent once
+PACKED_USER_PROMPT_TEMPLATE = """Please process each of the following Hungarian firm registry entries and return a JSON object with an "entries" array containing one cleaned and structured object per entry.
+
+{entries}
+
+Each object in "entries" must contain the following fields:
+{{
+    "row_id": row_id of the entry exactly as given above,
+    "cleaned_court": "Cleaned court name (if " symbol, indicate 'same as above')",
+    "cleaned_date": "Date in YYYY.MM.DD. format",
+    "legal_identifier": "Legal identifier extracted from date field",
+    "cleaned_firm_name": "Cleaned firm name with OCR errors fixed",
+    "cleaned_location": "Cleaned location name",
+    "cleaned_owners": "Cleaned owner name(s), semicolon-separated if multiple",
+    "cleaned_managers": "Cleaned manager name(s), semicolon-separated if multiple",
+    "cleaned_notes_hu": "Cleaned Hungarian text of notes with OCR errors fixed",
+    "notes_english": "English summary/translation of the notes",
+    "event_classification": 1-6 (1=firm birth, 2=firm death, 3=ownership change, 4=management change, 5=legal status change, 6=other),
+    "names_incoming": "Names entering ownership/management (from notes), semicolon-separated",
+    "names_outgoing": "Names leaving ownership/management (from notes), semicolon-separated",
+    "gazette_references": "Any references to other Central Gazette issues from notes"
+}}
+
+Important notes:
+- Process every entry independently and return exactly one object per row_id
+- Fix spacing issues in names (e.g., "P o z s o n y" → "Pozsony")
+- Preserve Hungarian characters (á, é, í, ó, ö, ő, ú, ü, ű)
+- Be precise with dates - follow Hungarian date format
+- For event classification, choose the most appropriate category
+- If multiple people are involved, separate with semicolons
+- Return ONLY valid JSON, no additional text"""
+
+PACKED_ENTRY_TEMPLATE = """Entry row_id={row_id}:
+- Court: {court}
+- Date and Legal ID: {date_and_legal_id}
+- Firm Name: {firm_name}
+- Firm Location: {firm_location}
+- Owner: {owner}
+- Managers: {managers}
+- Notes (Hungarian): {notes}
+- Source: {source}"""
+
+
+def _build_packed_response_format():
+    """Wrap the single-row schema in an array of entries tagged with row_id"""
+    entry_schema = copy.deepcopy(RESPONSE_FORMAT["json_schema"]["schema"])
+    entry_schema["properties"] = {
+        "row_id": {"type": "integer"},
+        **entry_schema["properties"]
+    }
+    entry_schema["required"] = ["row_id"] + entry_schema["required"]
+    
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "firm_registry_entries",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "entries": {"type": "array", "items": entry_schema}
+                },
+                "required": ["entries"],
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+PACKED_RESPONSE_FORMAT = _build_packed_response_format()
+
 def get_current_timestamp():
     """Return current timestamp in ISO format"""
     return datetime.now().isoformat()
+
+# Concurrent processing settings (Play mode)
+DEFAULT_MAX_WORKERS = 4
+MAX_WORKERS_LIMIT = 32
+
+# OpenAI Batch API settings (overnight processing of whole workbooks)
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = 60  # seconds between status checks
+BATCH_MAX_REQUESTS = 50000  # Batch API limit per input file
+
+# Progress saving: every row goes to an append-only journal, the Excel
+# progress file is rewritten only every N rows or T seconds
+AUTO_SAVE_EVERY_ROWS = 500
+AUTO_SAVE_INTERVAL_SECONDS = 300
+JOURNAL_FSYNC = True
+
+# LLM response cache (identical requests are answered locally)
+CACHE_ENABLED = True
+CACHE_PATH = os.path.join("output", "llm_response_cache.sqlite3")
+CACHE_MAX_ENTRIES = 500000
+CACHE_MAX_AGE_DAYS = 180
+
+# Packed mode settings (rows per request)
+DEFAULT_PACK_SIZE = 1  # 1 = one row per request (packing off)
+MAX_PACK_SIZE = 20
+PACK_TUNER_MAX_ERROR_RATE = 0.05  # Largest tolerated share of rows needing a fallback call
+PACK_TUNER_MIN_ROWS = 50  # Rows measured per pack size before moving on
+
+# Streaming input (large workbooks are read and processed chunk by chunk)
+STREAM_CHUNK_SIZE = 1000
+STREAM_PREFETCH_CHUNKS = 2
+
+# GUI refresh rate for updates coming from worker threads
+GUI_UPDATE_INTERVAL_MS = 100
+
+# Client-side rate limiting (corrected from the x-ratelimit-* response headers)
+RATE_LIMIT_REQUESTS_PER_MINUTE = 500
+RATE_LIMIT_TOKENS_PER_MINUTE = 200000
+ESTIMATED_CHARS_PER_TOKEN = 4  # Used to estimate a request's tokens before sending it
+MAX_API_RETRIES = 5  # Retries after 429, timeout, connection or 5xx errors
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+AIMD_LATENCY_SPIKE_FACTOR = 3.0  # Latency above this multiple of the average halves concurrency
+
+# Metrics: USD per 1M tokens, used for cost estimates
+MODEL_PRICING = {
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4-turbo": {"input": 10.00, "cached_input": 10.00, "output": 30.00},
+    "gpt-3.5-turbo": {"input": 0.50, "cached_input": 0.50, "output": 1.50}
+}
+METRICS_WINDOW = 10000  # Recent requests used for latency percentiles
+
+# Rule-based pre-cleaning of the input columns before the LLM call
+PRECLEAN_ENABLED = True
+RULES_MODEL_NAME = "rules"  # model_used of rows resolved without an LLM call
+
+# "Same as above" marks in these input fields are replaced by the value they
+# refer to before prompting, so every row is self-contained
+DITTO_RESOLUTION_ENABLED = True
+DITTO_COLUMNS = ["court", "firm_location", "owner", "managers"]
+DITTO_BLANK_COURT = False  # Treat an empty court cell as a ditto mark as well
+
+# Cascade mode: every row goes to the first (cheapest) model; rows failing the
+# local checks in src/validation.py are re-sent to the next, stronger model
+CASCADE_MODELS = ["gpt-4o-mini", "gpt-4o"]
+CASCADE_MIN_NAME_SIMILARITY = 0.4  # Minimum input/output firm name similarity
+
+# Partial re-ask: fields failing the validators in src/validation.py are asked
+# for again in a small follow-up request, instead of re-running the whole row
+PARTIAL_REASK_ENABLED = True
+
+# Instructions per field, as in the full prompt
+FIELD_INSTRUCTIONS = {
+    "cleaned_date": "Date in YYYY.MM.DD. format (empty string if the entry has no date)",
+    "event_classification": "1-6 (1=firm birth, 2=firm death, 3=ownership change, 4=management change, 5=legal status change, 6=other)",
+    "cleaned_owners": "Cleaned owner name(s), semicolon-separated if multiple",
+    "cleaned_managers": "Cleaned manager name(s), semicolon-separated if multiple",
+    "names_incoming": "Names entering ownership/management (from notes), semicolon-separated",
+    "names_outgoing": "Names leaving ownership/management (from notes), semicolon-separated"
+}
+
+PARTIAL_REASK_PROMPT_TEMPLATE = """Some fields of your cleaned version of the following Hungarian firm registry entry are invalid. Please return a JSON object with corrected values for these fields only.
+
+Input data:
+- Court: {court}
+- Date and Legal ID: {date_and_legal_id}
+- Firm Name: {firm_name}
+- Firm Location: {firm_location}
+- Owner: {owner}
+- Managers: {managers}
+- Notes (Hungarian): {notes}
+- Source: {source}
+
+Invalid fields (previous value, problem):
+{problems}
+
+Fields to return:
+{fields}
+
+Return ONLY valid JSON, no additional text"""
+
+# Corpus mode: a directory of workbooks processed as one job
+CORPUS_FILE_PATTERNS = ["*.xlsx", "*.xls"]
+CORPUS_PROCESSES = None  # Processes for loading/pre-cleaning and saving (None = all cores)
+
+# Shared work queue: several worker processes or hosts clean one workbook by
+# leasing disjoint row ranges from a SQLite database on a shared filesystem
+WORK_QUEUE_LEASE_SECONDS = 120  # A lease not renewed for this long is requeued
+WORK_QUEUE_CLAIM_SIZE = 50  # Rows leased per claim
+WORK_QUEUE_POLL_SECONDS = 5.0  # Wait before claiming again while others hold leases
+WORK_QUEUE_WAL = False  # WAL is faster, but only safe when all workers run on one host
+
+# Chunked export formats (parquet and arrow need pyarrow) and their extensions
+EXPORT_FORMATS = {
+    "ndjson": ".ndjson",
+    "parquet": ".parquet",
+    "arrow": ".arrow"
+}
+# Columns a Parquet export can be partitioned by (Hive-style directories)
+PARTITION_COLUMNS = {
+    "year": "year",
+    "court": "cleaned_court"
+}
+
+# Provenance fingerprints: rows whose prompt fingerprint (prompts, schemas,
+# model) or input fingerprint (prompt input fields) differ from the current
+# ones are stale and selected by --only-stale
+FINGERPRINT_VERSION = 1  # Bump to mark every row stale (e.g. after changing pre-cleaning rules)
+FINGERPRINT_LENGTH = 16  # Hex digits kept of the prompt fingerprint hash
+
+# Compact dtypes of the working DataFrame. Output columns not listed here are
+# text, stored as pandas' nullable string dtype with Python strings
+# (src/dtypes.TEXT_DTYPE), so results are written cell by cell in O(1).
+OUTPUT_COLUMN_DTYPES = {
+    "cleaned_court": "category",
+    "event_classification": "Int8",
+    "model_used": "category",
+    "cleaning_date": "datetime64[us]",
+    "prompt_fingerprint": "category",
+    "inherited_fields": "category"
+}
+CATEGORY_INPUT_FIELDS = ["court", "source"]  # Low-cardinality input columns (by INPUT_COLUMNS name)
+
+# Gazetteer: canonical courts, locations and person names learned from
+# accepted results; the entities of new results are snapped to them
+GAZETTEER_ENABLED = True
+GAZETTEER_PATH = os.path.join("output", "gazetteer.json")
+GAZETTEER_MIN_COUNT = 2  # Occurrences before a name is used as a snapping target
+GAZETTEER_CANDIDATE_SIMILARITY = 0.4  # Trigram (Dice) overlap for a name to be compared
+# Minimum edit similarity (difflib ratio) for a fuzzy match. Person names are
+# only snapped on an exact key match: "Kohn Adolfné", "ifj. Kohn Adolf" and
+# "Kohn Adolf" are different people
+GAZETTEER_THRESHOLDS = {
+    "court": 0.85,
+    "location": 0.8
+}
@@ -0,0 +1,343 @@
+"""
+Corpus Module
+Processes a directory of workbooks as one job with a shared request scheduler
+"""
+
+import glob
+import os
+import signal
+import multiprocessing
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from src.config import (
+    CORPUS_FILE_PATTERNS,
+    CORPUS_PROCESSES,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_PACK_SIZE
+)
+from src.data_handler import DataHandler, write_progress_file
+from src.concurrent_processor import ConcurrentProcessor
+from src.work_queue import workbook_key
+
+
+def find_workbooks(directory, patterns=CORPUS_FILE_PATTERNS):
+    """
+    List the workbooks of a corpus directory
+
+    Args:
+        directory: Directory holding one workbook per gazette year (or issue)
+        patterns: Glob patterns of the files to include
+
+    Returns:
+        list: Sorted workbook paths (Excel lock files "~$..." are skipped)
+
+    Raises:
+        ValueError: If two workbooks share a name ("1899.xlsx" and
+            "1899.xls" would write the same progress file and journal)
+    """
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(os.path.join(directory, pattern)))
+    paths = sorted(
+        path for path in paths
+        if os.path.isfile(path) and not os.path.basename(path).startswith("~$")
+    )
+
+    by_name = {}
+    for path in paths:
+        by_name.setdefault(workbook_key(path), []).append(os.path.basename(path))
+    collisions = [names for names in by_name.values() if len(names) > 1]
+    if collisions:
+        raise ValueError(
+            "Workbooks with the same name would share a progress file and journal: "
+            + "; ".join(" and ".join(names) for names in collisions)
+            + ". Rename or move all but one of each."
+        )
+    return paths
+
+
+def load_workbook(file_path, output_dir):
+    """
+    Load and pre-clean a workbook (runs in a worker process)
+
+    Args:
+        file_path: Path to the Excel file
+        output_dir: Directory of the progress file and journal
+
+    Returns:
+        dict: DataHandler.export_state() of the loaded workbook
+    """
+    data_handler = DataHandler()
+    data_handler.output_dir = output_dir
+    try:
+        data_handler.load_excel(file_path)
+        return data_handler.export_state()
+    finally:
+        if data_handler.journal is not None:
+            data_handler.journal.close()
+
+
+def _ignore_interrupts():
+    """Worker process initializer: Ctrl+C is handled by the parent, which still needs the pool to save"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class CorpusProcessor:
+    """
+    Processes the workbooks of a corpus through one ConcurrentProcessor
+
+    Workbooks are loaded and pre-cleaned in a process pool, a few ahead of
+    the one being processed, and their progress files are written in the
+    same pool once all of their rows are done. Every row gets a global
+    index (its workbook's offset plus its row index), so a single engine -
+    one in-flight window and one rate limiter - serves all workbooks and
+    the account's limits are shared correctly. Results are routed back to
+    each workbook's own DataHandler, journal and progress file.
+
+    The processor stands in for the DataHandler of the engine: it provides
+    get_input_row, update_row and auto_save for global indices.
+    """
+
+    def __init__(self, llm_processor, max_workers=DEFAULT_MAX_WORKERS,
+                 pack_size=DEFAULT_PACK_SIZE, processes=CORPUS_PROCESSES,
+                 output_dir="output"):
+        """
+        Initialize the corpus processor
+
+        Args:
+            llm_processor: LLMProcessor shared by all workbooks
+            max_workers: Number of requests kept in flight
+            pack_size: Rows per request; ignored if the processor has a pack_tuner
+            processes: Worker processes for loading and saving (None = all cores)
+            output_dir: Directory of the progress files and journals
+        """
+        self.engine = ConcurrentProcessor(llm_processor, self, max_workers, pack_size)
+        self.processes = processes or os.cpu_count() or 1
+        self.output_dir = output_dir
+
+        self.handlers = []    # DataHandler per workbook, in load order
+        self.errors = {}      # Path -> error of workbooks that failed to load or save
+        self._offsets = []    # First global index per workbook
+        self._remaining = []  # Rows per workbook not committed yet
+        self._next_offset = 0
+        self._pool = None
+        self._saves = {}
+        self._on_file_saved = None
+
+    def stop(self):
+        """Request stop: queued rows are cancelled, in-flight rows are finished"""
+        self.engine.stop()
+
+    @property
+    def stop_requested(self):
+        """Return True once stop() has been called"""
+        return self.engine.stop_requested
+
+    def run(self, paths, select_rows, on_row_done=None, on_file_loaded=None,
+            on_file_saved=None):
+        """
+        Process the workbooks
+
+        Args:
+            paths: Workbook paths (see find_workbooks)
+            select_rows: Function(data_handler) returning the row indices to process
+            on_row_done: Optional callback(label, cleaned_data) per finished row,
+                with labels like "1899.xlsx:42"
+            on_file_loaded: Optional callback(data_handler, row_count) per loaded workbook
+            on_file_saved: Optional callback(data_handler) per written progress file
+
+        Returns:
+            dict: Counts of processed and failed rows, files, and whether the run was stopped
+        """
+        self._on_file_saved = on_file_saved
+        callback = None
+        if on_row_done is not None:
+            callback = lambda index, cleaned_data: on_row_done(self.label(index), cleaned_data)
+
+        # Spawned workers do not inherit the locks of the engine's threads
+        context = multiprocessing.get_context("spawn")
+        processes = max(1, min(self.processes, len(paths)))
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                 initializer=_ignore_interrupts) as pool:
+            self._pool = pool
+            try:
+                rows = self._iter_rows(list(paths), processes, select_rows, on_file_loaded)
+                try:
+                    stats = self.engine.run(rows, on_row_done=callback)
+                finally:
+                    rows.close()
+
+                # Workbooks left unfinished by a stop still get their progress file
+                for file_id, data_handler in enumerate(self.handlers):
+                    if self._remaining[file_id] > 0 and data_handler.has_unsaved_rows:
+                        self._save(file_id)
+                self._finish_saves(wait_all=True)
+            finally:
+                self._pool = None
+
+        stats["files"] = len(self.handlers)
+        stats["file_errors"] = len(self.errors)
+        return stats
+
+    def _iter_rows(self, paths, processes, select_rows, on_file_loaded):
+        """
+        Yield the global indices of the rows to process, loading workbooks as needed
+
+        Up to `processes` workbooks are loaded ahead, in parallel, while the
+        engine works on the rows of the ones already loaded.
+        """
+        pending_paths = iter(paths)
+        loading = {}
+
+        def top_up():
+            while len(loading) < processes and not self.stop_requested:
+                path = next(pending_paths, None)
+                if path is None:
+                    return
+                loading[self._pool.submit(load_workbook, path, self.output_dir)] = path
+
+        top_up()
+        try:
+            while loading and not self.stop_requested:
+                done, _ = wait(loading, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = loading.pop(future)
+                    top_up()
+                    try:
+                        state = future.result()
+                    except Exception as e:
+                        self.errors[path] = str(e)
+                        print(f"Failed to load {path}: {e}")
+                        continue
+
+                    data_handler = DataHandler()
+                    data_handler.output_dir = self.output_dir
+                    data_handler.defer_saves = True
+                    data_handler.restore_state(path, state)
+
+                    row_indices = list(select_rows(data_handler))
+                    file_id = self._add(data_handler, row_indices)
+                    if on_file_loaded is not None:
+                        on_file_loaded(data_handler, len(row_indices))
+
+                    if not row_indices:
+                        # Rows replayed from the journal still need an export
+                        if data_handler.has_unsaved_rows:
+                            self._save(file_id)
+                        else:
+                            self._release(data_handler)
+                        continue
+
+                    offset = self._offsets[file_id]
+                    for row_index in row_indices:
+                        yield offset + int(row_index)
+        finally:
+            # Workbooks not started yet are not needed after a stop
+            for future in loading:
+                future.cancel()
+
+    def _add(self, data_handler, row_indices):
+        """Register a loaded workbook and return its file id"""
+        file_id = len(self.handlers)
+        self.handlers.append(data_handler)
+        self._offsets.append(self._next_offset)
+        self._remaining.append(len(row_indices))
+
+        index = data_handler.get_dataframe().index
+        self._next_offset += int(index.max()) + 1 if len(index) else 0
+        return file_id
+
+    def locate(self, index):
+        """
+        Map a global row index to its workbook
+
+        Returns:
+            tuple: (file_id, row index within the workbook)
+        """
+        # Empty workbooks share their offset with the next one; bisect_right picks the later
+        file_id = bisect_right(self._offsets, index) - 1
+        return file_id, index - self._offsets[file_id]
+
+    def label(self, index):
+        """Return "<workbook name>:<row>" for a global row index"""
+        file_id, row_index = self.locate(index)
+        return f"{os.path.basename(self.handlers[file_id].file_path)}:{row_index}"
+
+    def get_input_row(self, index):
+        """Get the input fields of a row by global index (see DataHandler.get_input_row)"""
+        file_id, row_index = self.locate(index)
+        return self.handlers[file_id].get_input_row(row_index)
+
+    def update_row(self, index, cleaned_data):
+        """
+        Update a row by global index; a finished workbook's progress file is written
+
+        Args:
+            index: Global row index
+            cleaned_data: Dictionary with cleaned data
+        """
+        file_id, row_index = self.locate(index)
+        self.handlers[file_id].update_row(row_index, cleaned_data)
+        self._remaining[file_id] -= 1
+        if self._remaining[file_id] == 0:
+            self._save(file_id)
+
+    def auto_save(self, force=False):
+        """
+        Collect the progress files written in the background
+
+        Called by the engine after each commit; each workbook is exported
+        once, when its last row is done (the journals keep the rows durable
+        until then).
+
+        Returns:
+            bool: True if a progress file was completed
+        """
+        return self._finish_saves(wait_all=force)
+
+    def _save(self, file_id):
+        """Write a workbook's progress file in the process pool"""
+        data_handler = self.handlers[file_id]
+        future = self._pool.submit(
+            write_progress_file,
+            data_handler.get_dataframe(),
+            data_handler.auto_save_path
+        )
+        self._saves[future] = file_id
+
+    def _finish_saves(self, wait_all=False):
+        """Mark completed exports as saved and release their workbooks"""
+        if not self._saves:
+            return False
+        if wait_all:
+            wait(self._saves)
+
+        completed = False
+        for future in [future for future in self._saves if future.done()]:
+            data_handler = self.handlers[self._saves.pop(future)]
+            try:
+                future.result()
+            except Exception as e:
+                # close() below retries the export in this process
+                self.errors[data_handler.file_path] = f"Saving failed: {e}"
+                print(f"Saving {data_handler.auto_save_path} failed: {e}")
+            else:
+                data_handler.mark_saved()
+                completed = True
+                if self._on_file_saved is not None:
+                    self._on_file_saved(data_handler)
+            self._release(data_handler)
+        return completed
+
+    @staticmethod
+    def _release(data_handler):
+        """
+        Close a finished workbook's journal and drop its rows
+
+        Only the path and counts stay in the parent process, so a long
+        corpus does not accumulate every workbook's frame.
+        """
+        data_handler.close()
+        data_handler.df = None
+        data_handler.input_fields = None
+        data_handler.status_index = None
@@ -6,8 +6,53 @@ Handles Excel and JSON file operations
 import pandas as pd
 import json
 import os
+import time
 from datetime import datetime
-from src.config import OUTPUT_COLUMNS
+from openpyxl import Workbook
+from src.config import (
+    INPUT_COLUMNS,
+    OUTPUT_COLUMNS,
+    AUTO_SAVE_EVERY_ROWS,
+    AUTO_SAVE_INTERVAL_SECONDS,
+    JOURNAL_FSYNC,
+    STREAM_CHUNK_SIZE,
+    PRECLEAN_ENABLED,
+    DITTO_RESOLUTION_ENABLED,
+    EXPORT_FORMATS
+)
+from src.row_journal import RowJournal
+from src.row_status import RowStatusIndex, PENDING, DONE, FAILED
+from src.streaming_reader import iter_excel_chunks, prefetch_chunks
+from src.preclean import preclean_frame, input_fields_frame, resolve_ditto_marks
+from src.exporters import export_chunks
+from src.fingerprint import FINGERPRINT_FIELDS, INPUT_FINGERPRINT, input_fingerprints
+from src.dtypes import (
+    compact_input_columns,
+    compact_output_columns,
+    set_value,
+    json_records
+)
+
+
+class LoadCancelled(Exception):
+    """Raised by DataHandler.load_excel when its cancel_event is set"""
+
+
+def write_progress_file(df, path):
+    """
+    Write a DataFrame to the progress file
+    
+    Writes next to the target and swaps, so a crash never leaves a torn
+    file. A plain function, so it can run in a worker process.
+    
+    Args:
+        df: pandas.DataFrame to export
+        path: Progress file path (.xlsx)
+    """
+    root, ext = os.path.splitext(path)
+    temp_path = f"{root}.tmp{ext}"
+    df.to_excel(temp_path, index=False, engine='openpyxl')
+    os.replace(temp_path, path)
 
 
 class DataHandler:
@@ -19,59 +64,292 @@ class DataHandler:
         self.file_path = None
         self.output_dir = "output"
         self.auto_save_path = None
+        self.journal = None
+        self.status_index = None
+        self.input_fields = None
+        self._ditto_carry = None
+        self.has_progress = False
+        self.streaming = False
+        # Only export on request (the caller writes the progress file, e.g. corpus mode)
+        self.defer_saves = False
+        # Never write the progress file or journal (queue workers, see load_excel)
+        self.read_only = False
+        self._rows_since_save = 0
+        self._last_save_time = time.monotonic()
         
         # Create output directory if it doesn't exist
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
     
-    def load_excel(self, file_path):
+    def load_excel(self, file_path, read_only=False, on_chunk=None, cancel_event=None):
         """
         Load Excel file
         
+        With on_chunk or cancel_event the workbook is read chunk by chunk
+        (see streaming_reader.iter_excel_chunks), for loading on a
+        background thread with progress. The previously loaded workbook
+        stays in place until the new one has been read completely.
+        
         Args:
             file_path: Path to Excel file
+            read_only: Only read the workbook and its progress; results are
+                written elsewhere (e.g. a work queue) and never exported
+            on_chunk: Optional callback(chunk) per chunk of STREAM_CHUNK_SIZE rows read
+            cancel_event: Optional threading.Event; LoadCancelled is raised once it is set
             
         Returns:
             pandas.DataFrame: Loaded data
         """
         try:
-            self.file_path = file_path
-            
-            # Generate fixed auto-save path based on input filename
-            base_name = os.path.basename(file_path)
-            name, ext = os.path.splitext(base_name)
-            self.auto_save_path = os.path.join(self.output_dir, f"{name}_cleaned.xlsx")
-            
             # Check if auto-saved file exists and load it instead
-            if os.path.exists(self.auto_save_path):
-                print(f"Found existing progress file: {self.auto_save_path}")
-                self.df = pd.read_excel(self.auto_save_path, engine='openpyxl')
+            progress_path = self._progress_file_path(file_path)
+            has_progress = os.path.exists(progress_path)
+            if has_progress:
+                print(f"Found existing progress file: {progress_path}")
+            source_path = progress_path if has_progress else file_path
+            
+            if on_chunk is not None or cancel_event is not None:
+                df = self._read_chunked(source_path, on_chunk, cancel_event)
+            elif has_progress:
+                df = pd.read_excel(progress_path, engine='openpyxl')
             else:
                 # Load original file
                 if file_path.endswith('.xlsx'):
-                    self.df = pd.read_excel(file_path, engine='openpyxl')
+                    df = pd.read_excel(file_path, engine='openpyxl')
                 elif file_path.endswith('.xls'):
-                    self.df = pd.read_excel(file_path, engine='xlrd')
+                    df = pd.read_excel(file_path, engine='xlrd')
                 else:
                     # Try both engines
                     try:
-                        self.df = pd.read_excel(file_path, engine='openpyxl')
+                        df = pd.read_excel(file_path, engine='openpyxl')
                     except:
-                        self.df = pd.read_excel(file_path, engine='xlrd')
+                        df = pd.read_excel(file_path, engine='xlrd')
+            
+            self._open_output_files(file_path)
+            self.streaming = False
+            self.has_progress = has_progress
+            self.df = df
             
             # Initialize output columns if they don't exist
+            compact_input_columns(self.df)
             self._initialize_output_columns()
             
+            # Replay rows processed since the last Excel export
+            replayed = self.journal.replay()
+            for index, cleaned_data in replayed:
+                self._apply_row(index, cleaned_data)
+            if replayed:
+                self.has_progress = True
+            
+            self.read_only = read_only
+            if read_only:
+                self.journal.close()
+                self.journal = None
+            
+            self.status_index = RowStatusIndex.from_dataframe(self.df)
+            self._prepare_input_fields()
+            
+            # Replayed rows are not in the Excel file yet
+            self._rows_since_save = len(replayed)
+            self._last_save_time = time.monotonic()
+            
             return self.df
             
+        except LoadCancelled:
+            raise
         except Exception as e:
             raise Exception(f"Failed to load Excel file: {e}")
     
+    @staticmethod
+    def _read_chunked(path, on_chunk, cancel_event):
+        """Read a whole workbook chunk by chunk, reporting each chunk (see load_excel)"""
+        chunks = []
+        for chunk in iter_excel_chunks(path):
+            if cancel_event is not None and cancel_event.is_set():
+                raise LoadCancelled(path)
+            chunks.append(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk)
+        if cancel_event is not None and cancel_event.is_set():
+            raise LoadCancelled(path)
+        
+        if not chunks:
+            # No data rows: read the header only
+            return pd.read_excel(path, engine='xlrd' if path.endswith('.xls') else 'openpyxl')
+        return pd.concat(chunks)
+    
+    def iter_excel_chunks(self, file_path, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Load an Excel file in streaming mode, one chunk at a time
+        
+        Only the current chunk is held in memory (plus a small number of
+        chunks parsed ahead on a background thread). Each chunk becomes the
+        working DataFrame, with global row labels, so get_row and update_row
+        work as usual for its rows. Results go to the journal only; the
+        progress file is written by close() / auto_save(force=True), which
+        streams the workbook again and merges the journal.
+        
+        Args:
+            file_path: Path to Excel file
+            chunk_size: Rows per chunk
+            
+        Yields:
+            pandas.DataFrame: The working DataFrame for the next chunk
+        """
+        self._open_output_files(file_path)
+        self.streaming = True
+        
+        source_path = self._stream_source_path()
+        self.has_progress = source_path == self.auto_save_path
+        
+        # Journaled rows since the last export, by file offset
+        journal_offsets = self.journal.build_index()
+        if journal_offsets:
+            self.has_progress = True
+        self._rows_since_save = len(journal_offsets)
+        self._last_save_time = time.monotonic()
+        
+        # Ditto marks at the top of a chunk refer to rows of the previous one
+        self._ditto_carry = None
+        
+        for chunk in prefetch_chunks(iter_excel_chunks(source_path, chunk_size)):
+            self.df = chunk
+            compact_input_columns(self.df)
+            self._initialize_output_columns()
+            self._apply_journal_entries(journal_offsets)
+            self.status_index = RowStatusIndex.from_dataframe(self.df)
+            self._prepare_input_fields(carry_over=True)
+            yield self.df
+    
+    def export_state(self):
+        """
+        Return the loaded workbook as a picklable state
+        
+        Used to load and pre-clean a workbook in another process (corpus
+        mode); restore_state() adopts it.
+        
+        Returns:
+            dict: DataFrame, prepared input fields and progress counters
+        """
+        return {
+            "df": self.df,
+            "input_fields": self.input_fields,
+            "has_progress": self.has_progress,
+            "rows_since_save": self._rows_since_save
+        }
+    
+    def restore_state(self, file_path, state):
+        """
+        Adopt a workbook loaded by load_excel() in another process
+        
+        Args:
+            file_path: Path to the Excel file the state was loaded from
+            state: Result of export_state()
+        """
+        self._open_output_files(file_path)
+        self.streaming = False
+        self.df = state["df"]
+        self.input_fields = state["input_fields"]
+        self.has_progress = state["has_progress"]
+        self.status_index = RowStatusIndex.from_dataframe(self.df)
+        
+        # Rows replayed from the journal are not in the Excel file yet
+        self._rows_since_save = state["rows_since_save"]
+        self._last_save_time = time.monotonic()
+    
+    def _progress_file_path(self, file_path):
+        """Return the fixed auto-save path of an input file"""
+        name, ext = os.path.splitext(os.path.basename(file_path))
+        return os.path.join(self.output_dir, f"{name}_cleaned.xlsx")
+    
+    def _open_output_files(self, file_path):
+        """Set the progress file path for an input file and open its journal"""
+        self.file_path = file_path
+        
+        # Generate fixed auto-save path based on input filename
+        self.auto_save_path = self._progress_file_path(file_path)
+        name, ext = os.path.splitext(os.path.basename(file_path))
+        journal_path = os.path.join(self.output_dir, f"{name}_journal.jsonl")
+        
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = RowJournal(journal_path, fsync=JOURNAL_FSYNC)
+    
+    def _stream_source_path(self):
+        """Return the progress file if it exists, else the input file"""
+        if os.path.exists(self.auto_save_path):
+            return self.auto_save_path
+        return self.file_path
+    
+    def _apply_journal_entries(self, journal_offsets):
+        """Apply journaled results for the rows of the current chunk"""
+        offsets = [
+            journal_offsets[index]
+            for index in self.df.index
+            if index in journal_offsets
+        ]
+        for index, cleaned_data in self.journal.read_entries(offsets):
+            self._apply_row(index, cleaned_data)
+    
+    def iter_output_chunks(self, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Yield the workbook with its results, one chunk at a time
+        
+        In streaming mode the source workbook is streamed again and the
+        journaled results are merged into each chunk (the working DataFrame
+        is replaced as it goes); otherwise the loaded DataFrame is sliced.
+        
+        Args:
+            chunk_size: Rows per chunk
+            
+        Yields:
+            pandas.DataFrame: Input and output columns of the next rows
+        """
+        if not self.streaming:
+            for start in range(0, len(self.df), chunk_size):
+                yield self.df.iloc[start:start + chunk_size]
+            return
+        
+        journal_offsets = self.journal.build_index() if self.journal is not None else {}
+        for chunk in iter_excel_chunks(self._stream_source_path(), chunk_size):
+            self.df = chunk
+            self._initialize_output_columns()
+            if journal_offsets:
+                self._apply_journal_entries(journal_offsets)
+            yield self.df
+    
+    def _export_stream(self):
+        """
+        Write the progress file chunk by chunk from the source workbook and the journal
+        
+        Returns:
+            bool: True if the Excel file was written
+        """
+        root, ext = os.path.splitext(self.auto_save_path)
+        temp_path = f"{root}.tmp{ext}"
+        
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        header_written = False
+        
+        for chunk in self.iter_output_chunks():
+            if not header_written:
+                sheet.append(list(chunk.columns))
+                header_written = True
+            for values in chunk.itertuples(index=False, name=None):
+                sheet.append([None if pd.isna(value) else value for value in values])
+        
+        workbook.save(temp_path)
+        os.replace(temp_path, self.auto_save_path)
+        self.journal.truncate()
+        
+        self._rows_since_save = 0
+        self._last_save_time = time.monotonic()
+        return True
+    
     def _initialize_output_columns(self):
-        """Add output columns to dataframe if they don't exist"""
-        for col in OUTPUT_COLUMNS:
-            if col not in self.df.columns:
-                self.df[col] = ""
+        """Add output columns to dataframe if they don't exist, with their compact dtypes"""
+        compact_output_columns(self.df)
     
     def get_row(self, index):
         """
@@ -86,10 +364,64 @@ class DataHandler:
         if self.df is None:
             raise ValueError("No data loaded")
         
-        if index < 0 or index >= len(self.df):
+        if index not in self.df.index:
             raise IndexError(f"Row index {index} out of range")
         
-        return self.df.iloc[index]
+        # Row labels equal positions, except for chunks in streaming mode
+        return self.df.loc[index]
+    
+    def get_input_row(self, index):
+        """
+        Get the input fields of a row for the LLM
+        
+        Returns the prepared input fields: pre-cleaned (normalized text plus
+        the date and legal identifier recognized by the rules) if enabled,
+        with ditto marks resolved if enabled. With both stages off, the raw
+        row is returned as get_row does.
+        
+        Args:
+            index: Row index
+            
+        Returns:
+            dict or pandas.Series: Input fields of the row
+        """
+        if self.input_fields is None:
+            return self.get_row(index)
+        
+        if index not in self.input_fields.index:
+            raise IndexError(f"Row index {index} out of range")
+        
+        return self.input_fields.loc[index].to_dict()
+    
+    def _prepare_input_fields(self, carry_over=False):
+        """
+        Build the input fields of the working DataFrame for prompting
+        
+        Runs the vectorized pre-cleaning and ditto mark resolution over
+        whole columns. Inherited cells are listed per row in the
+        inherited_fields column, and the input fingerprint of each row is
+        hashed once here rather than per result.
+        
+        Args:
+            carry_over: Resolve ditto marks at the top from the previous chunk
+        """
+        if not PRECLEAN_ENABLED and not DITTO_RESOLUTION_ENABLED:
+            self.input_fields = None
+            return
+        
+        if PRECLEAN_ENABLED:
+            fields = preclean_frame(self.df)
+        else:
+            fields = input_fields_frame(self.df, normalize=False)
+        
+        if DITTO_RESOLUTION_ENABLED:
+            self._ditto_carry = resolve_ditto_marks(
+                fields,
+                carry=self._ditto_carry if carry_over else None
+            )
+        
+        fields[INPUT_FINGERPRINT] = input_fingerprints(fields)
+        self.input_fields = fields
     
     def update_row(self, index, cleaned_data):
         """
@@ -102,22 +434,88 @@ class DataHandler:
         if self.df is None:
             raise ValueError("No data loaded")
         
-        # Update each output column
+        self._apply_row(index, cleaned_data)
+        if self.status_index is not None:
+            self.status_index.set(index, FAILED if "error" in cleaned_data else DONE)
+        
+        # Record the update durably; the Excel file is rewritten later
+        if self.journal is not None:
+            self.journal.append(index, cleaned_data)
+        self._rows_since_save += 1
+    
+    def _apply_row(self, index, cleaned_data):
+        """Write cleaned data into the output columns of a row"""
         for col in OUTPUT_COLUMNS:
             if col in cleaned_data:
-                self.df.at[index, col] = cleaned_data[col]
+                set_value(self.df, index, col, cleaned_data[col])
     
-    def auto_save(self):
+    def auto_save(self, force=False):
         """
-        Auto-save the current dataframe to the fixed output path
+        Export progress to the fixed output path when it is due
+        
+        Every processed row is already in the journal, so the Excel file is
+        only rewritten every AUTO_SAVE_EVERY_ROWS rows or
+        AUTO_SAVE_INTERVAL_SECONDS seconds, or when force is set.
+        
+        Args:
+            force: Export now regardless of the interval
+            
+        Returns:
+            bool: True if the Excel file was written
         """
-        if self.df is None or self.auto_save_path is None:
-            return
+        if self.df is None or self.auto_save_path is None or self.read_only:
+            return False
+        
+        if self.defer_saves and not force:
+            return False
+        
+        # In streaming mode only a chunk is in memory; export only on request
+        if self.streaming:
+            if not force:
+                return False
+            try:
+                return self._export_stream()
+            except Exception as e:
+                print(f"Auto-save failed: {e}")
+                return False
+        
+        if not force:
+            if self._rows_since_save == 0:
+                return False
+            elapsed = time.monotonic() - self._last_save_time
+            if (self._rows_since_save < AUTO_SAVE_EVERY_ROWS
+                    and elapsed < AUTO_SAVE_INTERVAL_SECONDS):
+                return False
         
         try:
-            self.df.to_excel(self.auto_save_path, index=False, engine='openpyxl')
+            write_progress_file(self.df, self.auto_save_path)
+            self.mark_saved()
+            return True
         except Exception as e:
             print(f"Auto-save failed: {e}")
+            return False
+    
+    def mark_saved(self):
+        """Record that the progress file holds every row (truncates the journal)"""
+        # Everything in the journal is now in the Excel file
+        if self.journal is not None:
+            self.journal.truncate()
+        
+        self._rows_since_save = 0
+        self._last_save_time = time.monotonic()
+    
+    @property
+    def has_unsaved_rows(self):
+        """Return True if rows were updated since the last export"""
+        return self._rows_since_save > 0
+    
+    def close(self):
+        """Export pending progress and close the journal"""
+        if self._rows_since_save > 0:
+            self.auto_save(force=True)
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
     
     def save_excel(self, output_path=None):
         """
@@ -170,8 +568,8 @@ class DataHandler:
                 f"{name}_cleaned_{timestamp}.json"
             )
         
-        # Convert to JSON (orient='records' gives list of dicts)
-        json_data = self.df.to_dict(orient='records')
+        # Convert to JSON (list of dicts; timestamps as ISO strings, missing cells as null)
+        json_data = json_records(self.df)
         
         # Save to file with proper formatting
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -179,6 +577,70 @@ class DataHandler:
         
         return output_path
     
+    def _export_path(self, extension):
+        """Return a timestamped output path next to the progress file"""
+        base_name = os.path.basename(self.file_path)
+        name, ext = os.path.splitext(base_name)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.output_dir, f"{name}_cleaned_{timestamp}{extension}")
+    
+    def save_ndjson(self, output_path=None):
+        """
+        Save the workbook as newline-delimited JSON, chunk by chunk
+        
+        Args:
+            output_path: Output file path (optional)
+            
+        Returns:
+            str: Path where file was saved
+        """
+        if self.df is None:
+            raise ValueError("No data to save")
+        
+        if output_path is None:
+            output_path = self._export_path(EXPORT_FORMATS["ndjson"])
+        export_chunks(self.iter_output_chunks(), output_path, "ndjson")
+        return output_path
+    
+    def save_parquet(self, output_path=None, partition_by=None):
+        """
+        Save the workbook as Parquet, one row group per chunk (needs pyarrow)
+        
+        Args:
+            output_path: Output file path (optional); a directory when partitioned
+            partition_by: None, "year" or "court" (see PARTITION_COLUMNS)
+            
+        Returns:
+            str: Path where file was saved
+        """
+        if self.df is None:
+            raise ValueError("No data to save")
+        
+        if output_path is None:
+            extension = "" if partition_by else EXPORT_FORMATS["parquet"]
+            output_path = self._export_path(extension)
+        export_chunks(self.iter_output_chunks(), output_path, "parquet",
+                      partition_by=partition_by)
+        return output_path
+    
+    def save_arrow(self, output_path=None):
+        """
+        Save the workbook as an Arrow IPC file (needs pyarrow)
+        
+        Args:
+            output_path: Output file path (optional)
+            
+        Returns:
+            str: Path where file was saved
+        """
+        if self.df is None:
+            raise ValueError("No data to save")
+        
+        if output_path is None:
+            output_path = self._export_path(EXPORT_FORMATS["arrow"])
+        export_chunks(self.iter_output_chunks(), output_path, "arrow")
+        return output_path
+    
     def get_dataframe(self):
         """Return the current dataframe"""
         return self.df
@@ -189,23 +651,122 @@ class DataHandler:
             return 0
         return len(self.df)
     
-    def find_first_unprocessed_row(self):
+    def find_first_unprocessed_row(self, start=None):
         """
         Find the first row that hasn't been processed yet
         
+        Args:
+            start: Row index to search from (optional)
+            
         Returns:
             int: Index of first unprocessed row, or -1 if all rows are processed
         """
-        if self.df is None:
+        if self.df is None or self.status_index is None:
             return -1
         
-        # Check for rows where the cleaning_date column is empty
-        for idx in range(len(self.df)):
-            if pd.isna(self.df.at[idx, 'cleaning_date']) or str(self.df.at[idx, 'cleaning_date']).strip() == '':
-                return idx
+        return self.status_index.next_pending(start)
+    
+    def find_unprocessed_rows(self, start=None, end=None, include_failed=False):
+        """
+        Find all rows that haven't been processed yet
+        
+        Args:
+            start: First row index (optional)
+            end: Stop before this row index (optional)
+            include_failed: Also return rows whose last attempt failed
+            
+        Returns:
+            list: Row indices
+        """
+        if self.df is None or self.status_index is None:
+            return []
+        
+        statuses = (PENDING, FAILED) if include_failed else PENDING
+        return self.status_index.rows_with_status(statuses, start, end)
+    
+    def find_stale_rows(self, prompt_fingerprints, start=None, end=None, include_failed=False):
+        """
+        Find the rows that need (re)processing after a prompt or input change
+        
+        Pending rows are returned, and processed rows whose prompt
+        fingerprint is not one of prompt_fingerprints (other prompts, schema
+        or model, or no fingerprint at all) or whose input fingerprint no
+        longer matches their prompt input fields.
+        
+        Args:
+            prompt_fingerprints: Current prompt fingerprints (one per model a
+                row may be answered by, see fingerprint.prompt_fingerprint)
+            start: First row index (optional)
+            end: Stop before this row index (optional)
+            include_failed: Also return rows whose last attempt failed
+            
+        Returns:
+            list: Row indices
+        """
+        if self.df is None or self.status_index is None:
+            return []
+        
+        pending = (PENDING, FAILED) if include_failed else PENDING
+        rows = set(self.status_index.rows_with_status(pending, start, end))
+        
+        done = self.status_index.rows_with_status(DONE, start, end)
+        if done:
+            results = self.df.loc[done]
+            if self.input_fields is not None:
+                current = self.input_fields.loc[done, INPUT_FINGERPRINT]
+            else:
+                current = input_fingerprints(self._fingerprint_fields().loc[done])
+            stale = (
+                ~results["prompt_fingerprint"].isin(list(prompt_fingerprints))
+                | (results["input_fingerprint"].astype(str) != current)
+            )
+            rows.update(stale.index[stale.to_numpy()].tolist())
+        
+        return sorted(rows)
+    
+    def accepted_results(self):
+        """
+        Return the output and prompt input fields of the processed rows
+        
+        Used to build the gazetteer from a workbook's earlier results.
         
-        # All rows processed
-        return -1
+        Returns:
+            tuple: (results, input fields) DataFrames of the done rows
+                (None, None if nothing is loaded)
+        """
+        if self.df is None or self.status_index is None:
+            return None, None
+        
+        done = self.status_index.rows_with_status(DONE)
+        return self.df.loc[done, OUTPUT_COLUMNS], self._fingerprint_fields().loc[done]
+    
+    def _fingerprint_fields(self):
+        """Return the prompt input fields of the working DataFrame, as the LLM gets them"""
+        if self.input_fields is not None:
+            return self.input_fields
+        
+        # Raw rows are read by position and converted with str(), as in
+        # LLMProcessor._extract_input_fields
+        fields = {}
+        for position, name in INPUT_COLUMNS.items():
+            if name not in FINGERPRINT_FIELDS:
+                continue
+            if position < len(self.df.columns):
+                fields[name] = self.df.iloc[:, position].astype(object).map(str)
+            else:
+                fields[name] = pd.Series("", index=self.df.index, dtype=object)
+        return pd.DataFrame(fields, index=self.df.index)
+    
+    def get_status_counts(self):
+        """
+        Return the number of pending, done, failed and skipped rows
+        
+        Returns:
+            dict: Status name -> count
+        """
+        if self.status_index is None:
+            return {"pending": 0, "done": 0, "failed": 0, "skipped": 0}
+        return self.status_index.counts()
     
     def export_row_json(self, index):
         """
@@ -220,5 +781,5 @@ class DataHandler:
         if self.df is None:
             raise ValueError("No data loaded")
         
-        row = self.df.iloc[index].to_dict()
+        row = json_records(self.df.iloc[[index]])[0]
         return json.dumps(row, ensure_ascii=False, indent=2)
@@ -0,0 +1,169 @@
+"""
+Dtypes Module
+Compact column dtypes of the working DataFrame and value conversion for them
+"""
+
+import json
+import pandas as pd
+from src.config import (
+    INPUT_COLUMNS,
+    OUTPUT_COLUMNS,
+    OUTPUT_COLUMN_DTYPES,
+    CATEGORY_INPUT_FIELDS
+)
+
+# Nullable integer range of the "Int8" dtype
+_INT8_RANGE = (-128, 127)
+
+# Text output columns: pandas' nullable string dtype. Unlike "str" (and
+# object), missing values stay <NA> on pandas 2 and 3 alike instead of
+# becoming the text "nan". The Python storage keeps set_value O(1); an Arrow
+# array is immutable, so each cell write would copy the column. The
+# exporters convert to Arrow once per chunk.
+TEXT_DTYPE = pd.StringDtype("python")
+
+
+def output_dtype(column):
+    """Return the dtype of an output column"""
+    return OUTPUT_COLUMN_DTYPES.get(column, TEXT_DTYPE)
+
+
+def empty_output_column(column, index):
+    """Return an all-missing output column of the right dtype"""
+    return pd.Series(None, index=index, dtype=object).astype(output_dtype(column))
+
+
+def to_dtype(values, dtype):
+    """
+    Convert a column to a compact dtype
+
+    Values that do not fit (e.g. text in the event class, unparsable
+    timestamps) become missing.
+
+    Args:
+        values: pandas Series
+        dtype: "category", "Int8", a datetime64 dtype or TEXT_DTYPE
+
+    Returns:
+        pandas.Series: Converted column
+    """
+    if dtype == TEXT_DTYPE:
+        if values.dtype == TEXT_DTYPE:
+            return values
+        # Missing cells of object or "str" columns (None, NaN) become <NA>, not "nan"
+        text = values.astype(object).where(values.notna(), None)
+        return text.map(lambda v: v if v is None or isinstance(v, str) else str(v)).astype(TEXT_DTYPE)
+    if dtype == "category":
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return values
+        return values.astype("category")
+    if dtype == "Int8":
+        numbers = pd.to_numeric(values, errors="coerce")
+        valid = numbers.between(*_INT8_RANGE) & (numbers % 1 == 0)
+        return numbers.where(valid).astype("Int8")
+    if str(dtype).startswith("datetime64"):
+        if values.dtype == dtype:
+            return values
+        text = values.astype(object).where(values.notna(), None)
+        return pd.to_datetime(text, errors="coerce", format="ISO8601").astype(dtype)
+    return values.astype(dtype)
+
+
+def compact_input_columns(df):
+    """
+    Store low-cardinality input columns (court, source) as categoricals, in place
+
+    Input columns are addressed by position, as everywhere else. The other
+    input columns keep the dtype they were read with (object on pandas 2,
+    "str" on pandas 3, which is Arrow-backed with pyarrow), because prompts
+    and fingerprints use their str() values.
+
+    Args:
+        df: pandas.DataFrame as loaded by DataHandler
+    """
+    input_count = len([col for col in df.columns if col not in OUTPUT_COLUMNS])
+    for position, name in INPUT_COLUMNS.items():
+        if name in CATEGORY_INPUT_FIELDS and position < input_count:
+            column = df.columns[position]
+            df[column] = to_dtype(df[column], "category")
+
+
+def compact_output_columns(df):
+    """
+    Add missing output columns and convert all of them to their compact dtypes, in place
+
+    Args:
+        df: pandas.DataFrame with input (and possibly output) columns
+    """
+    for col in OUTPUT_COLUMNS:
+        if col not in df.columns:
+            df[col] = empty_output_column(col, df.index)
+        else:
+            df[col] = to_dtype(df[col], output_dtype(col))
+
+
+def coerce_value(column, value):
+    """
+    Convert a result value for an output column
+
+    Args:
+        column: Output column name
+        value: Value from a result dict (LLM answer, journal entry, ...)
+
+    Returns:
+        Value the column's dtype accepts (pd.NA / pd.NaT for missing)
+    """
+    dtype = output_dtype(column)
+    if dtype == "Int8":
+        if value is None or value == "" or isinstance(value, bool):
+            return pd.NA
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            return pd.NA
+        return number if _INT8_RANGE[0] <= number <= _INT8_RANGE[1] else pd.NA
+    if str(dtype).startswith("datetime64"):
+        if value is None or value == "":
+            return pd.NaT
+        try:
+            return pd.Timestamp(value)
+        except (TypeError, ValueError):
+            return pd.NaT
+    if value is None:
+        return pd.NA
+    return value if isinstance(value, str) else str(value)
+
+
+def set_value(df, index, column, value):
+    """
+    Set one output cell, adding the value to a categorical column's categories if needed
+
+    Args:
+        df: Working DataFrame
+        index: Row label
+        column: Output column name
+        value: Value from a result dict
+    """
+    value = coerce_value(column, value)
+    values = df[column]
+    if (isinstance(values.dtype, pd.CategoricalDtype) and value is not pd.NA
+            and value not in values.cat.categories):
+        df[column] = values.cat.add_categories([value])
+    df.at[index, column] = value
+
+
+def json_records(df):
+    """
+    Return the rows of a DataFrame as JSON-compatible dicts
+
+    Missing values become None and timestamps ISO strings, whatever the
+    column dtypes.
+
+    Args:
+        df: pandas.DataFrame
+
+    Returns:
+        list: One dict per row
+    """
+    return json.loads(df.to_json(orient="records", date_format="iso", date_unit="us",
+                               force_ascii=False))
@@ -0,0 +1,271 @@
+"""
+Exporters Module
+Chunked NDJSON, Parquet and Arrow IPC export of cleaned workbooks
+"""
+
+import os
+import re
+import pandas as pd
+from src.config import OUTPUT_COLUMNS, PARTITION_COLUMNS
+
+_YEAR = re.compile(r"^(\d{4})\.")
+
+# Output columns with a type other than text
+_INTEGER_COLUMNS = ["event_classification"]
+_DATETIME_COLUMNS = ["cleaning_date"]
+
+
+def _require_pyarrow():
+    """Import pyarrow, with an installation hint if it is missing"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError(
+            "Parquet and Arrow export need pyarrow. Install it with: pip install pyarrow"
+        )
+    return pyarrow
+
+
+def typed_frame(df):
+    """
+    Convert a workbook chunk to export dtypes
+
+    Text columns (all input and most output columns) become pandas string
+    columns, event_classification a nullable integer and cleaning_date a
+    datetime, so every chunk of a workbook has the same schema. Empty
+    cells become missing values.
+
+    Args:
+        df: pandas.DataFrame chunk (input and output columns)
+
+    Returns:
+        pandas.DataFrame: Typed copy with string column names
+    """
+    typed = {}
+    for column in df.columns:
+        values = df[column]
+        name = str(column)
+        if name in _INTEGER_COLUMNS:
+            typed[name] = pd.to_numeric(values, errors="coerce").astype("Int64")
+        elif name in _DATETIME_COLUMNS:
+            typed[name] = pd.to_datetime(values, errors="coerce", format="ISO8601")
+        else:
+            text = values.astype(object).where(values.notna(), None)
+            typed[name] = text.map(lambda v: None if v is None or v == "" else str(v)).astype("string")
+    return pd.DataFrame(typed, index=df.index)
+
+
+def add_partition_column(df, partition_by):
+    """
+    Add the column a Parquet export is partitioned by
+
+    "year" is taken from cleaned_date (YYYY.MM.DD.); "court" is cleaned_court.
+    Rows without a value go to the "unknown" partition.
+
+    Args:
+        df: Typed chunk (see typed_frame)
+        partition_by: Key of PARTITION_COLUMNS
+
+    Returns:
+        str: Name of the partition column
+    """
+    column = PARTITION_COLUMNS[partition_by]
+    if partition_by == "year":
+        dates = df["cleaned_date"] if "cleaned_date" in df.columns else pd.Series(pd.NA, index=df.index)
+        df[column] = dates.str.extract(_YEAR, expand=False).fillna("unknown").astype("string")
+    elif column in df.columns:
+        df[column] = df[column].fillna("unknown")
+    else:
+        df[column] = pd.Series("unknown", index=df.index, dtype="string")
+    return column
+
+
+def _temp_path(path):
+    """Return the path a file is written to before it replaces path"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.tmp{ext}"
+
+
+def _remove_temp(temp_path):
+    """Remove the partial file of a failed export"""
+    try:
+        os.remove(temp_path)
+    except OSError:
+        pass
+
+
+def write_ndjson(chunks, path):
+    """
+    Write chunks as newline-delimited JSON, one row per line
+
+    Only one chunk is converted at a time; the file is written next to the
+    target and swapped in when complete.
+
+    Args:
+        chunks: Iterable of pandas.DataFrame chunks
+        path: Output path
+
+    Returns:
+        int: Number of rows written
+    """
+    rows = 0
+    temp_path = _temp_path(path)
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                if chunk.empty:
+                    continue
+                typed = typed_frame(chunk)
+                text = typed.to_json(orient="records", lines=True, force_ascii=False,
+                                     date_format="iso")
+                f.write(text if text.endswith("\n") else text + "\n")
+                rows += len(typed)
+    except BaseException:
+        _remove_temp(temp_path)
+        raise
+    os.replace(temp_path, path)
+    return rows
+
+
+def _to_table(pa, chunk, schema=None):
+    """Convert a typed chunk to an Arrow table (cast to schema if given)"""
+    table = pa.Table.from_pandas(chunk, preserve_index=False)
+    if schema is not None:
+        table = table.cast(schema)
+    return table
+
+
+def write_parquet(chunks, path, partition_by=None):
+    """
+    Write chunks to Parquet, one row group per chunk
+
+    With partition_by the output is a directory of Parquet files,
+    partitioned Hive-style (year=1899/..., cleaned_court=Budapest/...),
+    which pandas, pyarrow and DuckDB read as one dataset.
+
+    Args:
+        chunks: Iterable of pandas.DataFrame chunks
+        path: Output file (or directory when partitioned)
+        partition_by: None, "year" or "court"
+
+    Returns:
+        int: Number of rows written
+    """
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    rows = 0
+    if partition_by is not None:
+        partition_column = None
+        for number, chunk in enumerate(chunks):
+            if chunk.empty:
+                continue
+            typed = typed_frame(chunk)
+            partition_column = add_partition_column(typed, partition_by)
+            pq.write_to_dataset(
+                _to_table(pa, typed),
+                root_path=path,
+                partition_cols=[partition_column],
+                basename_template=f"part-{number:05d}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore"
+            )
+            rows += len(typed)
+        return rows
+
+    temp_path = _temp_path(path)
+    writer = None
+    try:
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            typed = typed_frame(chunk)
+            if writer is None:
+                table = _to_table(pa, typed)
+                writer = pq.ParquetWriter(temp_path, table.schema)
+            else:
+                table = _to_table(pa, typed, writer.schema)
+            writer.write_table(table)
+            rows += len(typed)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            writer = None
+        _remove_temp(temp_path)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        # No rows: still write a valid file with the output columns
+        empty = typed_frame(pd.DataFrame(columns=OUTPUT_COLUMNS))
+        pq.write_table(_to_table(pa, empty), temp_path)
+    os.replace(temp_path, path)
+    return rows
+
+
+def write_arrow(chunks, path):
+    """
+    Write chunks to an Arrow IPC (Feather v2) file, one record batch per chunk
+
+    Args:
+        chunks: Iterable of pandas.DataFrame chunks
+        path: Output path
+
+    Returns:
+        int: Number of rows written
+    """
+    pa = _require_pyarrow()
+
+    rows = 0
+    temp_path = _temp_path(path)
+    writer = None
+    schema = None
+    try:
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            typed = typed_frame(chunk)
+            # The IPC file writer does not expose its schema: keep the first chunk's
+            table = _to_table(pa, typed, schema)
+            if writer is None:
+                schema = table.schema
+                writer = pa.ipc.new_file(temp_path, schema)
+            writer.write_table(table)
+            rows += len(typed)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            writer = None
+        _remove_temp(temp_path)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+    if schema is None:
+        empty = _to_table(pa, typed_frame(pd.DataFrame(columns=OUTPUT_COLUMNS)))
+        with pa.ipc.new_file(temp_path, empty.schema) as empty_writer:
+            empty_writer.write_table(empty)
+    os.replace(temp_path, path)
+    return rows
+
+
+def export_chunks(chunks, path, output_format, partition_by=None):
+    """
+    Write chunks in one of EXPORT_FORMATS
+
+    Args:
+        chunks: Iterable of pandas.DataFrame chunks
+        path: Output path
+        output_format: "ndjson", "parquet" or "arrow"
+        partition_by: Parquet only: None, "year" or "court"
+
+    Returns:
+        int: Number of rows written
+    """
+    if output_format == "ndjson":
+        return write_ndjson(chunks, path)
+    if output_format == "parquet":
+        return write_parquet(chunks, path, partition_by=partition_by)
+    if output_format == "arrow":
+        return write_arrow(chunks, path)
+    raise ValueError(f"Unknown export format: {output_format}")
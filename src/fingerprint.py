@@ -0,0 +1,98 @@
+"""
+Fingerprint Module
+Provenance hashes of the prompt and input a row was cleaned with
+"""
+
+import hashlib
+import json
+import pandas as pd
+from src.config import (
+    SYSTEM_PROMPT,
+    USER_PROMPT_TEMPLATE,
+    RESPONSE_FORMAT,
+    PACKED_USER_PROMPT_TEMPLATE,
+    PACKED_ENTRY_TEMPLATE,
+    PACKED_RESPONSE_FORMAT,
+    FINGERPRINT_VERSION,
+    FINGERPRINT_LENGTH
+)
+
+# Input fields that go into the prompt, in prompt order
+FINGERPRINT_FIELDS = [
+    "court",
+    "date_and_legal_id",
+    "firm_name",
+    "firm_location",
+    "owner",
+    "managers",
+    "notes",
+    "source"
+]
+
+# Column of DataHandler.input_fields holding each row's input fingerprint
+INPUT_FINGERPRINT = "input_fingerprint"
+
+_prompt_fingerprints = {}
+
+
+def prompt_fingerprint(model):
+    """
+    Return the fingerprint of the prompts, schemas and model a row is cleaned with
+
+    Covers the single-row and packed prompts and response formats (a row
+    may be sent either way) and FINGERPRINT_VERSION.
+
+    Args:
+        model: Model name (or RULES_MODEL_NAME for rows resolved locally)
+
+    Returns:
+        str: Hex digest prefix of FINGERPRINT_LENGTH digits
+    """
+    fingerprint = _prompt_fingerprints.get(model)
+    if fingerprint is None:
+        canonical = json.dumps([
+            FINGERPRINT_VERSION,
+            model,
+            SYSTEM_PROMPT,
+            USER_PROMPT_TEMPLATE,
+            RESPONSE_FORMAT,
+            PACKED_USER_PROMPT_TEMPLATE,
+            PACKED_ENTRY_TEMPLATE,
+            PACKED_RESPONSE_FORMAT
+        ], sort_keys=True, ensure_ascii=False)
+        fingerprint = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:FINGERPRINT_LENGTH]
+        _prompt_fingerprints[model] = fingerprint
+    return fingerprint
+
+
+def input_fingerprints(fields):
+    """
+    Hash the prompt input fields of many rows at once
+
+    Args:
+        fields: pandas.DataFrame with the FINGERPRINT_FIELDS columns
+            (DataHandler.input_fields or an equivalent frame)
+
+    Returns:
+        pandas.Series: 16-digit hex fingerprint per row, same index as fields
+    """
+    frame = fields.reindex(columns=FINGERPRINT_FIELDS, fill_value="").astype(str)
+    hashes = pd.util.hash_pandas_object(frame, index=False)
+    return pd.Series([f"{value:016x}" for value in hashes], index=fields.index, dtype=object)
+
+
+def input_fingerprint(input_fields):
+    """
+    Hash the prompt input fields of one row (same value as input_fingerprints)
+
+    Builds a one-row DataFrame, so it is much slower per row than
+    input_fingerprints; rows from DataHandler.get_input_row already carry
+    their fingerprint under INPUT_FINGERPRINT.
+
+    Args:
+        input_fields: Dictionary with the FINGERPRINT_FIELDS keys
+
+    Returns:
+        str: 16-digit hex fingerprint
+    """
+    return input_fingerprints(pd.DataFrame([input_fields])).iloc[0]
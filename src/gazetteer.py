@@ -0,0 +1,404 @@
+"""
+Gazetteer Module
+Canonical courts, locations and person names learned from accepted results
+"""
+
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from src.config import (
+    RULES_MODEL_NAME,
+    GAZETTEER_MIN_COUNT,
+    GAZETTEER_THRESHOLDS,
+    GAZETTEER_CANDIDATE_SIMILARITY
+)
+
+# Entity kinds and the output fields holding them
+ENTITY_FIELDS = {
+    "court": ["cleaned_court"],
+    "location": ["cleaned_location"],
+    "person": ["cleaned_owners", "cleaned_managers", "names_incoming", "names_outgoing"]
+}
+
+# Input field a court or location was cleaned from (aliases map it to the output)
+ALIAS_FIELDS = {
+    "court": "court",
+    "location": "firm_location"
+}
+
+# Kinds whose fields hold semicolon-separated lists
+LIST_KINDS = {"person"}
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+
+
+def entity_key(text):
+    """
+    Return the lookup key of an entity name
+
+    Case, accents, punctuation and spacing are ignored, so OCR variants
+    like "Buda-Pest" and "budapest" share a key.
+
+    Args:
+        text: Entity name
+
+    Returns:
+        str: Key ("" for empty names)
+    """
+    decomposed = unicodedata.normalize("NFKD", str(text).casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(" ", stripped).strip()
+
+
+def trigrams(key):
+    """Return the set of character trigrams of a key, padded at word boundaries"""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def split_names(value):
+    """Split a semicolon-separated name list into stripped names"""
+    return [name.strip() for name in str(value).split(";") if name.strip()]
+
+
+class TrigramIndex:
+    """
+    Inverted trigram index over canonical names
+
+    Each name is stored under its entity_key. A query is only compared
+    with the names sharing trigrams with it (found through the posting
+    lists), scored by the Dice coefficient of the trigram sets.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._grams = []
+        self._ids = {}
+        self._postings = defaultdict(list)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    def add(self, key):
+        """Add a key (no-op if already present)"""
+        if not key or key in self._ids:
+            return
+        key_id = len(self._keys)
+        grams = trigrams(key)
+        self._ids[key] = key_id
+        self._keys.append(key)
+        self._grams.append(len(grams))
+        for gram in grams:
+            self._postings[gram].append(key_id)
+
+    def search(self, key, threshold):
+        """
+        Find the indexed keys most similar to key
+
+        Args:
+            key: Query key (see entity_key)
+            threshold: Minimum Dice similarity, 0-1
+
+        Returns:
+            list: (similarity, key) pairs at or above threshold, best first
+        """
+        grams = trigrams(key)
+        size = len(grams)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        matches = []
+        for key_id, count in shared.items():
+            similarity = 2 * count / (size + self._grams[key_id])
+            if similarity >= threshold:
+                matches.append((similarity, self._keys[key_id]))
+        matches.sort(reverse=True)
+        return matches
+
+
+class Gazetteer:
+    """
+    Canonical spellings of courts, locations and people
+
+    Built incrementally from accepted results: every cleaned court,
+    location and person name is counted under its entity_key, and the most
+    frequent spelling of a key is its canonical form. For courts and
+    locations the input text the value was cleaned from is recorded as an
+    alias, so a known OCR variant maps straight to its canonical form.
+
+    snap() replaces the entities of a new result with known canonical
+    forms: by alias, by key, or (courts and locations) by similarity to a
+    name seen at least min_count times. Person names are only snapped by
+    key, since a near match is often another person ("Kohn Adolfné" is
+    Adolf Kohn's wife, "ifj. Weisz Mór" his son). Fuzzy candidates come from the trigram index and are
+    confirmed by their edit similarity (difflib ratio), which is more
+    reliable than trigram overlap for short names. Safe to use from
+    several worker threads.
+    """
+
+    def __init__(self, min_count=GAZETTEER_MIN_COUNT, thresholds=None):
+        """
+        Initialize an empty gazetteer
+
+        Args:
+            min_count: Occurrences before a name is used as a snapping target
+            thresholds: Minimum similarity per kind (default: GAZETTEER_THRESHOLDS)
+        """
+        self.min_count = min_count
+        self.thresholds = dict(GAZETTEER_THRESHOLDS if thresholds is None else thresholds)
+        # kind -> key -> Counter of spellings
+        self._spellings = {kind: defaultdict(Counter) for kind in ENTITY_FIELDS}
+        # kind -> input key -> Counter of canonical keys
+        self._aliases = {kind: defaultdict(Counter) for kind in ALIAS_FIELDS}
+        # kind -> index of keys seen at least min_count times (fuzzy kinds only)
+        self._indexes = {kind: TrigramIndex() for kind in ENTITY_FIELDS}
+        # Workbooks whose earlier results were added with learn_workbook
+        self.sources = set()
+        self._lock = threading.Lock()
+        self.stats = {"learned": 0, "snapped": 0}
+
+    def __len__(self):
+        return sum(len(spellings) for spellings in self._spellings.values())
+
+    def canonical(self, kind, key):
+        """Return the canonical spelling of a key, or None if it is unknown"""
+        spellings = self._spellings[kind].get(key)
+        if not spellings:
+            return None
+        return spellings.most_common(1)[0][0]
+
+    def _add(self, kind, name, count=1):
+        """Count one spelling of a name (caller holds the lock)"""
+        key = entity_key(name)
+        if not key:
+            return
+        spellings = self._spellings[kind][key]
+        spellings[name] += count
+        if kind in self.thresholds and sum(spellings.values()) >= self.min_count:
+            self._indexes[kind].add(key)
+
+    def _add_alias(self, kind, source, name, count=1):
+        """Record that input text source was cleaned to name (caller holds the lock)"""
+        source_key, key = entity_key(source), entity_key(name)
+        if source_key and key:
+            self._aliases[kind][source_key][key] += count
+
+    def learn(self, cleaned_data, row_data=None):
+        """
+        Add the entities of an accepted result
+
+        Error results and rows resolved by the rules (whose court is the
+        uncleaned input) are ignored.
+
+        Args:
+            cleaned_data: Result dictionary (see LLMProcessor.process_row)
+            row_data: Input fields the result was produced from (for aliases, optional)
+        """
+        if "error" in cleaned_data or cleaned_data.get("model_used") == RULES_MODEL_NAME:
+            return
+        with self._lock:
+            for kind, fields in ENTITY_FIELDS.items():
+                for field in fields:
+                    value = cleaned_data.get(field)
+                    if not isinstance(value, str) or not value.strip():
+                        continue
+                    names = split_names(value) if kind in LIST_KINDS else [value.strip()]
+                    for name in names:
+                        self._add(kind, name)
+                    if kind in ALIAS_FIELDS and hasattr(row_data, "get"):
+                        self._add_alias(kind, row_data.get(ALIAS_FIELDS[kind], ""), value.strip())
+            self.stats["learned"] += 1
+
+    def learn_frame(self, results, input_fields=None):
+        """
+        Add the entities of many accepted results at once
+
+        Args:
+            results: pandas.DataFrame with the output columns of accepted rows
+            input_fields: Input fields of the same rows (for aliases, optional)
+        """
+        if "model_used" in results.columns:
+            results = results[results["model_used"].astype(str) != RULES_MODEL_NAME]
+        with self._lock:
+            for kind, fields in ENTITY_FIELDS.items():
+                for field in fields:
+                    if field not in results.columns:
+                        continue
+                    values = results[field].dropna().astype(str).str.strip()
+                    values = values[values != ""]
+                    if kind in LIST_KINDS:
+                        values = values.str.split(";").explode().str.strip()
+                        values = values[values != ""]
+                    for name, count in values.value_counts().items():
+                        self._add(kind, name, count)
+
+                    source_field = ALIAS_FIELDS.get(kind)
+                    if input_fields is None or source_field not in getattr(input_fields, "columns", ()):
+                        continue
+                    sources = input_fields[source_field].reindex(values.index).fillna("").astype(str)
+                    pairs = zip(sources, values)
+                    for (source, name), count in Counter(pairs).items():
+                        self._add_alias(kind, source, name, count)
+            self.stats["learned"] += len(results)
+
+    def learn_workbook(self, key, results, input_fields=None):
+        """
+        Add a workbook's earlier results, once per workbook
+
+        Results produced later are added one by one as they are accepted,
+        so a workbook is only read in full the first time it is seen.
+
+        Args:
+            key: Workbook name (see work_queue.workbook_key)
+            results: Output columns of its accepted rows
+            input_fields: Input fields of the same rows (optional)
+
+        Returns:
+            bool: True if the workbook was new to the gazetteer
+        """
+        with self._lock:
+            if key in self.sources:
+                return False
+            self.sources.add(key)
+        if results is not None and len(results):
+            self.learn_frame(results, input_fields)
+        return True
+
+    def lookup(self, kind, name, source=None):
+        """
+        Return the canonical form of a name
+
+        The input text it was cleaned from is tried first (courts and
+        locations), then the name's own key, then the most similar name
+        seen at least min_count times (see GAZETTEER_THRESHOLDS). Kinds
+        without a threshold (person names) are only matched by key. A tie
+        between two different names is not resolved.
+
+        Args:
+            kind: "court", "location" or "person"
+            name: Name as produced for the new row
+            source: Input text the name was cleaned from (optional)
+
+        Returns:
+            str: Canonical spelling, or None if there is no confident match
+        """
+        key = entity_key(name)
+        with self._lock:
+            if source is not None and kind in self._aliases:
+                aliases = self._aliases[kind].get(entity_key(source))
+                if aliases:
+                    (alias, count), = aliases.most_common(1)
+                    if count >= self.min_count:
+                        return self.canonical(kind, alias)
+            if not key:
+                return None
+            if key in self._indexes[kind] or kind not in self.thresholds:
+                return self.canonical(kind, key)
+            candidates = self._indexes[kind].search(key, GAZETTEER_CANDIDATE_SIMILARITY)
+            matches = sorted(
+                ((SequenceMatcher(None, key, candidate).ratio(), candidate)
+                 for _, candidate in candidates),
+                reverse=True
+            )
+            matches = [match for match in matches if match[0] >= self.thresholds[kind]]
+            if not matches or (len(matches) > 1 and matches[1][0] == matches[0][0]):
+                return None
+            return self.canonical(kind, matches[0][1])
+
+    def snap(self, cleaned_data, row_data=None):
+        """
+        Replace the entities of a result with their canonical forms
+
+        Args:
+            cleaned_data: Result dictionary (modified in place)
+            row_data: Input fields of the row (for alias lookups, optional)
+
+        Returns:
+            int: Number of names changed
+        """
+        changed = 0
+        for kind, fields in ENTITY_FIELDS.items():
+            source = None
+            if kind in ALIAS_FIELDS and hasattr(row_data, "get"):
+                source = row_data.get(ALIAS_FIELDS[kind])
+            for field in fields:
+                value = cleaned_data.get(field)
+                if not isinstance(value, str) or not value.strip():
+                    continue
+                names = split_names(value) if kind in LIST_KINDS else [value.strip()]
+                snapped = [self.lookup(kind, name, source) or name for name in names]
+                changed += sum(old != new for old, new in zip(names, snapped))
+                if snapped != names:
+                    cleaned_data[field] = "; ".join(snapped) if kind in LIST_KINDS else snapped[0]
+        if changed:
+            with self._lock:
+                self.stats["snapped"] += changed
+        return changed
+
+    def save(self, path):
+        """
+        Write the gazetteer to a JSON file (replaced atomically)
+
+        Args:
+            path: Output path
+        """
+        with self._lock:
+            data = {
+                "min_count": self.min_count,
+                "sources": sorted(self.sources),
+                "spellings": {
+                    kind: {key: dict(spellings) for key, spellings in entries.items()}
+                    for kind, entries in self._spellings.items()
+                },
+                "aliases": {
+                    kind: {key: dict(targets) for key, targets in entries.items()}
+                    for kind, entries in self._aliases.items()
+                }
+            }
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, thresholds=None):
+        """
+        Read a gazetteer written by save (an empty one if the file does not exist)
+
+        Args:
+            path: Path of the JSON file
+            thresholds: Minimum similarity per kind (optional)
+
+        Returns:
+            Gazetteer: Loaded gazetteer
+        """
+        if not os.path.exists(path):
+            return cls(thresholds=thresholds)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        gazetteer = cls(min_count=data.get("min_count", GAZETTEER_MIN_COUNT), thresholds=thresholds)
+        gazetteer.sources.update(data.get("sources", []))
+        for kind, entries in data.get("spellings", {}).items():
+            if kind not in gazetteer._spellings:
+                continue
+            for spellings in entries.values():
+                for name, count in spellings.items():
+                    gazetteer._add(kind, name, count)
+        for kind, entries in data.get("aliases", {}).items():
+            if kind not in gazetteer._aliases:
+                continue
+            for source_key, targets in entries.items():
+                gazetteer._aliases[kind][source_key].update(targets)
+        return gazetteer
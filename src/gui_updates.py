@@ -0,0 +1,94 @@
+"""
+GUI Updates Module
+Coalescing, rate-limited queue of updates from worker threads to the Tk thread
+"""
+
+import threading
+from src.config import GUI_UPDATE_INTERVAL_MS
+
+
+class UpdateQueue:
+    """
+    Thread-safe queue of GUI updates drained by the Tk thread at a fixed rate
+
+    Worker threads post updates under a key; only the latest update per key
+    is kept until the next tick (e.g. one status text, one JSON view). Rows
+    that need a redraw are collected in a set and handed to the row handler
+    once per tick. The cost of a tick therefore depends on the number of
+    keys, not on how many rows finished since the last one.
+    """
+
+    def __init__(self, root, on_rows_changed=None, interval_ms=GUI_UPDATE_INTERVAL_MS):
+        """
+        Initialize the queue
+
+        Args:
+            root: Tk root window (used for scheduling only)
+            on_rows_changed: Callback(set of row indices) run on the Tk thread each tick
+            interval_ms: Milliseconds between ticks
+        """
+        self.root = root
+        self.on_rows_changed = on_rows_changed
+        self.interval_ms = interval_ms
+
+        self._lock = threading.Lock()
+        self._updates = {}
+        self._changed_rows = set()
+        self._running = False
+
+    def post(self, key, callback):
+        """
+        Schedule callback on the Tk thread, replacing any pending update with the same key
+
+        Args:
+            key: Update key (e.g. "status", "json")
+            callback: Callable without arguments
+        """
+        with self._lock:
+            # Re-inserting moves the key to the end, so updates run in posting order
+            self._updates.pop(key, None)
+            self._updates[key] = callback
+
+    def mark_row_changed(self, row_index):
+        """
+        Schedule a redraw of a row
+
+        Args:
+            row_index: Row index
+        """
+        with self._lock:
+            self._changed_rows.add(row_index)
+
+    def start(self):
+        """Start draining (call from the Tk thread)"""
+        if not self._running:
+            self._running = True
+            self.root.after(self.interval_ms, self._drain)
+
+    def stop(self):
+        """Stop draining"""
+        self._running = False
+
+    def flush(self):
+        """Run all pending updates now (call from the Tk thread)"""
+        with self._lock:
+            updates, self._updates = self._updates, {}
+            changed_rows, self._changed_rows = self._changed_rows, set()
+
+        if changed_rows and self.on_rows_changed is not None:
+            self.on_rows_changed(changed_rows)
+
+        for callback in updates.values():
+            try:
+                callback()
+            except Exception as e:
+                print(f"GUI update failed: {e}")
+
+    def _drain(self):
+        """Tick: apply pending updates and reschedule"""
+        if not self._running:
+            return
+        try:
+            self.flush()
+        finally:
+            self.root.after(self.interval_ms, self._drain)
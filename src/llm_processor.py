@@ -5,75 +5,427 @@ Handles OpenAI API interactions for cleaning firm registry data
 
 import json
 import os
-from openai import OpenAI
+import threading
+import time
+from openai import OpenAI, RateLimitError, APIConnectionError, InternalServerError
 from dotenv import load_dotenv
 from src.config import (
     SYSTEM_PROMPT,
     USER_PROMPT_TEMPLATE,
     RESPONSE_FORMAT,
+    PACKED_USER_PROMPT_TEMPLATE,
+    PACKED_ENTRY_TEMPLATE,
+    PACKED_RESPONSE_FORMAT,
     INPUT_COLUMNS,
+    ESTIMATED_CHARS_PER_TOKEN,
+    MAX_API_RETRIES,
+    RULES_MODEL_NAME,
+    PARTIAL_REASK_ENABLED,
+    PARTIAL_REASK_PROMPT_TEMPLATE,
+    FIELD_INSTRUCTIONS,
     get_current_timestamp
 )
+from src.rate_limiter import backoff_delay
+from src.fingerprint import prompt_fingerprint, input_fingerprint, INPUT_FINGERPRINT
+from src.preclean import PRE_RESOLVED, INHERITED_FIELDS
+from src.validation import (
+    check_result,
+    precleaned_values,
+    validate_fields,
+    partial_response_format,
+    FIELD_VALIDATORS
+)
 
 # Load environment variables
 load_dotenv()
 
+# Fields every cleaned entry must contain
+REQUIRED_FIELDS = RESPONSE_FORMAT["json_schema"]["schema"]["required"]
+
 
 class LLMProcessor:
     """Handles LLM API calls for data cleaning"""
     
-    def __init__(self, model="gpt-4o-mini"):
+    def __init__(self, model="gpt-4o-mini", client=None, cache=None):
         """
         Initialize the LLM processor
         
         Args:
             model: OpenAI model to use (default: gpt-4o-mini)
+            client: Pre-built OpenAI-compatible client (optional, skips API key lookup)
+            cache: ResponseCache consulted before each API call (optional)
         """
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "OpenAI API key not found. Please set OPENAI_API_KEY in .env file"
-            )
+        if client is None:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise ValueError(
+                    "OpenAI API key not found. Please set OPENAI_API_KEY in .env file"
+                )
+            client = OpenAI(api_key=api_key)
         
-        self.client = OpenAI(api_key=api_key)
+        self.client = client
         self.model = model
+        self.cache = cache
+        self.pack_tuner = None
+        self.rate_limiter = None
+        self.metrics = None
+        # Gazetteer the entities of accepted results are snapped to and learned by (optional)
+        self.gazetteer = None
+        
+        # Cascade mode: models tried in order, cheapest first (None = only self.model)
+        self.cascade_models = None
+        # Rows answered per model and rows re-sent to a stronger model
+        self.cascade_stats = {"models": {}, "escalated": 0}
+        # Rows with fields re-asked after failing validation, and rows fully repaired
+        self.reask_stats = {"rows": 0, "repaired": 0}
+        self._stats_lock = threading.Lock()
+        
+        # Token usage and timings of the last API call, per worker thread
+        self._local = threading.local()
     
-    def process_row(self, row_data):
+    def process_row(self, row_data, refresh=False):
         """
         Process a single row of firm registry data
         
+        Fields failing the field validators (date, event class, name lists)
+        are asked for again in a small follow-up request.
+        
+        In cascade mode the row goes to the first model; a result failing
+        the local checks (see validation.check_result) or a failed request
+        is re-sent to the next model. model_used records the model whose
+        answer was kept.
+        
         Args:
             row_data: Dictionary or pandas Series with row data
+                (pre-cleaned fields from DataHandler.get_input_row are used as is)
+            refresh: Skip the response cache and store the new answer in it instead
             
         Returns:
             dict: Cleaned and structured data with metadata
         """
+        # Rows without firm content need no API call
+        resolved = self.resolve_locally(row_data)
+        if resolved is not None:
+            return resolved
+        
+        self._local.refresh = refresh
+        try:
+            return self._process_row(row_data)
+        finally:
+            self._local.refresh = False
+    
+    def _process_row(self, row_data, first_tier=0):
+        """
+        Send a row to the models of the cascade, starting at first_tier
+        
+        Args:
+            row_data: Dictionary or pandas Series with row data
+            first_tier: Index of the first model to try
+            
+        Returns:
+            dict: Cleaned data with metadata (same format as process_row)
+        """
         # Extract input fields
         input_fields = self._extract_input_fields(row_data)
         
         # Create prompt
         user_prompt = self._create_prompt(input_fields)
         
-        # Call OpenAI API
-        try:
-            response = self._call_openai_api(user_prompt)
+        models = self.model_tiers()
+        for tier in range(first_tier, len(models)):
+            model = models[tier]
+            last_tier = tier == len(models) - 1
             
-            # Parse response
-            cleaned_data = self._parse_response(response)
+            # Call OpenAI API
+            try:
+                # Call the API and parse the response
+                cleaned_data = self._request_and_parse(
+                    user_prompt, self._parse_response, model=model
+                )
+            except Exception as e:
+                if not last_tier:
+                    self._count_escalation()
+                    continue
+                # Return error information
+                return {
+                    "error": str(e),
+                    "model_used": model,
+                    "cleaning_date": get_current_timestamp()
+                }
+            
+            self._reask_invalid_fields(cleaned_data, row_data, model)
+            
+            # The strongest model's answer is kept even if it fails the checks
+            if not last_tier and check_result(cleaned_data, row_data):
+                self._count_escalation()
+                continue
+            
+            self.apply_precleaned(cleaned_data, row_data)
             
             # Add metadata
-            cleaned_data["model_used"] = self.model
+            cleaned_data["model_used"] = model
+            self.snap_entities(cleaned_data, row_data)
             cleaned_data["cleaning_date"] = get_current_timestamp()
+            self.stamp_fingerprints(cleaned_data, row_data)
+            self._count_answer(model)
             
             return cleaned_data
+    
+    def model_tiers(self):
+        """Return the models a row is sent to, in order"""
+        return list(self.cascade_models) if self.cascade_models else [self.model]
+    
+    def _count_answer(self, model):
+        """Count a row answered by model"""
+        with self._stats_lock:
+            models = self.cascade_stats["models"]
+            models[model] = models.get(model, 0) + 1
+    
+    def _count_escalation(self):
+        """Count a row re-sent to a stronger model"""
+        with self._stats_lock:
+            self.cascade_stats["escalated"] += 1
+    
+    def process_rows_packed(self, rows, submitted_at=None, pack_size=None):
+        """
+        Process several rows with a single API request
+        
+        Rows missing from the response or failing to parse are re-sent as
+        single-row calls. In cascade mode the packed request goes to the
+        first model and entries failing the local checks are re-sent, one
+        by one, to the stronger models. If a pack_tuner is set, the token use and fallback
+        count of the request are recorded in it.
+        
+        Args:
+            rows: List of (row_index, row_data) tuples
+            submitted_at: time.monotonic() when the rows were queued (for the
+                queue wait metric, optional)
+            pack_size: Pack size the rows were chunked with, which the
+                pack_tuner records them under (default: len(rows)); a short
+                last chunk still counts for the configured size
             
-        except Exception as e:
-            # Return error information
-            return {
-                "error": str(e),
-                "model_used": self.model,
-                "cleaning_date": get_current_timestamp()
-            }
+        Returns:
+            dict: Cleaned data per row index (same format as process_row)
+        """
+        self._local.submitted_at = submitted_at
+        if pack_size is None:
+            pack_size = len(rows)
+        
+        results = {}
+        
+        # Rows without firm content need no API call
+        remaining = []
+        for row_index, row_data in rows:
+            resolved = self.resolve_locally(row_data)
+            if resolved is None:
+                remaining.append((row_index, row_data))
+            else:
+                results[row_index] = resolved
+        rows = remaining
+        if not rows:
+            return results
+        
+        if len(rows) == 1:
+            row_index, row_data = rows[0]
+            cleaned_data = self.process_row(row_data)
+            tokens = self._last_call_tokens()
+            if self.pack_tuner is not None and tokens is not None:
+                self.pack_tuner.record(pack_size, 1, tokens, 1 if "error" in cleaned_data else 0)
+            results[row_index] = cleaned_data
+            return results
+        
+        entries = "\n\n".join(
+            PACKED_ENTRY_TEMPLATE.format(row_id=row_index, **self._extract_input_fields(row_data))
+            for row_index, row_data in rows
+        )
+        user_prompt = PACKED_USER_PROMPT_TEMPLATE.format(entries=entries)
+        models = self.model_tiers()
+        
+        try:
+            parsed_entries = self._request_and_parse(
+                user_prompt,
+                self._parse_packed_response,
+                response_format=PACKED_RESPONSE_FORMAT,
+                model=models[0]
+            )
+        except Exception:
+            parsed_entries = {}
+        tokens = self._last_call_tokens()
+        
+        timestamp = get_current_timestamp()
+        failed_rows = []
+        escalated_rows = []
+        for row_index, row_data in rows:
+            cleaned_data = parsed_entries.get(int(row_index))
+            if cleaned_data is None:
+                failed_rows.append((row_index, row_data))
+                continue
+            self._reask_invalid_fields(cleaned_data, row_data, models[0])
+            if len(models) > 1 and check_result(cleaned_data, row_data):
+                escalated_rows.append((row_index, row_data))
+                continue
+            self.apply_precleaned(cleaned_data, row_data)
+            cleaned_data["model_used"] = models[0]
+            self.snap_entities(cleaned_data, row_data)
+            cleaned_data["cleaning_date"] = timestamp
+            self.stamp_fingerprints(cleaned_data, row_data)
+            self._count_answer(models[0])
+            results[row_index] = cleaned_data
+        
+        # Fall back to one request per row for anything the packed call missed
+        for row_index, row_data in failed_rows:
+            results[row_index] = self.process_row(row_data)
+            if tokens is not None:
+                fallback_tokens = self._last_call_tokens()
+                tokens = None if fallback_tokens is None else tokens + fallback_tokens
+        
+        # Entries the first model got wrong go to the stronger models
+        for row_index, row_data in escalated_rows:
+            self._count_escalation()
+            results[row_index] = self._process_row(row_data, first_tier=1)
+        
+        # Cache hits carry no token counts and would skew the measurements
+        if self.pack_tuner is not None and tokens is not None:
+            self.pack_tuner.record(pack_size, len(rows), tokens, len(failed_rows))
+        
+        return results
+    
+    def resolve_locally(self, row_data):
+        """
+        Build the result of a row that the pre-cleaning rules fully resolved
+        
+        Rows flagged pre_resolved have no firm name, location, owner,
+        manager or notes text, so there is nothing for the model to clean
+        beyond what the rules already extracted.
+        
+        Args:
+            row_data: Pre-cleaned input fields (DataHandler.get_input_row)
+            
+        Returns:
+            dict: Cleaned data with metadata, or None if the row needs the LLM
+        """
+        if not hasattr(row_data, "get") or not row_data.get(PRE_RESOLVED, False):
+            return None
+        
+        cleaned_data = {field: "" for field in REQUIRED_FIELDS}
+        cleaned_data["event_classification"] = 6  # Other
+        cleaned_data["cleaned_court"] = row_data.get("court", "")
+        self.apply_precleaned(cleaned_data, row_data)
+        cleaned_data["model_used"] = RULES_MODEL_NAME
+        self.snap_entities(cleaned_data, row_data)
+        cleaned_data["cleaning_date"] = get_current_timestamp()
+        self.stamp_fingerprints(cleaned_data, row_data)
+        return cleaned_data
+    
+    def snap_entities(self, cleaned_data, row_data):
+        """
+        Snap the court, location and person names of a result to the gazetteer
+        
+        Known OCR variants and spellings close to a frequent name are
+        replaced with its canonical form, so spelling stays consistent
+        across the corpus. Results answered by a model are then added to
+        the gazetteer; rows resolved by the rules only use it.
+        
+        Args:
+            cleaned_data: Result with model_used set (modified in place)
+            row_data: Input fields the result was produced from
+        """
+        if self.gazetteer is None:
+            return
+        self.gazetteer.snap(cleaned_data, row_data)
+        self.gazetteer.learn(cleaned_data, row_data)
+    
+    def stamp_fingerprints(self, cleaned_data, row_data):
+        """
+        Record the prompt and input fingerprints and the inherited fields of a result
+        
+        Together with model_used they identify what produced the row, so
+        rows cleaned with an older prompt or from changed input cells can
+        be found later (see DataHandler.find_stale_rows). inherited_fields
+        lists the input fields filled from a "same as above" mark
+        (semicolon-separated, see preclean.resolve_ditto_marks). The input
+        fingerprint prepared by DataHandler.get_input_row is used when the
+        row carries one.
+        
+        Args:
+            cleaned_data: Result with model_used set (modified in place)
+            row_data: Input fields the result was produced from
+        """
+        cleaned_data["prompt_fingerprint"] = prompt_fingerprint(cleaned_data["model_used"])
+        # Raw rows (a Series) hold the stored fingerprint of the last result instead
+        fingerprint = row_data.get(INPUT_FINGERPRINT) if isinstance(row_data, dict) else None
+        if not fingerprint:
+            fingerprint = input_fingerprint(self._extract_input_fields(row_data))
+        cleaned_data["input_fingerprint"] = fingerprint
+        inherited = row_data.get(INHERITED_FIELDS, "") if hasattr(row_data, "get") else ""
+        cleaned_data["inherited_fields"] = inherited if isinstance(inherited, str) else ""
+    
+    def _reask_invalid_fields(self, cleaned_data, row_data, model):
+        """
+        Ask the model again for the fields that fail the field validators
+        
+        Only the failing fields are requested, with a reduced schema, so the
+        follow-up costs a fraction of re-running the row. Corrected values
+        that pass validation replace the originals; the others are kept.
+        
+        Args:
+            cleaned_data: Parsed model output (modified in place)
+            row_data: Input fields of the row
+            model: Model that produced cleaned_data
+        """
+        if not PARTIAL_REASK_ENABLED:
+            return
+        problems = validate_fields(cleaned_data, row_data)
+        if not problems:
+            return
+        
+        user_prompt = PARTIAL_REASK_PROMPT_TEMPLATE.format(
+            problems="\n".join(
+                f"- {field}: {json.dumps(cleaned_data.get(field), ensure_ascii=False)} ({problem})"
+                for field, problem in problems.items()
+            ),
+            fields="\n".join(f'- "{field}": {FIELD_INSTRUCTIONS[field]}' for field in problems),
+            **self._extract_input_fields(row_data)
+        )
+        try:
+            corrections = self._request_and_parse(
+                user_prompt,
+                self._parse_response,
+                response_format=partial_response_format(list(problems)),
+                model=model
+            )
+        except Exception:
+            corrections = {}
+        if not isinstance(corrections, dict):
+            corrections = {}
+        
+        repaired = 0
+        for field in problems:
+            if field in corrections and FIELD_VALIDATORS[field](corrections[field]) is None:
+                cleaned_data[field] = corrections[field]
+                repaired += 1
+        
+        with self._stats_lock:
+            self.reask_stats["rows"] += 1
+            if repaired == len(problems):
+                self.reask_stats["repaired"] += 1
+    
+    @staticmethod
+    def apply_precleaned(cleaned_data, row_data):
+        """
+        Cross-check the date and legal identifier with the values the rules recognized
+        
+        The rule values replace model values that are empty, invalid, not
+        backed by the input, or equal up to formatting; a differing model
+        value that the input supports is kept (see validation.precleaned_values).
+        
+        Args:
+            cleaned_data: Parsed model output (modified in place)
+            row_data: Input fields of the row (rows without pre-cleaned values are left alone)
+        """
+        if not hasattr(row_data, "get"):
+            return
+        cleaned_data.update(precleaned_values(cleaned_data, row_data))
     
     def _extract_input_fields(self, row_data):
         """Extract input fields from row data"""
@@ -107,27 +459,290 @@ class LLMProcessor:
         """Create the user prompt from input fields"""
         return USER_PROMPT_TEMPLATE.format(**input_fields)
     
-    def _call_openai_api(self, user_prompt):
+    def _request_and_parse(self, user_prompt, parse, response_format=RESPONSE_FORMAT,
+                           model=None):
+        """
+        Call the API, parse the response and record the request's metrics
+        
+        Args:
+            user_prompt: The formatted prompt
+            parse: Function turning the response text into the result
+            response_format: Structured output format (default: single-row schema)
+            model: Model to call (default: self.model)
+            
+        Returns:
+            Result of parse
+        """
+        # Only the first request of a submission waited in the queue
+        submitted_at = getattr(self._local, "submitted_at", None)
+        self._local.submitted_at = None
+        
+        model = model or self.model
+        started = time.monotonic()
+        parse_time = None
+        failed = True
+        try:
+            response = self._call_openai_api(user_prompt, response_format=response_format,
+                                             model=model)
+            parse_started = time.monotonic()
+            result = parse(response)
+            parse_time = time.monotonic() - parse_started
+            failed = False
+            return result
+        finally:
+            if self.metrics is not None:
+                self._record_request(model, started, submitted_at, parse_time, failed)
+    
+    def _record_request(self, model, started, submitted_at, parse_time, failed):
+        """Report this thread's last API call to the metrics collector"""
+        usage = self._local.usage
+        api_latency = self._local.api_latency
+        
+        queue_wait = self._local.limiter_wait
+        if submitted_at is not None:
+            queue_wait += started - submitted_at
+        
+        prompt_tokens = completion_tokens = cached_tokens = 0
+        if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+            completion_tokens = getattr(usage, "completion_tokens", None) or 0
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached_tokens = getattr(details, "cached_tokens", None) or 0
+        
+        self.metrics.record_request(
+            model,
+            queue_wait=queue_wait,
+            latency=api_latency if api_latency is not None else time.monotonic() - started,
+            parse_time=parse_time,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
+            retries=self._local.retries,
+            cache_hit=api_latency is None and not failed,
+            error=failed
+        )
+    
+    def _call_openai_api(self, user_prompt, response_format=RESPONSE_FORMAT, model=None):
         """
         Call OpenAI API with structured output
         
         Args:
             user_prompt: The formatted prompt
+            response_format: Structured output format (default: single-row schema)
+            model: Model to call (default: self.model)
             
         Returns:
             str: JSON response from API
         """
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
+        self._local.usage = None
+        self._local.api_latency = None
+        self._local.limiter_wait = 0.0
+        self._local.retries = 0
+        request_body = self._build_request_body(user_prompt, response_format, model=model)
+        
+        if self.cache is None:
+            return self._request_completion(request_body)
+        
+        key = self.cache.make_key(request_body)
+        if getattr(self._local, "refresh", False):
+            # Re-processing on request: ask again and replace the cached answer
+            content = self._request_completion(request_body)
+            if self._is_valid_json(content):
+                self.cache.put(key, content)
+            return content
+        
+        # Identical requests are answered from the cache (or shared while in flight)
+        return self.cache.get_or_compute(
+            key,
+            lambda: self._request_completion(request_body),
+            validate=self._is_valid_json
+        )
+    
+    def _request_completion(self, request_body):
+        """Send a chat completion request and return the message content"""
+        if self.rate_limiter is not None:
+            return self._request_completion_limited(request_body)
+        
+        started = time.monotonic()
+        response = self.client.chat.completions.create(**request_body)
+        self._local.api_latency = time.monotonic() - started
+        self._local.usage = getattr(response, "usage", None)
+        
+        return response.choices[0].message.content
+    
+    def _request_completion_limited(self, request_body):
+        """
+        Send a chat completion request through the rate limiter
+        
+        Waits for request and token budget before sending, feeds the
+        x-ratelimit-* headers and the latency back to the limiter, and
+        retries 429, timeout, connection and 5xx errors with jittered
+        exponential backoff (the SDK's own retries are disabled so that
+        every attempt goes through the limiter).
+        
+        Args:
+            request_body: Request body for the chat completions endpoint
+            
+        Returns:
+            str: Message content
+        """
+        estimated_tokens = self._estimate_tokens(request_body)
+        client = self.client.with_options(max_retries=0)
+        
+        for attempt in range(MAX_API_RETRIES + 1):
+            self._local.limiter_wait += self.rate_limiter.acquire(estimated_tokens)
+            self._local.retries = attempt
+            started = time.monotonic()
+            try:
+                raw = client.chat.completions.with_raw_response.create(**request_body)
+            except RateLimitError as e:
+                retry_after = self.rate_limiter.on_rate_limited(e.response.headers)
+                if attempt == MAX_API_RETRIES:
+                    raise
+                time.sleep(backoff_delay(attempt, retry_after))
+                continue
+            except (APIConnectionError, InternalServerError):
+                # APITimeoutError is an APIConnectionError
+                if attempt == MAX_API_RETRIES:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+            
+            latency = time.monotonic() - started
+            response = raw.parse()
+            usage = getattr(response, "usage", None)
+            self._local.usage = usage
+            self._local.api_latency = latency
+            self.rate_limiter.on_response(
+                raw.headers,
+                latency,
+                estimated_tokens,
+                usage.total_tokens if usage is not None else None
+            )
+            return response.choices[0].message.content
+    
+    @staticmethod
+    def _estimate_tokens(request_body):
+        """
+        Estimate the total tokens of a request before sending it
+        
+        The completion is assumed to be about as long as the user prompt
+        (the cleaned fields mirror the input fields).
+        """
+        messages = request_body["messages"]
+        prompt_chars = sum(len(message["content"]) for message in messages)
+        completion_chars = len(messages[-1]["content"])
+        return (prompt_chars + completion_chars) // ESTIMATED_CHARS_PER_TOKEN + 1
+    
+    def _last_call_tokens(self):
+        """
+        Return the total tokens of this thread's last API call
+        
+        Returns:
+            int: Total tokens, or None if the call was answered from the cache
+        """
+        usage = getattr(self._local, "usage", None)
+        if usage is None:
+            return None
+        return usage.total_tokens
+    
+    @staticmethod
+    def _is_valid_json(response):
+        """Return True if the response parses as JSON (only those are cached)"""
+        try:
+            json.loads(response)
+            return True
+        except (TypeError, json.JSONDecodeError):
+            return False
+    
+    def _build_request_body(self, user_prompt, response_format=RESPONSE_FORMAT, model=None):
+        """
+        Build the chat completion request body
+        
+        Shared by the interactive calls and the Batch API request files.
+        
+        Args:
+            user_prompt: The formatted prompt
+            response_format: Structured output format (default: single-row schema)
+            model: Model to call (default: self.model)
+            
+        Returns:
+            dict: Request body for the chat completions endpoint
+        """
+        return {
+            "model": model or self.model,
+            "messages": [
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
-            response_format=RESPONSE_FORMAT,
-            temperature=0.1  # Low temperature for consistency
-        )
+            "response_format": response_format,
+            "temperature": 0.1  # Low temperature for consistency
+        }
+    
+    def build_batch_request(self, row_index, row_data):
+        """
+        Build one Batch API request line for a row
         
-        return response.choices[0].message.content
+        Args:
+            row_index: Row index, used as the custom_id
+            row_data: Dictionary or pandas Series with row data
+            
+        Returns:
+            dict: Batch API request (one JSONL line)
+        """
+        input_fields = self._extract_input_fields(row_data)
+        user_prompt = self._create_prompt(input_fields)
+        
+        return {
+            "custom_id": str(row_index),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": self._build_request_body(user_prompt)
+        }
+    
+    def parse_batch_result(self, result, model=None):
+        """
+        Parse one line of a Batch API output file
+        
+        model_used is the model the request asked for, as in process_row;
+        the response body names the dated snapshot that served it, which
+        would not match the prompt fingerprint of the requested model.
+        
+        Args:
+            result: Decoded JSONL line from the output file
+            model: Model the batch was submitted with (default: self.model)
+            
+        Returns:
+            tuple: (row_index, cleaned_data) with the same metadata as process_row
+        """
+        row_index = int(result["custom_id"])
+        response = result.get("response") or {}
+        body = response.get("body") or {}
+        model_used = model or self.model
+        
+        try:
+            if result.get("error"):
+                raise ValueError(f"Batch request failed: {result['error']}")
+            if response.get("status_code") != 200:
+                raise ValueError(
+                    f"Batch request returned status {response.get('status_code')}: "
+                    f"{body.get('error', body)}"
+                )
+            
+            cleaned_data = self._parse_response(
+                body["choices"][0]["message"]["content"]
+            )
+            cleaned_data["model_used"] = model_used
+            cleaned_data["cleaning_date"] = get_current_timestamp()
+            
+        except Exception as e:
+            cleaned_data = {
+                "error": str(e),
+                "model_used": model_used,
+                "cleaning_date": get_current_timestamp()
+            }
+        
+        return row_index, cleaned_data
     
     def _parse_response(self, response):
         """
@@ -144,6 +759,34 @@ class LLMProcessor:
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse LLM response as JSON: {e}")
     
+    def _parse_packed_response(self, response):
+        """
+        Split a packed response into per-row dicts
+        
+        Entries without a row_id or with missing fields are dropped, so the
+        caller re-sends those rows individually.
+        
+        Args:
+            response: JSON string response
+            
+        Returns:
+            dict: Cleaned data per row index
+        """
+        data = self._parse_response(response)
+        
+        parsed = {}
+        for entry in data.get("entries", []):
+            if not isinstance(entry, dict):
+                continue
+            row_id = entry.pop("row_id", None)
+            if not isinstance(row_id, int) or row_id in parsed:
+                continue
+            if any(field not in entry for field in REQUIRED_FIELDS):
+                continue
+            parsed[row_id] = entry
+        
+        return parsed
+    
     def set_model(self, model):
         """Change the model being used"""
         self.model = model
@@ -0,0 +1,376 @@
+"""
+Metrics Module
+Per-request latency, token and cost measurements with Prometheus/CSV export
+"""
+
+import csv
+import math
+import os
+import threading
+import time
+from collections import deque
+from src.config import MODEL_PRICING, METRICS_WINDOW
+
+# Prefix of the exported Prometheus metric names
+METRIC_PREFIX = "firm_cleaner"
+
+# Latency quantiles reported in the aggregates
+QUANTILES = (0.5, 0.95, 0.99)
+
+CSV_FIELDS = [
+    "model", "requests", "errors", "cache_hits", "retries",
+    "prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd",
+    "latency_p50", "latency_p95", "latency_p99",
+    "queue_wait_p50", "queue_wait_p95", "parse_time_mean"
+]
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens=0):
+    """
+    Estimate the cost of a request in USD
+
+    Args:
+        model: Model name (a key of MODEL_PRICING)
+        prompt_tokens: Prompt tokens, including cached ones
+        completion_tokens: Completion tokens
+        cached_tokens: Prompt tokens served from the prompt cache
+
+    Returns:
+        float: Cost in USD (0.0 for models without pricing)
+    """
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        return 0.0
+    return (
+        (prompt_tokens - cached_tokens) * pricing["input"]
+        + cached_tokens * pricing["cached_input"]
+        + completion_tokens * pricing["output"]
+    ) / 1_000_000
+
+
+def percentile(values, q):
+    """
+    Return the q-quantile of values (nearest rank)
+
+    Args:
+        values: Sequence of numbers
+        q: Quantile between 0 and 1
+
+    Returns:
+        float: Quantile, or None if values is empty
+    """
+    return percentiles(values, (q,))[0]
+
+
+def percentiles(values, quantiles):
+    """
+    Return several quantiles of values, sorting them once
+
+    Args:
+        values: Sequence of numbers
+        quantiles: Quantiles between 0 and 1
+
+    Returns:
+        list: One value per quantile (None if values is empty)
+    """
+    if not values:
+        return [None] * len(quantiles)
+    ordered = sorted(values)
+    return [ordered[max(0, math.ceil(q * len(ordered)) - 1)] for q in quantiles]
+
+
+class _Stats:
+    """Counters and recent timings of one model (or of all models)"""
+
+    def __init__(self, window):
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cost = 0.0
+        self.latencies = deque(maxlen=window)
+        self.queue_waits = deque(maxlen=window)
+        self.parse_times = deque(maxlen=window)
+
+    def add(self, record):
+        self.requests += 1
+        self.errors += record["error"]
+        self.cache_hits += record["cache_hit"]
+        self.retries += record["retries"]
+        self.prompt_tokens += record["prompt_tokens"]
+        self.completion_tokens += record["completion_tokens"]
+        self.cached_tokens += record["cached_tokens"]
+        self.cost += record["cost"]
+        self.queue_waits.append(record["queue_wait"])
+        if not record["cache_hit"]:
+            # Cache hits would drag the API latency towards zero
+            self.latencies.append(record["latency"])
+        if record["parse_time"] is not None:
+            self.parse_times.append(record["parse_time"])
+
+    def as_row(self, model):
+        latency_p50, latency_p95, latency_p99 = percentiles(self.latencies, QUANTILES)
+        queue_wait_p50, queue_wait_p95 = percentiles(self.queue_waits, (0.5, 0.95))
+        parse_times = self.parse_times
+        return {
+            "model": model,
+            "requests": self.requests,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cost_usd": round(self.cost, 6),
+            "latency_p50": latency_p50,
+            "latency_p95": latency_p95,
+            "latency_p99": latency_p99,
+            "queue_wait_p50": queue_wait_p50,
+            "queue_wait_p95": queue_wait_p95,
+            "parse_time_mean": sum(parse_times) / len(parse_times) if parse_times else None
+        }
+
+
+class MetricsCollector:
+    """
+    Thread-safe collector of request and row metrics
+
+    LLMProcessor records one entry per API request (queue wait, latency,
+    tokens, retries, parse time) and the concurrent engine records finished
+    rows. Totals are kept exactly; percentiles are computed over the last
+    METRICS_WINDOW requests. The GUI status bar and the command-line
+    progress output read status_text(), which only sorts the overall
+    latency window; snapshot() computes every percentile and is meant for
+    exports (Prometheus text file or CSV). Callers build the text when it
+    is shown, not per row.
+    """
+
+    def __init__(self, window=METRICS_WINDOW):
+        """
+        Initialize the collector
+
+        Args:
+            window: Number of recent requests used for percentiles
+        """
+        self.window = window
+        self.started = time.monotonic()
+        self.rows = 0
+        self.failed_rows = 0
+
+        self._total = _Stats(window)
+        self._per_model = {}
+        self._lock = threading.Lock()
+
+    def record_request(self, model, queue_wait, latency, parse_time=None,
+                       prompt_tokens=0, completion_tokens=0, cached_tokens=0,
+                       retries=0, cache_hit=False, error=False):
+        """
+        Record one API request
+
+        Args:
+            model: Model name
+            queue_wait: Seconds between submission and sending (thread pool and rate limiter)
+            latency: Seconds spent in the API call (last attempt)
+            parse_time: Seconds spent parsing the response (None if not parsed)
+            prompt_tokens: Prompt tokens reported in the usage
+            completion_tokens: Completion tokens reported in the usage
+            cached_tokens: Prompt tokens served from the prompt cache
+            retries: Failed attempts before the final one
+            cache_hit: True if answered from the local response cache
+            error: True if the request or its parsing failed
+        """
+        record = {
+            "queue_wait": queue_wait,
+            "latency": latency,
+            "parse_time": parse_time,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "retries": retries,
+            "cache_hit": bool(cache_hit),
+            "error": bool(error),
+            "cost": estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+        }
+        with self._lock:
+            self._total.add(record)
+            stats = self._per_model.get(model)
+            if stats is None:
+                stats = self._per_model[model] = _Stats(self.window)
+            stats.add(record)
+
+    def record_rows(self, count, failed=0):
+        """
+        Record finished rows
+
+        Args:
+            count: Number of rows written back
+            failed: How many of them carry an error
+        """
+        with self._lock:
+            self.rows += count
+            self.failed_rows += failed
+
+    def snapshot(self):
+        """
+        Return the current aggregates
+
+        Returns:
+            dict: Totals, rates, percentiles and cost ("models" holds one row per model)
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            total = self._total.as_row("all")
+            models = [stats.as_row(model) for model, stats in sorted(self._per_model.items())]
+            rows = self.rows
+            failed_rows = self.failed_rows
+
+        tokens = total["prompt_tokens"] + total["completion_tokens"]
+        total.update({
+            "elapsed_seconds": elapsed,
+            "rows": rows,
+            "failed_rows": failed_rows,
+            "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+            "tokens_per_second": tokens / elapsed if elapsed > 0 else 0.0,
+            "models": models
+        })
+        return total
+
+    def status_text(self, row_rate=True):
+        """
+        Return a one-line summary for status bars and progress output
+
+        Args:
+            row_rate: Include rows/s (off for callers that show their own rate)
+
+        Returns:
+            str: e.g. "2.41 rows/s | p95 3.2s | 5.1k tok/s | $0.0421"
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            rows = self.rows
+            tokens = self._total.prompt_tokens + self._total.completion_tokens
+            cost = self._total.cost
+            latencies = list(self._total.latencies)
+
+        latency_p95 = percentile(latencies, 0.95)
+        parts = []
+        if row_rate:
+            parts.append(f"{rows / elapsed if elapsed > 0 else 0.0:.2f} rows/s")
+        if latency_p95 is not None:
+            parts.append(f"p95 {latency_p95:.1f}s")
+        parts.append(f"{(tokens / elapsed if elapsed > 0 else 0.0) / 1000:.1f}k tok/s")
+        parts.append(f"${cost:.4f}")
+        return " | ".join(parts)
+
+    def write_prometheus(self, path):
+        """
+        Write the aggregates in the Prometheus text exposition format
+
+        The file is replaced atomically, so it can be read by the node
+        exporter's textfile collector while a run is in progress.
+
+        Args:
+            path: Output file path
+
+        Returns:
+            str: Path of the written file
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, metric_type, help_text, samples):
+            full_name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            for labels, value in samples:
+                if value is None:
+                    continue
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{full_name}{{{label_text}}} {value}" if label_text
+                             else f"{full_name} {value}")
+
+        models = snapshot["models"]
+        metric("rows_total", "counter", "Rows written back",
+               [({}, snapshot["rows"])])
+        metric("failed_rows_total", "counter", "Rows written back with an error",
+               [({}, snapshot["failed_rows"])])
+        metric("rows_per_second", "gauge", "Average rows per second since start",
+               [({}, round(snapshot["rows_per_second"], 4))])
+        metric("tokens_per_second", "gauge", "Average tokens per second since start",
+               [({}, round(snapshot["tokens_per_second"], 2))])
+        for name, key, help_text in (
+            ("requests_total", "requests", "API requests"),
+            ("request_errors_total", "errors", "API requests that failed"),
+            ("cache_hits_total", "cache_hits", "Requests answered from the local cache"),
+            ("retries_total", "retries", "Retried API attempts"),
+            ("cost_usd_total", "cost_usd", "Estimated cost in USD")
+        ):
+            metric(name, "counter", help_text,
+                   [({"model": row["model"]}, row[key]) for row in models])
+        metric("tokens_total", "counter", "Tokens reported in the API usage", [
+            ({"model": row["model"], "kind": kind}, row[f"{kind}_tokens"])
+            for row in models for kind in ("prompt", "completion", "cached")
+        ])
+        metric("request_latency_seconds", "summary", "API request latency", [
+            ({"model": row["model"], "quantile": str(q)}, row[f"latency_p{round(q * 100)}"])
+            for row in models for q in QUANTILES
+        ])
+        metric("queue_wait_seconds", "summary", "Time from submission to sending", [
+            ({"model": row["model"], "quantile": str(q)}, row[f"queue_wait_p{round(q * 100)}"])
+            for row in models for q in (0.5, 0.95)
+        ])
+
+        return self._write_atomic(path, "\n".join(lines) + "\n")
+
+    def write_csv(self, path):
+        """
+        Write the aggregates as CSV (one row per model plus an "all" row)
+
+        Args:
+            path: Output file path
+
+        Returns:
+            str: Path of the written file
+        """
+        snapshot = self.snapshot()
+        fields = CSV_FIELDS + ["rows", "failed_rows", "rows_per_second",
+                               "tokens_per_second", "elapsed_seconds"]
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            for row in snapshot["models"]:
+                writer.writerow(row)
+            writer.writerow(snapshot)
+        os.replace(tmp_path, path)
+        return path
+
+    def export(self, path):
+        """
+        Write the aggregates in the format given by the file extension
+
+        Args:
+            path: Output file path (.csv for CSV, anything else for Prometheus text)
+
+        Returns:
+            str: Path of the written file
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if path.lower().endswith(".csv"):
+            return self.write_csv(path)
+        return self.write_prometheus(path)
+
+    @staticmethod
+    def _write_atomic(path, text):
+        """Write text to a temporary file and move it over path"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,139 @@
+"""
+Pack Size Tuner Module
+Chooses how many rows to pack into one request from measured token use and errors
+"""
+
+import threading
+from src.config import (
+    MAX_PACK_SIZE,
+    PACK_TUNER_MAX_ERROR_RATE,
+    PACK_TUNER_MIN_ROWS
+)
+
+
+class PackStats:
+    """Accumulated measurements for one pack size"""
+
+    def __init__(self):
+        self.rows = 0
+        self.tokens = 0
+        self.failed_rows = 0
+
+    @property
+    def tokens_per_row(self):
+        """Average tokens per row, including single-row fallback calls"""
+        return self.tokens / self.rows if self.rows else 0.0
+
+    @property
+    def error_rate(self):
+        """Share of rows that had to be re-sent as single-row calls"""
+        return self.failed_rows / self.rows if self.rows else 0.0
+
+
+class PackSizeTuner:
+    """
+    Searches for the pack size with the fewest tokens per row
+
+    Starting from an initial size, the tuner doubles the pack size while the
+    share of rows needing a fallback call stays below max_error_rate. When a
+    size is too error-prone it becomes the ceiling and the tuner returns to
+    the best acceptable size measured so far (or halves if there is none).
+    Once every candidate has been measured, the size with the lowest
+    tokens per row (fallback calls included) is used.
+    """
+
+    def __init__(self, initial_size=4, max_size=MAX_PACK_SIZE,
+                 max_error_rate=PACK_TUNER_MAX_ERROR_RATE, min_rows=PACK_TUNER_MIN_ROWS):
+        """
+        Initialize the tuner
+
+        Args:
+            initial_size: Pack size to measure first
+            max_size: Largest pack size to try
+            max_error_rate: Largest acceptable share of rows needing a fallback call
+            min_rows: Rows to measure per pack size before deciding
+        """
+        self.max_size = max_size
+        self.max_error_rate = max_error_rate
+        self.min_rows = min_rows
+        self.pack_size = max(1, min(initial_size, max_size))
+
+        self._ceiling = max_size
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, pack_size, rows, tokens, failed_rows):
+        """
+        Record the outcome of one packed request
+
+        Args:
+            pack_size: Pack size the rows were chunked with
+            rows: Rows sent (fewer than pack_size for a short last chunk)
+            tokens: Total tokens of the packed call and its fallback calls
+            failed_rows: Rows that needed a single-row fallback call
+        """
+        with self._lock:
+            stats = self._stats.setdefault(pack_size, PackStats())
+            stats.rows += rows
+            stats.tokens += tokens
+            stats.failed_rows += failed_rows
+
+    def suggest(self):
+        """
+        Return the pack size to use for the next request
+
+        Returns:
+            int: Rows per request
+        """
+        with self._lock:
+            current = self.pack_size
+            stats = self._stats.get(current)
+            if stats is None or stats.rows < self.min_rows:
+                return current
+
+            if stats.error_rate > self.max_error_rate and current > 1:
+                # Too many rows come back unusable at this size
+                self._ceiling = current - 1
+                best = self._best_size()
+                if best is None:
+                    best = max(1, min(current // 2, self._ceiling))
+                self.pack_size = best
+            else:
+                candidate = min(current * 2, self._ceiling)
+                if candidate > current and candidate not in self._stats:
+                    self.pack_size = candidate
+                else:
+                    self.pack_size = self._best_size() or current
+
+            return self.pack_size
+
+    def summary(self):
+        """
+        Return the measurements per pack size
+
+        Returns:
+            list: Dicts with pack_size, rows, tokens_per_row and error_rate
+        """
+        with self._lock:
+            return [
+                {
+                    "pack_size": size,
+                    "rows": stats.rows,
+                    "tokens_per_row": round(stats.tokens_per_row, 1),
+                    "error_rate": round(stats.error_rate, 4)
+                }
+                for size, stats in sorted(self._stats.items())
+            ]
+
+    def _best_size(self):
+        """Return the acceptable size with the fewest tokens per row, or None (lock held)"""
+        candidates = [
+            (stats.tokens_per_row, size)
+            for size, stats in self._stats.items()
+            if size <= self._ceiling
+            and stats.rows >= self.min_rows
+            and stats.error_rate <= self.max_error_rate
+        ]
+        if not candidates:
+            return None
+        return min(candidates)[1]
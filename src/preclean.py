@@ -0,0 +1,291 @@
+"""
+Pre-cleaning Module
+Deterministic, vectorized clean-up of the input columns before the LLM call
+"""
+
+import re
+import numpy as np
+import pandas as pd
+from src.config import INPUT_COLUMNS, DITTO_COLUMNS, DITTO_BLANK_COURT
+
+# Input fields that describe the firm; rows without any are resolved locally
+CONTENT_FIELDS = ["firm_name", "firm_location", "owner", "managers", "notes"]
+
+# Input fields whose letter-spaced words are collapsed (headings set in spaced type)
+LETTER_SPACED_FIELDS = ["firm_name", "firm_location"]
+
+# Columns added next to the input fields
+PRE_CLEANED_DATE = "pre_cleaned_date"
+PRE_LEGAL_IDENTIFIER = "pre_legal_identifier"
+PRE_RESOLVED = "pre_resolved"
+INHERITED_FIELDS = "inherited_fields"
+
+_LETTER = r"[^\W\d_]"
+
+# "keres-\nkedő" -> "kereskedő" (only before a lowercase continuation)
+HYPHENATED_BREAK = re.compile(r"(?<=[^\W\d_])-[ \t]*\n\s*(?=[a-záéíóöőúüű])")
+
+# Any run of whitespace, including the line breaks of multi-line cells
+WHITESPACE = re.compile(r"\s+")
+
+# Three or more single letters separated by single spaces: "P o z s o n y".
+# Only collapsed in LETTER_SPACED_FIELDS: Hungarian has one-letter words
+# ("a", "s", "e", "ő"), so "a s a" in the notes or names is real text
+LETTER_SPACED = re.compile(rf"(?<!\S)(?:{_LETTER} ){{2,}}{_LETTER}(?!\S)")
+
+# "1899. május 31." (Hungarian order) and "27. Gennaio 1899." (Italian order)
+DATE_YEAR_FIRST = re.compile(
+    rf"(?P<year>1[789]\d\d)\.?\s*(?P<month>{_LETTER}+)[.,:]*\s*(?P<day>\d{{1,2}})\b"
+)
+DATE_DAY_FIRST = re.compile(
+    rf"\b(?P<day>\d{{1,2}})\.?\s*(?P<month>{_LETTER}+)\s*(?P<year>1[789]\d\d)\b"
+)
+
+# "3476. sz. 81/3", "4158/99. sz. 11/15", "No. 924. 38/3"
+LEGAL_ID_SZ = re.compile(
+    r"(?P<number>\d+(?:/\d+)?)\s*\.?\s*sz\s*\.?['\s]*(?P<folio>\d+\s*/\s*\d+)",
+    re.IGNORECASE
+)
+LEGAL_ID_NO = re.compile(
+    r"No\s*\.?\s*(?P<number>\d+)\s*\.?\s*(?P<folio>\d+\s*/\s*\d+)"
+)
+
+# Cells that only hold a "same as above" mark (", „, », >>, ...)
+DITTO_MARK = re.compile(r"[\"„“”‟»«<>'’‘`´〃 ]+")
+
+# Court names are long; anything this short in the court column is an OCR'd
+# ditto mark ("ii", "ff", "1»", ...), except dashes, which mean "none"
+COURT_DITTO = re.compile(r"(?![-–—]+$).{1,3}")
+
+# Month name stems (Hungarian with period spellings, Italian, German) -> month
+MONTH_STEMS = [
+    (r"^(?:jan|genn)", 1),
+    (r"^(?:feb)", 2),
+    (r"^(?:márc|marc|marz|märz)", 3),
+    (r"^(?:ápr|apr)", 4),
+    (r"^(?:máj|maj|mai|magg)", 5),
+    (r"^(?:jún|jun|giug)", 6),
+    (r"^(?:júl|jul|lug)", 7),
+    (r"^(?:aug|agos)", 8),
+    (r"^(?:szep|sep|sett)", 9),
+    (r"^(?:okt|oct|ott)", 10),
+    (r"^(?:nov)", 11),
+    (r"^(?:dec|dic|dez|deez)", 12)
+]
+
+
+def _to_text(values):
+    """Convert a column to strings, with missing cells as empty strings"""
+    return values.astype(object).where(values.notna(), "").astype(str)
+
+
+def lacks_content(fields):
+    """
+    Mark the rows without firm content: every CONTENT_FIELDS cell is empty or whitespace
+
+    Rows marked here are resolved by the rules (pre_resolved) and counted as
+    skipped by the row status index. Raw and normalized fields give the same
+    result, since normalizing never empties or fills a cell.
+
+    Args:
+        fields: DataFrame with input fields as columns (missing fields count as empty)
+
+    Returns:
+        pandas.Series: True for rows without firm content
+    """
+    empty = pd.Series(True, index=fields.index)
+    for name in CONTENT_FIELDS:
+        if name in fields.columns:
+            empty &= _to_text(fields[name]).str.strip().eq("")
+    return empty
+
+
+def normalize_text(values, collapse_letter_spacing=False):
+    """
+    Normalize an input column
+
+    Missing cells become empty strings, words broken across lines are
+    joined and whitespace is collapsed to single spaces. Optionally,
+    letter-spaced words ("P o z s o n y") are collapsed ("Pozsony").
+
+    Args:
+        values: pandas Series of raw cell values
+        collapse_letter_spacing: Collapse letter-spaced words (see LETTER_SPACED_FIELDS)
+
+    Returns:
+        pandas.Series: Normalized strings (object dtype)
+    """
+    text = _to_text(values)
+    text = text.str.replace(HYPHENATED_BREAK, "", regex=True)
+    text = text.str.replace(WHITESPACE, " ", regex=True).str.strip()
+    if collapse_letter_spacing:
+        text = text.str.replace(LETTER_SPACED, lambda m: m.group(0).replace(" ", ""), regex=True)
+    return text.astype(object)
+
+
+def _month_numbers(words):
+    """Map month words to month numbers (NaN where unknown)"""
+    words = words.str.lower()
+    months = pd.Series(float("nan"), index=words.index)
+    for stem, number in MONTH_STEMS:
+        months = months.mask(months.isna() & words.str.contains(stem, regex=True, na=False), number)
+    return months
+
+
+def _format_dates(parts):
+    """Format extracted year/month/day parts as YYYY.MM.DD. (NaN if invalid)"""
+    months = _month_numbers(parts["month"])
+    days = pd.to_numeric(parts["day"], errors="coerce")
+    valid = months.notna() & days.between(1, 31)
+
+    dates = pd.Series(float("nan"), index=parts.index, dtype=object)
+    dates[valid] = (
+        parts.loc[valid, "year"] + "."
+        + months[valid].astype(int).map("{:02d}".format) + "."
+        + days[valid].astype(int).map("{:02d}".format) + "."
+    )
+    return dates
+
+
+def extract_dates(text):
+    """
+    Extract the registration date from the date and legal ID column
+
+    Args:
+        text: Normalized date_and_legal_id strings
+
+    Returns:
+        pandas.Series: "YYYY.MM.DD." strings, "" where no date was recognized
+    """
+    dates = _format_dates(text.str.extract(DATE_YEAR_FIRST))
+    missing = dates.isna()
+    if missing.any():
+        dates[missing] = _format_dates(text[missing].str.extract(DATE_DAY_FIRST))
+    return dates.fillna("").astype(object)
+
+
+def extract_legal_identifiers(text):
+    """
+    Extract the legal identifier (docket number and folio) from the date and legal ID column
+
+    Args:
+        text: Normalized date_and_legal_id strings
+
+    Returns:
+        pandas.Series: "3476. sz. 81/3" style strings, "" where none was recognized
+    """
+    sz = text.str.extract(LEGAL_ID_SZ)
+    folio = sz["folio"].str.replace(WHITESPACE, "", regex=True)
+    identifiers = sz["number"] + ". sz. " + folio
+
+    missing = identifiers.isna()
+    if missing.any():
+        no = text[missing].str.extract(LEGAL_ID_NO)
+        folio = no["folio"].str.replace(WHITESPACE, "", regex=True)
+        identifiers[missing] = "No. " + no["number"] + ". " + folio
+
+    return identifiers.fillna("").astype(object)
+
+
+def input_fields_frame(df, normalize=True):
+    """
+    Return the input fields of a workbook as named string columns
+
+    Input columns are addressed by position, as everywhere else. The result
+    has one column per input field, named as in INPUT_COLUMNS, without the
+    ignored column.
+
+    Args:
+        df: pandas.DataFrame as loaded by DataHandler
+        normalize: Apply normalize_text (otherwise only missing cells become "")
+
+    Returns:
+        pandas.DataFrame: Input fields with the same index as df
+    """
+    fields = {}
+    for position, name in INPUT_COLUMNS.items():
+        if name == "ignored_column":
+            continue
+        if position < len(df.columns):
+            values = df.iloc[:, position]
+            if normalize:
+                fields[name] = normalize_text(values, name in LETTER_SPACED_FIELDS)
+            else:
+                fields[name] = _to_text(values).astype(object)
+        else:
+            fields[name] = pd.Series("", index=df.index, dtype=object)
+    return pd.DataFrame(fields, index=df.index)
+
+
+def resolve_ditto_marks(fields, carry=None, columns=DITTO_COLUMNS,
+                        blank_court_is_ditto=DITTO_BLANK_COURT):
+    """
+    Replace "same as above" marks with the value they refer to
+
+    Each marked cell takes the last value above it that is neither a mark
+    nor empty (a forward fill), so every row carries its own court,
+    location, etc. and can be processed in any order. The names of the
+    inherited fields are recorded per row in the inherited_fields column
+    (semicolon-separated, "" if none). Marks with nothing above them are
+    left as they are.
+
+    Args:
+        fields: Input fields frame (modified in place)
+        carry: Last values of the previous chunk, from an earlier call (streaming)
+        columns: Field names to resolve
+        blank_court_is_ditto: Also fill empty court cells
+
+    Returns:
+        dict: Last value per field, to pass as carry for the next chunk
+    """
+    carry = dict(carry or {})
+    inherited = pd.Series("", index=fields.index, dtype=object)
+
+    for name in columns:
+        if name not in fields.columns:
+            continue
+        values = fields[name]
+        blank = values.eq("")
+        is_ditto = values.str.fullmatch(COURT_DITTO if name == "court" else DITTO_MARK)
+        is_ditto = is_ditto.fillna(False).astype(bool) & ~blank
+        if name == "court" and blank_court_is_ditto:
+            is_ditto |= blank
+
+        # Values that can be referred to; marks and empty cells are skipped
+        source = values.mask(is_ditto | blank)
+        filled = source.ffill()
+        if carry.get(name):
+            filled = filled.fillna(carry[name])
+
+        resolved = is_ditto & filled.notna()
+        if resolved.any():
+            fields.loc[resolved, name] = filled[resolved]
+            inherited = inherited + np.where(resolved, f"{name};", "")
+
+        last_values = source.dropna()
+        if len(last_values):
+            carry[name] = last_values.iloc[-1]
+
+    fields[INHERITED_FIELDS] = inherited.str.rstrip(";").astype(object)
+    return carry
+
+
+def preclean_frame(df):
+    """
+    Pre-clean the input columns of a workbook
+
+    The result holds the normalized input fields (see input_fields_frame),
+    the date and legal identifier recognized by the rules, and a flag for
+    rows that need no LLM call because they carry no firm content at all.
+
+    Args:
+        df: pandas.DataFrame as loaded by DataHandler
+
+    Returns:
+        pandas.DataFrame: Pre-cleaned fields with the same index as df
+    """
+    precleaned = input_fields_frame(df)
+    precleaned[PRE_CLEANED_DATE] = extract_dates(precleaned["date_and_legal_id"])
+    precleaned[PRE_LEGAL_IDENTIFIER] = extract_legal_identifiers(precleaned["date_and_legal_id"])
+    precleaned[PRE_RESOLVED] = lacks_content(precleaned)
+    return precleaned
@@ -0,0 +1,320 @@
+"""
+Rate Limiter Module
+Token-bucket request/token limits with adaptive (AIMD) concurrency control
+"""
+
+import random
+import re
+import threading
+import time
+from src.config import (
+    RATE_LIMIT_REQUESTS_PER_MINUTE,
+    RATE_LIMIT_TOKENS_PER_MINUTE,
+    DEFAULT_MAX_WORKERS,
+    MAX_WORKERS_LIMIT,
+    BACKOFF_BASE_SECONDS,
+    BACKOFF_MAX_SECONDS,
+    AIMD_LATENCY_SPIKE_FACTOR
+)
+
+# Durations in x-ratelimit-reset-* headers, e.g. "1s", "6m0s", "20ms"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset_duration(value):
+    """
+    Parse a rate limit reset duration
+
+    Args:
+        value: Header value such as "1s", "6m0s" or "20ms"
+
+    Returns:
+        float: Seconds, or None if the value cannot be parsed
+    """
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def backoff_delay(attempt, retry_after=None,
+                  base=BACKOFF_BASE_SECONDS, cap=BACKOFF_MAX_SECONDS):
+    """
+    Return how long to wait before retry number attempt
+
+    Uses exponential backoff with full jitter, so workers that hit a limit
+    together do not retry together. A server-provided retry-after is
+    respected as the minimum.
+
+    Args:
+        attempt: Retry number (0 for the first retry)
+        retry_after: Seconds requested by the server (optional)
+        base: Base delay in seconds
+        cap: Maximum delay in seconds
+
+    Returns:
+        float: Seconds to sleep
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after + random.uniform(0, base))
+    return delay
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding one minute's worth of capacity"""
+
+    def __init__(self, per_minute):
+        """
+        Initialize the bucket (full)
+
+        Args:
+            per_minute: Capacity refilled per minute
+        """
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        """Add the capacity earned since the last update"""
+        elapsed = now - self._updated
+        self.available = min(self.capacity, self.available + elapsed * self.capacity / 60.0)
+        self._updated = now
+
+    def time_until(self, amount, now):
+        """
+        Return the seconds until amount is available (0 if it is now)
+
+        Requests larger than the bucket only wait for it to be full.
+        """
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) * 60.0 / self.capacity
+
+    def take(self, amount):
+        """Consume capacity (may go negative when correcting estimates)"""
+        self.available -= amount
+
+    def sync(self, limit, remaining, reset_seconds, now):
+        """
+        Align the bucket with the limits reported by the server
+
+        Args:
+            limit: Capacity per minute reported by the server
+            remaining: Capacity left in the current window
+            reset_seconds: Seconds until the window is fully restored (optional)
+            now: Current monotonic time
+        """
+        self._refill(now)
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.available = min(self.available, float(remaining))
+        if reset_seconds is not None and remaining is not None and reset_seconds > 0:
+            # The server refills faster than capacity/minute only when near reset
+            self.available = max(self.available, self.capacity - reset_seconds * self.capacity / 60.0)
+            self.available = min(self.available, float(remaining))
+
+
+class AIMDController:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit
+
+    The limit grows by one after a full window of successful requests and
+    is halved on a 429 or when latency jumps well above its running
+    average. Decreases are spaced by a cooldown, so a burst of 429s from
+    requests that were already in flight counts once.
+    """
+
+    def __init__(self, initial=DEFAULT_MAX_WORKERS, minimum=1, maximum=MAX_WORKERS_LIMIT,
+                 latency_spike_factor=AIMD_LATENCY_SPIKE_FACTOR, cooldown_seconds=5.0):
+        """
+        Initialize the controller
+
+        Args:
+            initial: Starting concurrency limit
+            minimum: Lowest limit
+            maximum: Highest limit
+            latency_spike_factor: Latency above this multiple of the average counts as a spike
+            cooldown_seconds: Minimum time between two decreases
+        """
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_spike_factor = latency_spike_factor
+        self.cooldown_seconds = cooldown_seconds
+
+        self._limit = float(max(minimum, min(initial, maximum)))
+        self._average_latency = None
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self):
+        """Current number of requests allowed in flight"""
+        with self._lock:
+            return int(self._limit)
+
+    def on_success(self, latency):
+        """
+        Record a successful request
+
+        Args:
+            latency: Request latency in seconds
+        """
+        with self._lock:
+            average = self._average_latency
+            self._average_latency = latency if average is None else 0.9 * average + 0.1 * latency
+
+            if average is not None and latency > self.latency_spike_factor * average:
+                self._decrease()
+                return
+
+            # +1 per window of successful requests
+            self._limit = min(self.maximum, self._limit + 1.0 / self._limit)
+
+    def reset(self, initial):
+        """
+        Restart from a concurrency limit (e.g. the worker count chosen for a new run)
+
+        Args:
+            initial: New concurrency limit
+        """
+        with self._lock:
+            self._limit = float(max(self.minimum, min(initial, self.maximum)))
+
+    def on_rate_limited(self):
+        """Record a 429 response"""
+        with self._lock:
+            self._decrease()
+
+    def _decrease(self):
+        """Halve the limit unless a decrease happened during the cooldown (lock held)"""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown_seconds:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.minimum), self._limit / 2.0)
+
+
+class RateLimiter:
+    """
+    Client-side limiter for requests per minute and tokens per minute
+
+    Callers acquire() before each request with an estimate of its tokens and
+    report the outcome afterwards. The buckets are re-synchronised from the
+    x-ratelimit-* headers of every response, so the configured limits only
+    matter until the first response arrives. The AIMD controller in
+    `concurrency` decides how many requests the engine keeps in flight.
+    """
+
+    def __init__(self, requests_per_minute=RATE_LIMIT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=RATE_LIMIT_TOKENS_PER_MINUTE, concurrency=None,
+                 max_concurrency=DEFAULT_MAX_WORKERS):
+        """
+        Initialize the limiter
+
+        Args:
+            requests_per_minute: Initial request limit
+            tokens_per_minute: Initial token limit
+            concurrency: AIMDController (default: a new one starting at max_concurrency)
+            max_concurrency: Initial concurrency limit, normally the worker count
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = concurrency or AIMDController(initial=max_concurrency)
+        self.rate_limited_count = 0
+
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+    def acquire(self, estimated_tokens):
+        """
+        Block until a request with the estimated tokens may be sent
+
+        Args:
+            estimated_tokens: Estimated prompt + completion tokens
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max(
+                    self._paused_until - now,
+                    self.requests.time_until(1, now),
+                    self.tokens.time_until(estimated_tokens, now)
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(estimated_tokens)
+                    return now - started
+            time.sleep(min(wait, 1.0))
+
+    def on_response(self, headers, latency, estimated_tokens, actual_tokens=None):
+        """
+        Record a successful response
+
+        Args:
+            headers: Response headers (mapping)
+            latency: Request latency in seconds
+            estimated_tokens: Tokens reserved in acquire()
+            actual_tokens: Tokens reported in the usage (optional)
+        """
+        with self._lock:
+            if actual_tokens is not None:
+                # Correct the reservation with the real usage
+                self.tokens.take(actual_tokens - estimated_tokens)
+            self._sync_headers(headers)
+        self.concurrency.on_success(latency)
+
+    def on_rate_limited(self, headers=None):
+        """
+        Record a 429 response and pause all workers until the limit resets
+
+        Args:
+            headers: Response headers (mapping, optional)
+
+        Returns:
+            float: Seconds the server asked to wait, or None
+        """
+        retry_after = None
+        if headers is not None:
+            retry_after = parse_reset_duration(headers.get("retry-after"))
+
+        with self._lock:
+            self.rate_limited_count += 1
+            if headers is not None:
+                self._sync_headers(headers)
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+        self.concurrency.on_rate_limited()
+        return retry_after
+
+    def _sync_headers(self, headers):
+        """Update both buckets from x-ratelimit-* headers (lock held)"""
+        now = time.monotonic()
+        for name, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+            limit = _to_number(headers.get(f"x-ratelimit-limit-{name}"))
+            remaining = _to_number(headers.get(f"x-ratelimit-remaining-{name}"))
+            reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{name}"))
+            if limit is not None or remaining is not None:
+                bucket.sync(limit, remaining, reset, now)
+
+
+def _to_number(value):
+    """Parse a numeric header value, or return None"""
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
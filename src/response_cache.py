@@ -0,0 +1,242 @@
+"""
+Response Cache Module
+Persistent, content-addressed cache of LLM responses
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from src.config import CACHE_MAX_ENTRIES, CACHE_MAX_AGE_DAYS
+
+# Run eviction after this many new entries
+EVICTION_INTERVAL = 1000
+
+# Write buffered access times after this many hits (they are also written
+# with the next put, eviction or close)
+ACCESS_FLUSH_INTERVAL = 256
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache keyed by a hash of the full request body
+
+    The key covers the model, system prompt, rendered user prompt and
+    response format, so any change to one of them is a cache miss.
+    Identical requests that are in flight at the same time are collapsed
+    into a single API call. Entries older than max_age_days are dropped,
+    and the least recently used entries are dropped beyond max_entries.
+    Lookups only read; their access times are buffered and written in
+    batches, so cache hits do not wait for a commit.
+    """
+
+    def __init__(self, path, max_entries=CACHE_MAX_ENTRIES, max_age_days=CACHE_MAX_AGE_DAYS):
+        """
+        Open (or create) the cache
+
+        Args:
+            path: Path to the SQLite database file
+            max_entries: Maximum number of cached responses
+            max_age_days: Maximum age of a cached response in days
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._puts_since_eviction = 0
+        self._pending_access = {}  # Key -> last access time not written yet
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " content TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(request_body):
+        """
+        Compute the cache key of a request
+
+        Args:
+            request_body: Chat completion request body
+
+        Returns:
+            str: Hex SHA-256 digest of the canonical JSON body
+        """
+        canonical = json.dumps(request_body, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cached response
+
+        Args:
+            key: Cache key
+
+        Returns:
+            str: Cached content, or None on a miss
+        """
+        with self._lock:
+            return self._get_locked(key)
+
+    def put(self, key, content):
+        """
+        Store a response
+
+        Args:
+            key: Cache key
+            content: Response content
+        """
+        with self._lock:
+            self._put_locked(key, content)
+
+    def get_or_compute(self, key, compute, validate=None):
+        """
+        Return the cached response or compute it exactly once
+
+        Concurrent callers with the same key wait for the first caller's
+        result instead of issuing their own request.
+
+        Args:
+            key: Cache key
+            compute: Callable returning the response content
+            validate: Optional callable; content is only stored if it returns True
+
+        Returns:
+            str: Response content
+        """
+        with self._lock:
+            content = self._get_locked(key)
+            if content is not None:
+                self.hits += 1
+                return content
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self.misses += 1
+                future = Future()
+                self._inflight[key] = future
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            content = compute()
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if validate is None or validate(content):
+                self._put_locked(key, content)
+            self._inflight.pop(key, None)
+        future.set_result(content)
+
+        return content
+
+    def evict(self):
+        """Drop expired entries and trim the cache to max_entries"""
+        with self._lock:
+            self._evict_locked()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        """Write buffered access times and close the database connection"""
+        with self._lock:
+            self._flush_access_locked()
+            self._conn.commit()
+            self._conn.close()
+
+    def _get_locked(self, key):
+        """Look up a key (lock held)"""
+        row = self._conn.execute(
+            "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        content, created_at = row
+        now = time.time()
+        if now - created_at > self.max_age_seconds:
+            # Replaced by the next put, or dropped by the next eviction
+            return None
+
+        self._pending_access[key] = now
+        if len(self._pending_access) >= ACCESS_FLUSH_INTERVAL:
+            self._flush_access_locked()
+            self._conn.commit()
+        return content
+
+    def _flush_access_locked(self):
+        """Write the buffered access times, without committing (lock held)"""
+        if not self._pending_access:
+            return
+        self._conn.executemany(
+            "UPDATE responses SET last_access = ? WHERE key = ?",
+            [(accessed, key) for key, accessed in self._pending_access.items()]
+        )
+        self._pending_access.clear()
+
+    def _put_locked(self, key, content):
+        """Store a key (lock held)"""
+        now = time.time()
+        self._pending_access.pop(key, None)
+        self._flush_access_locked()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, content, created_at, last_access)"
+            " VALUES (?, ?, ?, ?)",
+            (key, content, now, now)
+        )
+        self._conn.commit()
+
+        self._puts_since_eviction += 1
+        if self._puts_since_eviction >= EVICTION_INTERVAL:
+            self._evict_locked()
+
+    def _evict_locked(self):
+        """Drop expired and least recently used entries (lock held)"""
+        self._flush_access_locked()
+        cutoff = time.time() - self.max_age_seconds
+        self._conn.execute("DELETE FROM responses WHERE created_at < ?", (cutoff,))
+
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+
+        self._conn.commit()
+        self._puts_since_eviction = 0
@@ -0,0 +1,137 @@
+"""
+Row Journal Module
+Durable append-only log of processed rows, keyed by row index
+"""
+
+import json
+import os
+import threading
+
+
+class RowJournal:
+    """
+    JSONL journal of row updates
+
+    Each update_row call appends one line, so recording a row costs the
+    same no matter how large the workbook is. On resume the journal is
+    replayed on top of the last Excel export; once a new export has been
+    written the journal is truncated.
+    """
+
+    def __init__(self, path, fsync=True):
+        """
+        Open (or create) a journal
+
+        Args:
+            path: Path to the JSONL journal file
+            fsync: Flush every entry to disk before returning from append()
+        """
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def append(self, index, cleaned_data):
+        """
+        Append one row update
+
+        Args:
+            index: Row index
+            cleaned_data: Dictionary with cleaned data
+        """
+        line = json.dumps(
+            {"row": int(index), "data": cleaned_data},
+            ensure_ascii=False,
+            default=str
+        )
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def replay(self):
+        """
+        Read back all journaled updates in write order
+
+        A torn last line (crash mid-write) is ignored.
+
+        Returns:
+            list: (row_index, cleaned_data) tuples
+        """
+        entries = []
+        with self._lock:
+            self._file.flush()
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    entries.append((entry["row"], entry["data"]))
+        return entries
+
+    def build_index(self):
+        """
+        Map each journaled row to the file offset of its latest entry
+
+        Used by streaming mode, which cannot keep every result in memory.
+
+        Returns:
+            dict: Row index -> byte offset
+        """
+        offsets = {}
+        with self._lock:
+            self._file.flush()
+            with open(self.path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    try:
+                        row = json.loads(line)["row"]
+                    except (json.JSONDecodeError, KeyError):
+                        row = None
+                    if row is not None:
+                        offsets[row] = offset
+                    offset += len(line)
+        return offsets
+
+    def read_entries(self, offsets):
+        """
+        Read the entries at the given offsets
+
+        Args:
+            offsets: Byte offsets from build_index()
+
+        Returns:
+            list: (row_index, cleaned_data) tuples
+        """
+        entries = []
+        with self._lock:
+            self._file.flush()
+            with open(self.path, 'rb') as f:
+                for offset in sorted(offsets):
+                    f.seek(offset)
+                    entry = json.loads(f.readline())
+                    entries.append((entry["row"], entry["data"]))
+        return entries
+
+    def truncate(self):
+        """Discard all entries (called after they were exported to Excel)"""
+        with self._lock:
+            self._file.truncate(0)
+            self._file.seek(0)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def is_empty(self):
+        """Return True if the journal holds no entries"""
+        with self._lock:
+            self._file.flush()
+            return os.path.getsize(self.path) == 0
+
+    def close(self):
+        """Close the journal file"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
@@ -0,0 +1,197 @@
+"""
+Row Status Module
+Compact per-row processing status with constant-time counts and lookups
+"""
+
+import numpy as np
+import pandas as pd
+from src.config import INPUT_COLUMNS, OUTPUT_COLUMNS, METADATA_COLUMNS
+from src.preclean import CONTENT_FIELDS, lacks_content
+
+# Row statuses
+PENDING = 0
+DONE = 1
+FAILED = 2
+SKIPPED = 3
+
+STATUS_NAMES = {
+    PENDING: "pending",
+    DONE: "done",
+    FAILED: "failed",
+    SKIPPED: "skipped"
+}
+
+# Rows examined per step when searching for the next pending row
+SEARCH_BLOCK_SIZE = 4096
+
+# Output columns written by the LLM (error results only carry the metadata)
+CONTENT_COLUMNS = [col for col in OUTPUT_COLUMNS if col not in METADATA_COLUMNS]
+
+# Input fields that carry firm content, by position (see preclean.CONTENT_FIELDS)
+CONTENT_INPUT_POSITIONS = {
+    position: name for position, name in INPUT_COLUMNS.items()
+    if name in CONTENT_FIELDS
+}
+
+
+def _is_blank(values):
+    """Return a boolean Series/DataFrame marking empty or whitespace-only cells"""
+    if isinstance(values, pd.DataFrame):
+        return values.apply(_is_blank)
+    return values.isna() | values.astype(str).str.strip().eq("")
+
+
+class RowStatusIndex:
+    """
+    One status byte per row (pending, done, failed, skipped)
+
+    Built once with vectorized operations when a workbook is loaded and kept
+    up to date by DataHandler.update_row. Counts are maintained
+    incrementally, the next pending row is found from a cursor that only
+    moves forward, and range queries work on array slices.
+    """
+
+    def __init__(self, statuses, first_row=0):
+        """
+        Initialize the index
+
+        Args:
+            statuses: numpy int8 array with one status per row
+            first_row: Row index of the first entry (non-zero for streamed chunks)
+        """
+        self.statuses = statuses
+        self.first_row = first_row
+        self._counts = np.bincount(statuses, minlength=len(STATUS_NAMES)).tolist()
+        self._cursor = 0
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """
+        Build the index for a DataFrame
+
+        A row is pending if its cleaning_date is empty, failed if it has a
+        cleaning_date but no cleaned content (an error result), and done
+        otherwise. Pending rows without firm content are skipped, by the
+        same rule that marks rows for local resolution
+        (preclean.lacks_content).
+
+        Args:
+            df: pandas.DataFrame with input and output columns
+
+        Returns:
+            RowStatusIndex: Index for the DataFrame
+        """
+        statuses = np.full(len(df), DONE, dtype=np.int8)
+
+        if len(df):
+            pending = _is_blank(df['cleaning_date']).to_numpy()
+            no_content = _is_blank(df[CONTENT_COLUMNS]).all(axis=1).to_numpy()
+            statuses[no_content] = FAILED
+            statuses[pending] = PENDING
+
+            input_columns = [col for col in df.columns if col not in OUTPUT_COLUMNS]
+            fields = pd.DataFrame({
+                name: df[input_columns[position]]
+                for position, name in CONTENT_INPUT_POSITIONS.items()
+                if position < len(input_columns)
+            }, index=df.index)
+            statuses[pending & lacks_content(fields).to_numpy()] = SKIPPED
+
+        first_row = int(df.index[0]) if len(df) and isinstance(df.index, pd.RangeIndex) else 0
+        return cls(statuses, first_row=first_row)
+
+    def __len__(self):
+        return len(self.statuses)
+
+    def get(self, index):
+        """Return the status of a row"""
+        return int(self.statuses[index - self.first_row])
+
+    def set(self, index, status):
+        """
+        Set the status of a row
+
+        Args:
+            index: Row index
+            status: PENDING, DONE, FAILED or SKIPPED
+        """
+        position = index - self.first_row
+        old_status = int(self.statuses[position])
+        if old_status == status:
+            return
+
+        self.statuses[position] = status
+        self._counts[old_status] -= 1
+        self._counts[status] += 1
+
+        if status == PENDING and position < self._cursor:
+            self._cursor = position
+
+    def count(self, status):
+        """Return the number of rows with a status"""
+        return self._counts[status]
+
+    def counts(self):
+        """
+        Return the number of rows per status
+
+        Returns:
+            dict: Status name -> count
+        """
+        return {name: self._counts[status] for status, name in STATUS_NAMES.items()}
+
+    def next_pending(self, start=None):
+        """
+        Return the first pending row at or after start
+
+        Args:
+            start: Row index to search from (default: the beginning)
+
+        Returns:
+            int: Row index, or -1 if there is none
+        """
+        if self._counts[PENDING] == 0:
+            return -1
+
+        if start is None or start - self.first_row <= self._cursor:
+            # Advance the cursor past rows that are no longer pending
+            position = self._find(PENDING, self._cursor)
+            self._cursor = len(self.statuses) if position < 0 else position
+        else:
+            position = self._find(PENDING, start - self.first_row)
+
+        return -1 if position < 0 else position + self.first_row
+
+    def count_in_range(self, status, start, end):
+        """Return the number of rows with a status in [start, end)"""
+        window = self.statuses[max(0, start - self.first_row):max(0, end - self.first_row)]
+        return int(np.count_nonzero(window == status))
+
+    def rows_with_status(self, statuses, start=None, end=None):
+        """
+        Return the rows having one of the given statuses
+
+        Args:
+            statuses: Status or tuple of statuses
+            start: First row index (default: the beginning)
+            end: Stop before this row index (default: the end)
+
+        Returns:
+            list: Row indices
+        """
+        lo = 0 if start is None else max(0, start - self.first_row)
+        hi = len(self.statuses) if end is None else max(0, end - self.first_row)
+        window = self.statuses[lo:hi]
+        mask = np.isin(window, np.atleast_1d(statuses))
+        return (np.flatnonzero(mask) + lo + self.first_row).tolist()
+
+    def _find(self, status, position):
+        """Return the first array position >= position with a status, or -1"""
+        # Search block by block so a nearby hit does not scan the whole array
+        while position < len(self.statuses):
+            window = self.statuses[position:position + SEARCH_BLOCK_SIZE]
+            hits = np.flatnonzero(window == status)
+            if len(hits):
+                return int(hits[0]) + position
+            position += SEARCH_BLOCK_SIZE
+        return -1
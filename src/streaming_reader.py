@@ -0,0 +1,144 @@
+"""
+Streaming Reader Module
+Reads large workbooks in fixed-size chunks with bounded memory
+"""
+
+import queue
+import threading
+import pandas as pd
+from openpyxl import load_workbook
+from src.config import STREAM_CHUNK_SIZE, STREAM_PREFETCH_CHUNKS
+
+
+def _make_columns(header):
+    """Name header cells the way pd.read_excel does (Unnamed: i, duplicates as name.1)"""
+    columns = []
+    seen = {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None or str(value).strip() == "" else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def iter_excel_chunks(file_path, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Read the first sheet of a workbook chunk by chunk
+
+    .xlsx files are read with openpyxl in read-only mode, so only the current
+    chunk is held in memory. Chunk indices continue across chunks, so row
+    labels match those of pd.read_excel on the whole file. Blank rows at the
+    end of the sheet are dropped, as pd.read_excel does.
+
+    .xls files cannot be streamed and are read whole, then split.
+
+    Args:
+        file_path: Path to the Excel file
+        chunk_size: Rows per chunk
+
+    Yields:
+        pandas.DataFrame: Next chunk of rows
+    """
+    if file_path.endswith('.xls'):
+        df = pd.read_excel(file_path, engine='xlrd')
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+        return
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _make_columns(header)
+        width = len(columns)
+
+        buffer = []
+        blank_rows = 0
+        offset = 0
+        for values in rows:
+            values = list(values[:width]) + [None] * (width - len(values))
+            if all(value is None for value in values):
+                # Held back until a non-blank row shows they are not trailing
+                blank_rows += 1
+                continue
+
+            buffer.extend([[None] * width] * blank_rows)
+            blank_rows = 0
+            buffer.append(values)
+
+            while len(buffer) >= chunk_size:
+                chunk, buffer = buffer[:chunk_size], buffer[chunk_size:]
+                yield pd.DataFrame(
+                    chunk,
+                    columns=columns,
+                    index=pd.RangeIndex(offset, offset + len(chunk))
+                )
+                offset += len(chunk)
+
+        if buffer:
+            yield pd.DataFrame(
+                buffer,
+                columns=columns,
+                index=pd.RangeIndex(offset, offset + len(buffer))
+            )
+    finally:
+        workbook.close()
+
+
+def prefetch_chunks(chunks, max_prefetch=STREAM_PREFETCH_CHUNKS):
+    """
+    Parse chunks on a background thread while the caller processes earlier ones
+
+    At most max_prefetch parsed chunks wait in the queue, which keeps
+    memory bounded. Exceptions from the reader are re-raised in the caller.
+
+    Args:
+        chunks: Chunk iterator (e.g. from iter_excel_chunks)
+        max_prefetch: Number of chunks parsed ahead
+
+    Yields:
+        pandas.DataFrame: Next chunk of rows
+    """
+    done = object()
+    buffer = queue.Queue(maxsize=max_prefetch)
+    stop_event = threading.Event()
+
+    def put(item):
+        # Give up if the consumer stopped iterating
+        while not stop_event.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+        except Exception as e:
+            put(e)
+            return
+        put(done)
+
+    thread = threading.Thread(target=produce, name="excel-reader", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop_event.set()
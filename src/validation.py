@@ -0,0 +1,353 @@
+"""
+Validation Module
+Local checks of a cleaned row: field validators, the schema and the pre-cleaned input
+"""
+
+import re
+from difflib import SequenceMatcher
+from src.config import RESPONSE_FORMAT, EVENT_TYPES, CASCADE_MIN_NAME_SIMILARITY
+from src.preclean import PRE_CLEANED_DATE, PRE_LEGAL_IDENTIFIER
+
+SCHEMA_PROPERTIES = RESPONSE_FORMAT["json_schema"]["schema"]["properties"]
+REQUIRED_FIELDS = RESPONSE_FORMAT["json_schema"]["schema"]["required"]
+
+# "YYYY.MM.DD." as asked for in the prompt
+CLEANED_DATE = re.compile(r"(\d{4})\.(\d{2})\.(\d{2})\.")
+
+# Registry entries of the digitized gazettes fall within these years
+PLAUSIBLE_YEARS = range(1840, 1950)
+
+_DIGITS = re.compile(r"\d+")
+
+# Fields holding semicolon-separated lists of names
+NAME_LIST_FIELDS = ["cleaned_owners", "cleaned_managers", "names_incoming", "names_outgoing"]
+
+# Words a personal name may start with besides the surname ("ifj. Kovács János")
+_NAME_PREFIXES = {"ifj.", "id.", "özv.", "dr.", "néh."}
+
+# JSON schema type -> Python types
+_SCHEMA_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,)
+}
+
+
+def check_schema(cleaned_data):
+    """
+    Check that every required field is present with the type of the schema
+
+    Args:
+        cleaned_data: Parsed model output
+
+    Returns:
+        dict: Field -> problem description (empty if the output is valid)
+    """
+    problems = {}
+    for field in REQUIRED_FIELDS:
+        if field not in cleaned_data:
+            problems[field] = "missing"
+            continue
+        value = cleaned_data[field]
+        prop = SCHEMA_PROPERTIES.get(field, {})
+        expected = _SCHEMA_TYPES.get(prop.get("type"))
+        # bool is an int subclass, but never a valid integer field
+        if expected and (not isinstance(value, expected) or
+                         (isinstance(value, bool) and bool not in expected)):
+            problems[field] = f"expected {prop['type']}, got {type(value).__name__}"
+            continue
+        if "minimum" in prop and value < prop["minimum"]:
+            problems[field] = f"below {prop['minimum']}"
+        elif "maximum" in prop and value > prop["maximum"]:
+            problems[field] = f"above {prop['maximum']}"
+    return problems
+
+
+def check_date(value):
+    """
+    Check that a cleaned date is a plausible YYYY.MM.DD. date
+
+    Args:
+        value: cleaned_date value
+
+    Returns:
+        str: Problem description, or None if the date is plausible
+    """
+    match = CLEANED_DATE.fullmatch(value.strip()) if isinstance(value, str) else None
+    if match is None:
+        return "not in YYYY.MM.DD. format"
+    year, month, day = (int(part) for part in match.groups())
+    if year not in PLAUSIBLE_YEARS:
+        return f"implausible year {year}"
+    if not 1 <= month <= 12 or not 1 <= day <= 31:
+        return "invalid month or day"
+    return None
+
+
+def validate_date(value):
+    """Validate cleaned_date: empty, or a plausible YYYY.MM.DD. date"""
+    if not isinstance(value, str):
+        return f"expected string, got {type(value).__name__}"
+    if not value.strip():
+        return None
+    return check_date(value)
+
+
+def validate_event_classification(value):
+    """Validate event_classification: an integer event type (1-6)"""
+    if isinstance(value, bool) or not isinstance(value, int):
+        return f"expected integer, got {type(value).__name__}"
+    if value not in EVENT_TYPES:
+        return f"{value} is not an event type ({min(EVENT_TYPES)}-{max(EVENT_TYPES)})"
+    return None
+
+
+def _looks_like_person_name(text):
+    """
+    Return True if text looks like a personal name ("Kovács János", "ifj. Weisz K. Mór")
+
+    A personal name has two to four capitalized words made of letters (and
+    hyphens or an initial's period), after optional prefixes such as "ifj.".
+    Places, occupations and addresses ("Budapest", "kereskedő",
+    "Váci utca 5") do not qualify.
+    """
+    words = text.split()
+    while words and words[0].lower() in _NAME_PREFIXES:
+        words = words[1:]
+    if not 2 <= len(words) <= 4:
+        return False
+    return all(
+        word[:1].isupper() and all(char.isalpha() or char in "-." for char in word)
+        for word in words
+    )
+
+
+def validate_name_list(value):
+    """
+    Validate a semicolon-separated list of names
+    
+    Empty lists are valid. Flagged are empty items, items without letters,
+    line breaks, and personal names separated by commas instead of
+    semicolons ("Kovács János, Nagy Péter"; "Weisz Mór, kereskedő" and
+    "Kovács János, Budapest, Váci utca 5" are accepted).
+    """
+    if not isinstance(value, str):
+        return f"expected string, got {type(value).__name__}"
+    if not value.strip():
+        return None
+    if "\n" in value:
+        return "contains a line break"
+    for item in value.split(";"):
+        item = item.strip()
+        if not item:
+            return "empty item in the semicolon-separated list"
+        if not any(char.isalpha() for char in item):
+            return f"item without a name: {item!r}"
+        parts = [part.strip() for part in item.split(",")]
+        if sum(1 for part in parts if _looks_like_person_name(part)) > 1:
+            return "names separated by commas instead of semicolons"
+    return None
+
+
+# Field -> validator returning a problem description or None
+FIELD_VALIDATORS = {
+    "cleaned_date": validate_date,
+    "event_classification": validate_event_classification,
+    **{field: validate_name_list for field in NAME_LIST_FIELDS}
+}
+
+# Fields the rules recognize in the date and legal ID cell, and their pre-cleaned columns
+_PRE_CLEANED_FIELDS = {"cleaned_date": PRE_CLEANED_DATE, "legal_identifier": PRE_LEGAL_IDENTIFIER}
+
+
+def _rule_value(field, row_data):
+    """Return the pre-cleaned value of a field, or None if the rules found no plausible one"""
+    fields = row_data if hasattr(row_data, "get") else {}
+    value = fields.get(_PRE_CLEANED_FIELDS[field])
+    if not isinstance(value, str) or not value:
+        return None
+    if field == "cleaned_date" and check_date(value):
+        return None
+    return value
+
+
+def _agrees(field, value, rule_value):
+    """Return True if a model value matches the rule value (identifiers: same numbers)"""
+    if not isinstance(value, str):
+        return False
+    if field == "cleaned_date":
+        return value.strip() == rule_value
+    return _DIGITS.findall(value) == _DIGITS.findall(rule_value)
+
+
+def supported_by_input(field, value, row_data):
+    """
+    Check that a model's date or legal identifier can be read from the input
+
+    The year and day of a date, and every number of an identifier, must
+    occur in the date and legal ID cell, so a value the model made up (or
+    copied from a neighbouring entry) is not accepted over the rules.
+
+    Args:
+        field: "cleaned_date" or "legal_identifier"
+        value: Model value
+        row_data: Input fields of the row
+
+    Returns:
+        bool: True if the value is a valid date/identifier backed by the input
+    """
+    if not isinstance(value, str) or not value.strip():
+        return False
+    fields = row_data if hasattr(row_data, "get") else {}
+    numbers = {int(digits) for digits in _DIGITS.findall(str(fields.get("date_and_legal_id", "")))}
+
+    if field == "cleaned_date":
+        if check_date(value):
+            return False
+        year, _, day = (int(part) for part in CLEANED_DATE.fullmatch(value.strip()).groups())
+        return year in numbers and day in numbers
+
+    identifier_numbers = [int(digits) for digits in _DIGITS.findall(value)]
+    return bool(identifier_numbers) and all(number in numbers for number in identifier_numbers)
+
+
+def precleaned_values(cleaned_data, row_data):
+    """
+    Cross-check the model's date and legal identifier with the rules
+
+    The rule value is used when the model agrees with it (for its exact
+    formatting) and when the model's value is empty, invalid or not backed
+    by the input (see supported_by_input). A valid model value that the
+    input supports is kept even if the rules read something else, so a
+    misparse of the rules can be corrected by the model. Implausible rule
+    dates are ignored.
+
+    Args:
+        cleaned_data: Parsed model output
+        row_data: Input fields of the row (DataHandler.get_input_row)
+
+    Returns:
+        dict: Field -> rule value to write into the result
+    """
+    values = {}
+    for field in _PRE_CLEANED_FIELDS:
+        rule_value = _rule_value(field, row_data)
+        if rule_value is None:
+            continue
+        value = cleaned_data.get(field)
+        if _agrees(field, value, rule_value) or not supported_by_input(field, value, row_data):
+            values[field] = rule_value
+    return values
+
+
+def validate_fields(cleaned_data, row_data=None):
+    """
+    Run the field validators on a cleaned row
+    
+    Fields for which the rules recognized a plausible value are skipped:
+    an invalid model value there is replaced by the rule value (see
+    precleaned_values) and does not reach the output.
+    
+    Args:
+        cleaned_data: Parsed model output
+        row_data: Input fields of the row (DataHandler.get_input_row), optional
+        
+    Returns:
+        dict: Field -> problem description (empty if every field is valid)
+    """
+    problems = {}
+    for field, validator in FIELD_VALIDATORS.items():
+        if field in _PRE_CLEANED_FIELDS and _rule_value(field, row_data) is not None:
+            continue
+        if field not in cleaned_data:
+            problems[field] = "missing"
+            continue
+        problem = validator(cleaned_data[field])
+        if problem:
+            problems[field] = problem
+    return problems
+
+
+def partial_response_format(fields):
+    """
+    Build a structured output format asking for the given fields only
+    
+    Args:
+        fields: Field names (keys of the full schema)
+        
+    Returns:
+        dict: response_format with a reduced copy of the full schema
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "firm_registry_fields",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {field: dict(SCHEMA_PROPERTIES[field]) for field in fields},
+                "required": list(fields),
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+def name_similarity(a, b):
+    """Return the similarity (0-1) of two names, ignoring case and spacing"""
+    a = "".join(str(a).lower().split())
+    b = "".join(str(b).lower().split())
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def check_result(cleaned_data, row_data=None):
+    """
+    Score a cleaned row with local checks
+
+    The checks are: schema validity, a plausible date when the input has
+    one, a non-empty firm name resembling the input's, and agreement with
+    the date and legal identifier recognized by the rules. Only
+    disagreements that would reach the output count: a date or identifier
+    that the rule value replaces anyway (see precleaned_values) is no
+    reason to ask a stronger model, while a valid, input-backed value
+    differing from the rules is, and the stronger model's answer is kept.
+
+    Args:
+        cleaned_data: Parsed model output (before pre-cleaned values are applied)
+        row_data: Input fields of the row (DataHandler.get_input_row), optional
+
+    Returns:
+        dict: Field -> problem description (empty if all checks pass)
+    """
+    schema_problems = check_schema(cleaned_data)
+    problems = dict(schema_problems)
+    fields = row_data if hasattr(row_data, "get") else {}
+
+    if "cleaned_date" not in problems and str(fields.get("date_and_legal_id", "")).strip():
+        date_problem = check_date(cleaned_data["cleaned_date"])
+        if date_problem:
+            problems["cleaned_date"] = date_problem
+
+    input_name = str(fields.get("firm_name", "")).strip()
+    if "cleaned_firm_name" not in problems and input_name:
+        output_name = cleaned_data["cleaned_firm_name"].strip()
+        if not output_name:
+            problems["cleaned_firm_name"] = "empty although the input has a firm name"
+        elif name_similarity(input_name, output_name) < CASCADE_MIN_NAME_SIMILARITY:
+            problems["cleaned_firm_name"] = "does not resemble the input firm name"
+
+    for field in _PRE_CLEANED_FIELDS:
+        rule_value = _rule_value(field, row_data)
+        if rule_value is None or field in schema_problems:
+            continue
+        value = cleaned_data[field]
+        if _agrees(field, value, rule_value) or not supported_by_input(field, value, row_data):
+            # The rule value replaces the model's (see precleaned_values)
+            problems.pop(field, None)
+        else:
+            problems[field] = f"disagrees with the recognized value {rule_value}"
+
+    return problems
@@ -0,0 +1,321 @@
+"""
+Virtual Table Module
+Treeview-based table that only materializes the visible window of rows
+"""
+
+import tkinter as tk
+from bisect import bisect_right
+from tkinter import ttk
+
+# Fallback row height in pixels if the theme does not define one
+DEFAULT_ROW_HEIGHT = 20
+
+
+def _format_cell(value):
+    """Format a cell for display; missing values (None, NaN, NaT, NA) are blank"""
+    try:
+        if value is None or value != value:
+            return ""
+    except TypeError:
+        # pd.NA has no truth value
+        return ""
+    return str(value)
+
+
+class VirtualTable(ttk.Frame):
+    """
+    Scrollable view of a DataFrame with constant cost per update
+
+    The underlying Treeview only holds as many items as fit on screen. Its
+    items are reused as the view scrolls, and a row-index-to-item map makes
+    refresh_row() and select_row() constant time regardless of file size.
+    Row numbers are shown in the tree column, as before. While a workbook
+    is loading, its chunks can be shown as they arrive with append_rows().
+    """
+
+    def __init__(self, parent, on_select=None, **kwargs):
+        """
+        Initialize the table
+
+        Args:
+            parent: Parent widget
+            on_select: Optional callback(row_index) when the user selects a row
+        """
+        super().__init__(parent, **kwargs)
+        self.on_select = on_select
+
+        self.df = None
+        self._chunks = []        # Chunks shown by append_rows, while df is None
+        self._chunk_starts = []  # Row index of each chunk's first row
+        self._chunk_rows = 0
+        self.first_row = 0
+        self.visible_rows = 1
+        self.selected_row = None
+        self._row_to_item = {}
+        self._item_to_row = {}
+        self._rendering = False
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(self, show="tree headings", selectmode="browse")
+        self.scroll_y = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        scroll_x = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=scroll_x.set)
+
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scroll_y.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        scroll_x.grid(row=1, column=0, sticky=(tk.W, tk.E))
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_rows(3))
+        self.tree.bind("<Up>", lambda event: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self._move_selection(-self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self._move_selection(self.visible_rows))
+        self.tree.bind("<Home>", lambda event: self._move_selection(-self.row_count()))
+        self.tree.bind("<End>", lambda event: self._move_selection(self.row_count()))
+
+    def set_dataframe(self, df, keep_view=False):
+        """
+        Show a DataFrame (replaces any previous one)
+
+        Args:
+            df: pandas.DataFrame to display
+            keep_view: Keep the scroll position and selection (e.g. when a
+                loaded workbook replaces the chunks shown while loading)
+        """
+        self.df = df
+        self._chunks = []
+        self._chunk_starts = []
+        self._chunk_rows = 0
+        if not keep_view:
+            self.first_row = 0
+            self.selected_row = None
+
+        self._set_columns(list(df.columns))
+        self._render()
+
+    def append_rows(self, chunk):
+        """
+        Show more rows of a workbook that is still loading
+
+        The first call replaces what was shown; the view keeps its scroll
+        position as chunks are added. Call set_dataframe() with the
+        complete DataFrame once loading has finished.
+
+        Args:
+            chunk: pandas.DataFrame with the next rows (same columns for all chunks)
+        """
+        if not self._chunks:
+            self.df = None
+            self.first_row = 0
+            self.selected_row = None
+            self._set_columns(list(chunk.columns))
+
+        self._chunks.append(chunk)
+        self._chunk_starts.append(self._chunk_rows)
+        self._chunk_rows += len(chunk)
+        self._render()
+
+    def clear(self):
+        """Show nothing"""
+        self.df = None
+        self._chunks = []
+        self._chunk_starts = []
+        self._chunk_rows = 0
+        self.first_row = 0
+        self.selected_row = None
+        self._set_columns([])
+        self._render()
+
+    def _set_columns(self, columns):
+        """Configure the Treeview columns"""
+        self.tree["columns"] = columns
+
+        # Format columns
+        self.tree.column("#0", width=50, minwidth=50, stretch=False)
+        for col in columns:
+            self.tree.column(col, width=150, minwidth=100, stretch=True)
+            self.tree.heading(col, text=col, anchor=tk.W)
+
+    def row_count(self):
+        """Return the number of rows in the table"""
+        if self.df is None:
+            return self._chunk_rows
+        return len(self.df)
+
+    def refresh(self):
+        """Redraw the visible rows (e.g. after rows were appended to the DataFrame)"""
+        self._render()
+
+    def refresh_row(self, row_index):
+        """
+        Redraw one row if it is on screen
+
+        Args:
+            row_index: Row index
+        """
+        item = self._row_to_item.get(row_index)
+        if item is not None:
+            self.tree.item(item, values=self._row_values(row_index))
+
+    def refresh_rows(self, row_indices):
+        """
+        Redraw the rows of a set that are on screen
+
+        Costs at most one redraw per visible row, however many rows changed.
+
+        Args:
+            row_indices: Set of row indices
+        """
+        if len(row_indices) < len(self._row_to_item):
+            for row_index in row_indices:
+                self.refresh_row(row_index)
+        else:
+            for row_index in list(self._row_to_item):
+                if row_index in row_indices:
+                    self.refresh_row(row_index)
+
+    def select_row(self, row_index):
+        """
+        Select a row and scroll it into view
+
+        Args:
+            row_index: Row index
+        """
+        if not 0 <= row_index < self.row_count():
+            return
+
+        self.selected_row = row_index
+        if not self.first_row <= row_index < self.first_row + self.visible_rows:
+            # Keep a little context above the selected row
+            self.first_row = row_index - min(2, self.visible_rows // 2)
+        self._render()
+
+    def get_selected_row(self):
+        """
+        Return the selected row index
+
+        Returns:
+            int: Row index, or None if nothing is selected
+        """
+        return self.selected_row
+
+    def scroll_rows(self, delta):
+        """
+        Scroll the view by a number of rows
+
+        Args:
+            delta: Rows to scroll (negative = up)
+        """
+        self.first_row += delta
+        self._render()
+
+    def _row_values(self, row_index):
+        """Format one row for display"""
+        if self.df is not None:
+            row = self.df.iloc[row_index]
+        else:
+            position = bisect_right(self._chunk_starts, row_index) - 1
+            row = self._chunks[position].iloc[row_index - self._chunk_starts[position]]
+        return [_format_cell(val) for val in row]
+
+    def _render(self):
+        """Fill the item slots with the rows of the current window"""
+        total = self.row_count()
+        self.first_row = max(0, min(self.first_row, total - self.visible_rows))
+        last_row = min(total, self.first_row + self.visible_rows)
+        needed = last_row - self.first_row
+
+        # Grow or shrink the pool of items to the window size
+        items = list(self.tree.get_children())
+        while len(items) < needed:
+            items.append(self.tree.insert("", "end"))
+        for item in items[needed:]:
+            self.tree.delete(item)
+        items = items[:needed]
+
+        self._row_to_item = {}
+        self._item_to_row = {}
+        for offset, item in enumerate(items):
+            row_index = self.first_row + offset
+            self.tree.item(item, text=str(row_index), values=self._row_values(row_index))
+            self._row_to_item[row_index] = item
+            self._item_to_row[item] = row_index
+
+        # Reflect the selection without firing the user callback
+        self._rendering = True
+        try:
+            selected_item = self._row_to_item.get(self.selected_row)
+            if selected_item is not None:
+                self.tree.selection_set(selected_item)
+            else:
+                self.tree.selection_set(())
+        finally:
+            self.after_idle(self._end_render)
+
+        if total:
+            self.scroll_y.set(self.first_row / total, last_row / total)
+        else:
+            self.scroll_y.set(0.0, 1.0)
+
+    def _end_render(self):
+        """Re-enable selection callbacks once the Treeview events have been handled"""
+        self._rendering = False
+
+    def _on_tree_select(self, event=None):
+        """Map a user selection back to the row index"""
+        if self._rendering:
+            return
+        selection = self.tree.selection()
+        if not selection:
+            return
+        row_index = self._item_to_row.get(selection[0])
+        if row_index is None:
+            return
+        self.selected_row = row_index
+        if self.on_select is not None:
+            self.on_select(row_index)
+
+    def _on_resize(self, event):
+        """Recompute how many rows fit on screen"""
+        style = ttk.Style()
+        try:
+            row_height = int(style.lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT)
+        except (tk.TclError, ValueError):
+            row_height = DEFAULT_ROW_HEIGHT
+
+        # Leave room for the heading row
+        visible_rows = max(1, (event.height - row_height) // row_height)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self._render()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        """Handle the vertical scrollbar (moveto / scroll units / scroll pages)"""
+        if action == "moveto":
+            self.first_row = int(float(amount) * self.row_count())
+            self._render()
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_rows(int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        """Scroll three rows per wheel notch"""
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _move_selection(self, delta):
+        """Move the selection with the keyboard"""
+        if self.row_count() == 0:
+            return "break"
+        current = self.selected_row if self.selected_row is not None else self.first_row
+        row_index = max(0, min(self.row_count() - 1, current + delta))
+        self.select_row(row_index)
+        if self.on_select is not None:
+            self.on_select(row_index)
+        return "break"
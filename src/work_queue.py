@@ -0,0 +1,436 @@
+"""
+Work Queue Module
+SQLite-backed row queue with leases, shared by worker processes on several hosts
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from src.config import (
+    WORK_QUEUE_LEASE_SECONDS,
+    WORK_QUEUE_CLAIM_SIZE,
+    WORK_QUEUE_POLL_SECONDS,
+    WORK_QUEUE_WAL,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_PACK_SIZE
+)
+from src.concurrent_processor import ConcurrentProcessor
+
+# Row states
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+def default_worker_id():
+    """Return an id unique to this process: <host>-<pid>"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def workbook_key(file_path):
+    """Return the queue key of a workbook (its file name without extension, as in output/)"""
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+class WorkQueue:
+    """
+    Rows of one or more workbooks, leased to workers in disjoint ranges
+
+    A worker claims a range of pending rows, renews its leases with
+    heartbeat() while it works on them and stores each result with
+    complete(). Leases that are not renewed in time (a crashed or
+    disconnected worker) go back to pending on the next claim, so no row
+    is lost; a row is only handed to a second worker after its lease
+    expired, so API calls are not duplicated while the first one lives.
+    Results stay in the queue until merge_results() writes them into the
+    workbook's progress file.
+    """
+
+    def __init__(self, path, lease_seconds=WORK_QUEUE_LEASE_SECONDS, wal=WORK_QUEUE_WAL):
+        """
+        Open (or create) the queue
+
+        Args:
+            path: Path to the SQLite database file (on a filesystem all workers share)
+            lease_seconds: Seconds a claim stays valid without a heartbeat
+            wal: Use write-ahead logging (only safe when all workers run on one host)
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.path = path
+        self.lease_seconds = lease_seconds
+
+        self._lock = threading.Lock()
+        # isolation_level=None: transactions are opened explicitly (BEGIN IMMEDIATE)
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows ("
+            " workbook TEXT NOT NULL,"
+            " row INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " worker TEXT,"
+            " lease_expires REAL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " result TEXT,"
+            " merged INTEGER NOT NULL DEFAULT 0,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (workbook, row))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_rows_status ON rows (workbook, status, row)"
+        )
+
+    def _transaction(self, func):
+        """Run func(conn) in a write transaction, serialized across threads and processes"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def enqueue(self, workbook, row_indices, retry_failed=False):
+        """
+        Add rows to the queue (rows already queued are left alone)
+
+        Every worker may enqueue the rows it found unprocessed; only the
+        first call inserts them.
+
+        Args:
+            workbook: Workbook key (see workbook_key)
+            row_indices: Row indices to process
+            retry_failed: Put rows whose last attempt failed back to pending
+
+        Returns:
+            int: Number of rows added or put back
+        """
+        now = time.time()
+        rows = [(workbook, int(row_index), PENDING, now) for row_index in row_indices]
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO rows (workbook, row, status, updated_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            if retry_failed:
+                conn.execute(
+                    "UPDATE rows SET status = ?, worker = NULL, lease_expires = NULL,"
+                    " merged = 1, updated_at = ? WHERE workbook = ? AND status = ?",
+                    (PENDING, now, workbook, FAILED)
+                )
+            return conn.total_changes - before
+
+        return self._transaction(insert)
+
+    def claim(self, workbook, worker_id, limit=WORK_QUEUE_CLAIM_SIZE):
+        """
+        Lease the next range of pending rows
+
+        Expired leases are requeued first.
+
+        Args:
+            workbook: Workbook key
+            worker_id: Id of the claiming worker
+            limit: Maximum number of rows
+
+        Returns:
+            list: Leased row indices, in order (empty if nothing is pending)
+        """
+        def lease(conn):
+            now = time.time()
+            self._requeue_expired(conn, now)
+            rows = [row for (row,) in conn.execute(
+                "SELECT row FROM rows WHERE workbook = ? AND status = ? ORDER BY row LIMIT ?",
+                (workbook, PENDING, limit)
+            )]
+            conn.executemany(
+                "UPDATE rows SET status = ?, worker = ?, lease_expires = ?,"
+                " attempts = attempts + 1, updated_at = ? WHERE workbook = ? AND row = ?",
+                [(LEASED, worker_id, now + self.lease_seconds, now, workbook, row) for row in rows]
+            )
+            return rows
+
+        return self._transaction(lease)
+
+    def heartbeat(self, worker_id):
+        """
+        Renew all leases held by a worker
+
+        Returns:
+            int: Number of leases renewed
+        """
+        def renew(conn):
+            now = time.time()
+            return conn.execute(
+                "UPDATE rows SET lease_expires = ?, updated_at = ? WHERE worker = ? AND status = ?",
+                (now + self.lease_seconds, now, worker_id, LEASED)
+            ).rowcount
+
+        return self._transaction(renew)
+
+    def complete(self, workbook, row_index, worker_id, cleaned_data):
+        """
+        Store the result of a row
+
+        The first result wins: a worker whose lease expired and was handed
+        on may still complete the row, and the later result is then ignored.
+
+        Args:
+            workbook: Workbook key
+            row_index: Row index
+            worker_id: Id of the worker
+            cleaned_data: Dictionary with cleaned data
+
+        Returns:
+            bool: True if the result was stored
+        """
+        status = FAILED if "error" in cleaned_data else DONE
+        result = json.dumps(cleaned_data, ensure_ascii=False, default=str)
+
+        def store(conn):
+            return conn.execute(
+                "UPDATE rows SET status = ?, worker = ?, lease_expires = NULL, result = ?,"
+                " merged = 0, updated_at = ? WHERE workbook = ? AND row = ? AND status IN (?, ?)",
+                (status, worker_id, result, time.time(), workbook, int(row_index), PENDING, LEASED)
+            ).rowcount == 1
+
+        return self._transaction(store)
+
+    def release(self, worker_id):
+        """
+        Return a worker's leased rows to pending (on a clean stop)
+
+        Returns:
+            int: Number of rows released
+        """
+        def unlease(conn):
+            return conn.execute(
+                "UPDATE rows SET status = ?, worker = NULL, lease_expires = NULL, updated_at = ?"
+                " WHERE worker = ? AND status = ?",
+                (PENDING, time.time(), worker_id, LEASED)
+            ).rowcount
+
+        return self._transaction(unlease)
+
+    def requeue_expired(self):
+        """
+        Return expired leases to pending
+
+        Returns:
+            int: Number of rows requeued
+        """
+        return self._transaction(lambda conn: self._requeue_expired(conn, time.time()))
+
+    @staticmethod
+    def _requeue_expired(conn, now):
+        """Requeue expired leases (in a transaction)"""
+        return conn.execute(
+            "UPDATE rows SET status = ?, worker = NULL, lease_expires = NULL, updated_at = ?"
+            " WHERE status = ? AND lease_expires < ?",
+            (PENDING, now, LEASED, now)
+        ).rowcount
+
+    def leased_by_others(self, workbook, worker_id):
+        """Return the number of live leases held by other workers"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM rows WHERE workbook = ? AND status = ? AND worker != ?",
+                (workbook, LEASED, worker_id)
+            ).fetchone()[0]
+
+    def counts(self, workbook):
+        """
+        Return the number of rows per state
+
+        Returns:
+            dict: State -> count (pending, leased, done, failed)
+        """
+        with self._lock:
+            found = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM rows WHERE workbook = ? GROUP BY status",
+                (workbook,)
+            ).fetchall())
+        return {status: found.get(status, 0) for status in (PENDING, LEASED, DONE, FAILED)}
+
+    def unmerged_results(self, workbook):
+        """
+        Return the results not yet written into the workbook
+
+        Returns:
+            list: (row_index, cleaned_data) tuples in row order
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row, result FROM rows WHERE workbook = ? AND status IN (?, ?)"
+                " AND merged = 0 ORDER BY row",
+                (workbook, DONE, FAILED)
+            ).fetchall()
+        return [(row, json.loads(result)) for row, result in rows]
+
+    def mark_merged(self, workbook, row_indices):
+        """Record that results were written into the workbook"""
+        rows = [(workbook, int(row_index)) for row_index in row_indices]
+        self._transaction(lambda conn: conn.executemany(
+            "UPDATE rows SET merged = 1 WHERE workbook = ? AND row = ?", rows
+        ))
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def merge_results(queue, data_handler):
+    """
+    Write the queue's results into a loaded workbook
+
+    Results go through DataHandler.update_row, so they are journaled
+    before they are marked as merged; data_handler.close() then writes the
+    progress file.
+
+    Args:
+        queue: WorkQueue
+        data_handler: DataHandler with the workbook loaded (not read-only)
+
+    Returns:
+        int: Number of rows merged
+    """
+    workbook = workbook_key(data_handler.file_path)
+    results = queue.unmerged_results(workbook)
+    for row_index, cleaned_data in results:
+        data_handler.update_row(row_index, cleaned_data)
+    queue.mark_merged(workbook, [row_index for row_index, cleaned_data in results])
+    return len(results)
+
+
+class QueueWorker:
+    """
+    Processes rows leased from a WorkQueue through a ConcurrentProcessor
+
+    The worker stands in for the DataHandler of the engine: rows are read
+    from a read-only DataHandler and results are written to the queue, so
+    any number of workers can share one workbook. A background thread
+    renews the leases while rows are in flight.
+    """
+
+    def __init__(self, llm_processor, data_handler, queue, worker_id=None,
+                 max_workers=DEFAULT_MAX_WORKERS, pack_size=DEFAULT_PACK_SIZE,
+                 claim_size=WORK_QUEUE_CLAIM_SIZE, poll_seconds=WORK_QUEUE_POLL_SECONDS):
+        """
+        Initialize the worker
+
+        Args:
+            llm_processor: LLMProcessor used by the worker threads
+            data_handler: DataHandler with the workbook loaded (read_only=True)
+            queue: WorkQueue shared with the other workers
+            worker_id: Unique id of this worker (default: <host>-<pid>)
+            max_workers: Number of requests kept in flight
+            pack_size: Rows per request; ignored if the processor has a pack_tuner
+            claim_size: Rows leased per claim
+            poll_seconds: Wait before claiming again while other workers hold leases
+        """
+        self.engine = ConcurrentProcessor(llm_processor, self, max_workers, pack_size)
+        self.data_handler = data_handler
+        self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        self.workbook = workbook_key(data_handler.file_path)
+        self.claim_size = claim_size
+        self.poll_seconds = poll_seconds
+        self._heartbeat_stop = threading.Event()
+        # Written by the heartbeat thread only, read once it has joined
+        self.heartbeat_errors = 0
+        self.last_heartbeat_error = None
+
+    def stop(self):
+        """Request stop: queued rows are cancelled, in-flight rows are finished"""
+        self.engine.stop()
+
+    @property
+    def stop_requested(self):
+        """Return True once stop() has been called"""
+        return self.engine.stop_requested
+
+    def run(self, on_row_done=None):
+        """
+        Claim and process rows until the queue has none left
+
+        Rows are processed in rounds: a round ends when nothing is pending
+        and this worker's own rows are done. While other workers still
+        hold leases, the worker waits and claims again, so rows of a worker
+        that died are picked up once their leases expire. Leases still held
+        when the run ends (after a stop) are released.
+
+        Args:
+            on_row_done: Optional callback(row_index, cleaned_data) per finished row
+
+        Returns:
+            dict: Counts of processed and failed rows and of failed lease
+                renewals, and whether the run was stopped
+        """
+        heartbeat = threading.Thread(target=self._keep_leases, name="lease-heartbeat",
+                                     daemon=True)
+        heartbeat.start()
+        stats = {"processed": 0, "failed": 0, "stopped": False, "heartbeat_errors": 0}
+        try:
+            while True:
+                round_stats = self.engine.run(self._iter_claimed(), on_row_done=on_row_done)
+                stats["processed"] += round_stats["processed"]
+                stats["failed"] += round_stats["failed"]
+                if round_stats["stopped"] or self.stop_requested:
+                    stats["stopped"] = True
+                    return stats
+                # Nothing pending: rows leased by others come back if their worker dies
+                if not self.queue.leased_by_others(self.workbook, self.worker_id):
+                    return stats
+                self._heartbeat_stop.wait(self.poll_seconds)
+        finally:
+            self._heartbeat_stop.set()
+            heartbeat.join()
+            stats["heartbeat_errors"] = self.heartbeat_errors
+            self.queue.release(self.worker_id)
+
+    def _iter_claimed(self):
+        """Yield leased rows, claiming the next range until none is pending"""
+        while not self.stop_requested:
+            rows = self.queue.claim(self.workbook, self.worker_id, self.claim_size)
+            if not rows:
+                return
+            yield from rows
+
+    def _keep_leases(self):
+        """Renew this worker's leases a few times per lease period
+
+        A failed renewal is counted in heartbeat_errors rather than raised:
+        the next one may succeed before the leases expire.
+        """
+        interval = self.queue.lease_seconds / 3.0
+        while not self._heartbeat_stop.wait(interval):
+            try:
+                self.queue.heartbeat(self.worker_id)
+            except sqlite3.Error as e:
+                self.heartbeat_errors += 1
+                self.last_heartbeat_error = str(e)
+
+    def get_input_row(self, index):
+        """Get the input fields of a row (see DataHandler.get_input_row)"""
+        return self.data_handler.get_input_row(index)
+
+    def update_row(self, index, cleaned_data):
+        """Store a row's result in the queue"""
+        self.queue.complete(self.workbook, index, self.worker_id, cleaned_data)
+
+    def auto_save(self, force=False):
+        """Results are stored by update_row; nothing to export"""
+        return False
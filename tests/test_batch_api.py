@@ -0,0 +1,70 @@
+"""
+Batch API Tests
+Merging Batch API output into the workbook
+"""
+
+import json
+from src.batch_api import BatchRunner, LocalBatchBackend
+from src.fingerprint import prompt_fingerprint
+from src.llm_processor import LLMProcessor
+
+MODEL = "gpt-4o-mini"
+SNAPSHOT = "gpt-4o-mini-2024-07-18"
+
+
+class Workbook:
+    """Stand-in for a DataHandler that records the merged rows"""
+
+    def __init__(self, output_dir):
+        self.file_path = "input/registry_1899.xlsx"
+        self.output_dir = output_dir
+        self.rows = {}
+
+    def find_unprocessed_rows(self):
+        return [0, 1]
+
+    def get_input_row(self, index):
+        return {"court": "Budapest", "firm_name": f"Firm {index}"}
+
+    def update_row(self, index, cleaned_data):
+        self.rows[index] = cleaned_data
+
+    def auto_save(self, force=False):
+        pass
+
+
+class SnapshotBackend(LocalBatchBackend):
+    """Local backend whose responses name the dated snapshot, like the API's"""
+
+    def _answer(self, request):
+        line = super()._answer(request)
+        line["response"]["body"]["model"] = SNAPSHOT
+        return line
+
+
+def answer(body):
+    return json.dumps({"cleaned_court": "Budapest", "event_classification": 1})
+
+
+def test_merged_rows_record_the_requested_model(tmp_path):
+    processor = LLMProcessor(model=MODEL, client=object())
+    workbook = Workbook(str(tmp_path))
+    runner = BatchRunner(processor, workbook, backend=SnapshotBackend(answer))
+
+    assert runner.run(poll_interval=0) == {"processed": 2, "failed": 0}
+
+    for cleaned_data in workbook.rows.values():
+        assert cleaned_data["model_used"] == MODEL
+        assert cleaned_data["prompt_fingerprint"] == prompt_fingerprint(MODEL)
+
+
+def test_manifest_model_is_used_for_earlier_submissions(tmp_path):
+    processor = LLMProcessor(model=MODEL, client=object())
+    workbook = Workbook(str(tmp_path))
+    runner = BatchRunner(processor, workbook, backend=SnapshotBackend(answer))
+    batch_ids = runner.submit(runner.write_requests())
+
+    processor.model = "gpt-4o"
+    runner.merge_results(batch_ids)
+
+    assert workbook.rows[0]["model_used"] == MODEL
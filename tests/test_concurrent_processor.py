@@ -0,0 +1,50 @@
+"""
+Concurrent Processor Tests
+Stopping a run of the concurrent engine
+"""
+
+from src.concurrent_processor import ConcurrentProcessor
+
+
+class Workbook:
+    """Stand-in for a DataHandler"""
+
+    def __init__(self):
+        self.updated = []
+
+    def get_input_row(self, index):
+        return {"firm_name": f"Firm {index}"}
+
+    def update_row(self, index, cleaned_data):
+        self.updated.append(index)
+
+    def auto_save(self, force=False):
+        return False
+
+
+class EchoProcessor:
+    """Stand-in for an LLMProcessor answering every row"""
+
+    def process_rows_packed(self, rows, submitted_at=None, pack_size=None):
+        return {row_index: {"cleaned_firm_name": row_data["firm_name"]} for row_index, row_data in rows}
+
+
+def test_run_reports_a_stop_requested_before_it_started():
+    workbook = Workbook()
+    engine = ConcurrentProcessor(EchoProcessor(), workbook, max_workers=2, pack_size=1)
+    engine.stop()
+
+    stats = engine.run(range(10))
+
+    assert stats == {"processed": 0, "failed": 0, "stopped": True}
+    assert workbook.updated == []
+
+
+def test_finished_run_is_not_stopped():
+    workbook = Workbook()
+    engine = ConcurrentProcessor(EchoProcessor(), workbook, max_workers=2, pack_size=1)
+
+    stats = engine.run(range(10))
+
+    assert stats == {"processed": 10, "failed": 0, "stopped": False}
+    assert sorted(workbook.updated) == list(range(10))
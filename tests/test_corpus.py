@@ -0,0 +1,28 @@
+"""
+Corpus Tests
+Finding the workbooks of a corpus directory
+"""
+
+import os
+import pytest
+from src.corpus import find_workbooks
+
+
+def touch(directory, *names):
+    for name in names:
+        open(os.path.join(directory, name), "w").close()
+
+
+def test_workbooks_are_found_sorted_without_lock_files(tmp_path):
+    touch(str(tmp_path), "1900.xlsx", "1899.xls", "~$1900.xlsx", "notes.txt")
+
+    paths = find_workbooks(str(tmp_path))
+
+    assert [os.path.basename(path) for path in paths] == ["1899.xls", "1900.xlsx"]
+
+
+def test_workbooks_sharing_a_name_are_refused(tmp_path):
+    touch(str(tmp_path), "1899.xlsx", "1899.xls", "1900.xlsx")
+
+    with pytest.raises(ValueError, match="1899.xls and 1899.xlsx"):
+        find_workbooks(str(tmp_path))
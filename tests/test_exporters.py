@@ -0,0 +1,85 @@
+"""
+Exporter Tests
+Multi-chunk round trips of the NDJSON, Parquet and Arrow exports
+"""
+
+import json
+import os
+import pandas as pd
+import pytest
+from src.exporters import export_chunks
+
+CHUNK_ROWS = 3
+
+
+def workbook_chunks():
+    """Return three chunks of a cleaned workbook; the last one has no results yet"""
+    df = pd.DataFrame({
+        "court": ["Budapest", "Pozsony", "Kolozsvár"] * 3,
+        "firm_name": [f"Firm {number}" for number in range(9)],
+        "cleaned_court": ["Budapest", "Pozsony", "Kolozsvár"] * 2 + [None] * 3,
+        "cleaned_date": ["1899.05.31.", "", "1899.06.02."] * 2 + [None] * 3,
+        "event_classification": [1, 2, None] * 2 + [None] * 3,
+        "cleaning_date": ["2026-10-17T10:00:00"] * 6 + [None] * 3
+    })
+    return [df.iloc[start:start + CHUNK_ROWS] for start in range(0, len(df), CHUNK_ROWS)]
+
+
+def check_rows(df):
+    assert len(df) == 9
+    assert list(df["firm_name"]) == [f"Firm {number}" for number in range(9)]
+    assert df["cleaned_court"].iloc[1] == "Pozsony"
+    assert pd.isna(df["cleaned_court"].iloc[8])
+    assert pd.isna(df["cleaned_date"].iloc[1])
+    assert df["event_classification"].iloc[1] == 2
+    assert pd.isna(df["event_classification"].iloc[2])
+
+
+def test_ndjson_round_trip(tmp_path):
+    path = str(tmp_path / "export.ndjson")
+
+    assert export_chunks(workbook_chunks(), path, "ndjson") == 9
+
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    check_rows(pd.DataFrame(rows))
+    assert not os.path.exists(str(tmp_path / "export.tmp.ndjson"))
+
+
+@pytest.mark.parametrize("output_format", ["parquet", "arrow"])
+def test_pyarrow_round_trip(tmp_path, output_format):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / f"export.{output_format}")
+
+    assert export_chunks(workbook_chunks(), path, output_format) == 9
+
+    if output_format == "parquet":
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_feather(path)
+    check_rows(df)
+    assert not os.path.exists(str(tmp_path / f"export.tmp.{output_format}"))
+
+
+def test_partitioned_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "export")
+
+    assert export_chunks(workbook_chunks(), path, "parquet", partition_by="year") == 9
+
+    assert sorted(os.listdir(path)) == ["year=1899", "year=unknown"]
+    df = pd.read_parquet(path).sort_values("firm_name").reset_index(drop=True)
+    check_rows(df)
+
+
+def test_failed_export_leaves_no_partial_file(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "export.arrow")
+
+    def failing_chunks():
+        yield from workbook_chunks()[:2]
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        export_chunks(failing_chunks(), path, "arrow")
+    assert os.listdir(str(tmp_path)) == []
@@ -0,0 +1,43 @@
+"""
+Fingerprint Tests
+Input fingerprints hashed per workbook and per row
+"""
+
+import pandas as pd
+from src.fingerprint import INPUT_FINGERPRINT, input_fingerprints, input_fingerprint
+from src.llm_processor import LLMProcessor
+
+
+def input_fields():
+    return pd.DataFrame({
+        "court": ["Budapest", "Pozsony"],
+        "date_and_legal_id": ["1899. május 31.", "1899. június 2."],
+        "firm_name": ["Kovács és Társa", "Nagy Péter"],
+        "firm_location": ["Pest", "Pozsony"],
+        "owner": ["Kovács János", ""],
+        "managers": ["", ""],
+        "notes": ["", "törölve"],
+        "source": ["1899/22", "1899/23"],
+        "inherited_fields": ["", ""]
+    })
+
+
+def test_row_fingerprint_matches_the_vectorized_one():
+    fields = input_fields()
+
+    fingerprints = input_fingerprints(fields)
+
+    for index, row in fields.iterrows():
+        assert input_fingerprint(row.to_dict()) == fingerprints[index]
+    assert fingerprints[0] != fingerprints[1]
+
+
+def test_stamp_uses_the_fingerprint_carried_by_the_row():
+    processor = LLMProcessor(client=object())
+    row = input_fields().iloc[0].to_dict()
+    row[INPUT_FINGERPRINT] = "carried"
+    cleaned_data = {"model_used": processor.model}
+
+    processor.stamp_fingerprints(cleaned_data, row)
+
+    assert cleaned_data["input_fingerprint"] == "carried"
@@ -0,0 +1,88 @@
+"""
+Gazetteer Tests
+Snapping of courts, locations and person names to learned spellings
+"""
+
+import pytest
+from src.gazetteer import Gazetteer
+
+
+def accepted(owners="", court="", location="", **fields):
+    """Return an accepted model result with the given entities"""
+    return {
+        "cleaned_court": court,
+        "cleaned_location": location,
+        "cleaned_owners": owners,
+        "cleaned_managers": "",
+        "names_incoming": "",
+        "names_outgoing": "",
+        "model_used": "gpt-4o-mini",
+        **fields
+    }
+
+
+@pytest.fixture
+def gazetteer():
+    gazetteer = Gazetteer(min_count=2)
+    for _ in range(3):
+        gazetteer.learn(
+            accepted(
+                owners="Kohn Adolf; Weisz Móric",
+                court="Budapesti kir. törvényszék",
+                location="Pozsony"
+            ),
+            {"court": "Budapesti kir. törvényszék", "firm_location": "P o z s o n y"}
+        )
+    return gazetteer
+
+
+@pytest.mark.parametrize("name", [
+    "Kohn Adolfné",      # his wife
+    "özv. Kohn Adolfné",  # his widow
+    "ifj. Kohn Adolf",   # his son
+    "id. Kohn Adolf",    # the elder
+    "Weisz Mór",         # a different first name
+    "Kohn Adolff"        # a near spelling is still not snapped
+])
+def test_person_names_are_not_snapped_to_similar_names(gazetteer, name):
+    assert gazetteer.lookup("person", name) in (None, name)
+
+    result = accepted(owners=f"{name}; Weisz Móric")
+    assert gazetteer.snap(result) == 0
+    assert result["cleaned_owners"] == f"{name}; Weisz Móric"
+
+
+def test_person_names_are_snapped_by_key(gazetteer):
+    result = accepted(owners="KOHN  adolf; Weisz Moric")
+    assert gazetteer.snap(result) == 2
+    assert result["cleaned_owners"] == "Kohn Adolf; Weisz Móric"
+
+
+def test_snapped_person_name_does_not_spread(gazetteer):
+    result = accepted(owners="Kohn Adolfné")
+    gazetteer.snap(result)
+    gazetteer.learn(result)
+    assert gazetteer.lookup("person", "Kohn Adolfné") == "Kohn Adolfné"
+    assert gazetteer.lookup("person", "Kohn Adolf") == "Kohn Adolf"
+
+
+def test_courts_and_locations_are_snapped_fuzzily(gazetteer):
+    result = accepted(court="Budapesti kir. torvényszek", location="Pozsouy")
+    assert gazetteer.snap(result, {"court": "", "firm_location": "Pozsouy"}) == 2
+    assert result["cleaned_court"] == "Budapesti kir. törvényszék"
+    assert result["cleaned_location"] == "Pozsony"
+
+
+def test_location_alias_from_input(gazetteer):
+    result = accepted(location="Pressburg")
+    gazetteer.snap(result, {"firm_location": "P o z s o n y"})
+    assert result["cleaned_location"] == "Pozsony"
+
+
+def test_save_and_load(gazetteer, tmp_path):
+    path = tmp_path / "gazetteer.json"
+    gazetteer.save(str(path))
+    loaded = Gazetteer.load(str(path))
+    assert len(loaded) == len(gazetteer)
+    assert loaded.lookup("person", "kohn adolf") == "Kohn Adolf"
+    assert loaded.lookup("person", "Kohn Adolfné") is None
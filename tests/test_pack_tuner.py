@@ -0,0 +1,43 @@
+"""
+Pack Tuner Tests
+Recording packed requests under the pack size they were chunked with
+"""
+
+import json
+from types import SimpleNamespace
+from src.validation import REQUIRED_FIELDS
+from src.llm_processor import LLMProcessor
+from src.pack_tuner import PackSizeTuner
+
+
+class PackedClient:
+    """Stand-in for the OpenAI client, answering every entry of a packed request"""
+
+    def __init__(self, tokens=300):
+        self.tokens = tokens
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **request_body):
+        prompt = request_body["messages"][-1]["content"]
+        entries = [
+            dict({field: "" for field in REQUIRED_FIELDS}, row_id=row_id, event_classification=1)
+            for row_id in range(100) if f"Firm {row_id}\n" in prompt
+        ]
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps({"entries": entries})))],
+            usage=SimpleNamespace(total_tokens=self.tokens)
+        )
+
+
+def rows(indices):
+    return [(index, {"firm_name": f"Firm {index}", "notes": "Bejegyeztetik"}) for index in indices]
+
+
+def test_short_last_chunk_is_recorded_under_the_pack_size():
+    processor = LLMProcessor(client=PackedClient())
+    processor.pack_tuner = PackSizeTuner(initial_size=8)
+
+    results = processor.process_rows_packed(rows(range(3)), pack_size=8)
+
+    assert sorted(results) == [0, 1, 2]
+    assert [(entry["pack_size"], entry["rows"]) for entry in processor.pack_tuner.summary()] == [(8, 3)]
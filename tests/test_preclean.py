@@ -0,0 +1,90 @@
+"""
+Pre-cleaning Tests
+Ditto marks, text normalization and rows without firm content
+"""
+
+import pandas as pd
+import pytest
+from src.config import OUTPUT_COLUMNS
+from src.preclean import (
+    INHERITED_FIELDS,
+    PRE_RESOLVED,
+    input_fields_frame,
+    normalize_text,
+    preclean_frame,
+    resolve_ditto_marks
+)
+from src.row_status import RowStatusIndex, SKIPPED, PENDING
+
+COURT = "Budapesti kir. törvényszék"
+
+
+def fields(courts):
+    """Return an input fields frame with the given court cells"""
+    return pd.DataFrame({"court": courts, "firm_location": [""] * len(courts)}, dtype=object)
+
+
+@pytest.mark.parametrize("mark", ["»", "ii", "ff", "„"])
+def test_court_ditto_marks_take_the_court_above(mark):
+    frame = fields([COURT, mark])
+
+    resolve_ditto_marks(frame, columns=["court"], blank_court_is_ditto=False)
+
+    assert list(frame["court"]) == [COURT, COURT]
+    assert list(frame[INHERITED_FIELDS]) == ["", "court"]
+
+
+@pytest.mark.parametrize("dash", ["-", "–", "—", "--"])
+def test_court_dashes_are_not_ditto_marks(dash):
+    frame = fields([COURT, dash])
+
+    resolve_ditto_marks(frame, columns=["court"], blank_court_is_ditto=False)
+
+    assert list(frame["court"]) == [COURT, dash]
+    assert list(frame[INHERITED_FIELDS]) == ["", ""]
+
+
+def test_letter_spaced_firm_names_and_locations_are_collapsed():
+    df = pd.DataFrame({
+        "court": [COURT],
+        "date_and_legal_id": [""],
+        "firm_name": ["K o h n  Adolf"],
+        "firm_location": ["P o z s o n y"],
+        "owner": [""],
+        "managers": [""],
+        "ignored": [""],
+        "notes": [""],
+        "source": ["1899.pdf"]
+    })
+
+    frame = input_fields_frame(df)
+
+    assert frame.loc[0, "firm_location"] == "Pozsony"
+    assert frame.loc[0, "firm_name"] == "Kohn Adolf"
+
+
+def test_one_letter_words_in_notes_and_names_are_kept():
+    notes = pd.Series(["Bejegyeztetik a s a cég", "Kohn és Weisz s e társa"])
+
+    assert list(normalize_text(notes)) == list(notes)
+
+
+def test_rows_without_firm_content_are_skipped_and_pre_resolved():
+    df = pd.DataFrame({
+        "court": [COURT, COURT],
+        "date_and_legal_id": ["1899. május 31. 3476. sz. 81/3", "1899. május 31."],
+        "firm_name": ["  ", "Kohn Adolf"],
+        "firm_location": [None, "Pozsony"],
+        "owner": ["", ""],
+        "managers": ["", ""],
+        "ignored": ["", ""],
+        "notes": ["\n", ""],
+        "source": ["1899.pdf", "1899.pdf"]
+    })
+    for column in OUTPUT_COLUMNS:
+        df[column] = None
+
+    statuses = RowStatusIndex.from_dataframe(df)
+
+    assert list(preclean_frame(df)[PRE_RESOLVED]) == [True, False]
+    assert [statuses.get(0), statuses.get(1)] == [SKIPPED, PENDING]
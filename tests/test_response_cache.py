@@ -0,0 +1,65 @@
+"""
+Response Cache Tests
+Lookups, buffered access times and least-recently-used eviction
+"""
+
+import pytest
+from src import response_cache
+from src.response_cache import ResponseCache
+
+
+class Clock:
+    """Stand-in for the time module, one second later on every call"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        self.now += 1
+        return self.now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    yield cache
+    cache.close()
+
+
+def test_hits_do_not_write_to_the_database(cache):
+    cache.put("a", "answer")
+    changes = cache._conn.total_changes
+
+    assert cache.get("a") == "answer"
+    assert cache.get("missing") is None
+    assert cache._conn.total_changes == changes
+
+
+def test_buffered_access_times_decide_eviction(cache, monkeypatch):
+    monkeypatch.setattr(response_cache, "time", Clock())
+    cache.put("old", "1")
+    cache.put("new", "2")
+    cache.get("old")            # buffered: "old" is now the most recently used
+
+    cache.put("newest", "3")    # over max_entries: evicts "new"
+    cache.evict()
+
+    assert cache.get("old") == "1"
+    assert cache.get("new") is None
+    assert cache.get("newest") == "3"
+
+
+def test_access_times_are_flushed_in_batches(cache, monkeypatch):
+    monkeypatch.setattr(response_cache, "ACCESS_FLUSH_INTERVAL", 3)
+    cache.max_entries = 10
+    for key in ("a", "b", "c"):
+        cache.put(key, key)
+    changes = cache._conn.total_changes
+
+    cache.get("a")
+    cache.get("b")
+    assert cache._conn.total_changes == changes
+
+    cache.get("c")
+    assert cache._conn.total_changes == changes + 3
+    assert not cache._pending_access
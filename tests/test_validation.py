@@ -0,0 +1,208 @@
+"""
+Validation Tests
+Field validators, partial re-asks and cross-checking the model's date and
+legal identifier with the pre-cleaning rules
+"""
+
+import json
+from types import SimpleNamespace
+import pytest
+from src.llm_processor import LLMProcessor
+from src.preclean import PRE_CLEANED_DATE, PRE_LEGAL_IDENTIFIER
+from src.validation import (
+    precleaned_values,
+    check_result,
+    validate_fields,
+    validate_name_list,
+    partial_response_format
+)
+
+
+def input_row(date_and_legal_id="1899. május 31. 3476. sz. 81/3",
+              rule_date="1899.05.31.", rule_identifier="3476. sz. 81/3"):
+    """Return the input fields of a row as DataHandler.get_input_row does"""
+    return {
+        "court": "Budapesti kir. törvényszék",
+        "date_and_legal_id": date_and_legal_id,
+        "firm_name": "Kohn Adolf",
+        "firm_location": "Pozsony",
+        PRE_CLEANED_DATE: rule_date,
+        PRE_LEGAL_IDENTIFIER: rule_identifier
+    }
+
+
+def model_output(**fields):
+    """Return a schema-valid model output for input_row()"""
+    cleaned_data = {
+        "cleaned_court": "Budapesti kir. törvényszék",
+        "cleaned_date": "1899.05.31.",
+        "legal_identifier": "3476. sz. 81/3",
+        "cleaned_firm_name": "Kohn Adolf",
+        "cleaned_location": "Pozsony",
+        "cleaned_owners": "Kohn Adolf",
+        "cleaned_managers": "",
+        "cleaned_notes_hu": "",
+        "notes_english": "",
+        "event_classification": 1,
+        "names_incoming": "",
+        "names_outgoing": "",
+        "gazette_references": ""
+    }
+    cleaned_data.update(fields)
+    return cleaned_data
+
+
+def test_model_agreeing_with_rules_gets_the_rule_formatting():
+    cleaned_data = model_output(legal_identifier="3476 sz 81/3")
+    row = input_row()
+
+    assert precleaned_values(cleaned_data, row) == {
+        "cleaned_date": "1899.05.31.",
+        "legal_identifier": "3476. sz. 81/3"
+    }
+    assert check_result(cleaned_data, row) == {}
+
+
+@pytest.mark.parametrize("date, identifier", [
+    ("", ""),                                # empty
+    ("1899-05-31", "sz."),                   # invalid
+    ("1899.06.15.", "9999. sz. 1/1"),        # valid, but not in the input
+    ("1799.05.31.", "3476. sz. 81/3 2/2")    # implausible year, extra number
+])
+def test_empty_invalid_or_unsupported_model_values_are_replaced(date, identifier):
+    cleaned_data = model_output(cleaned_date=date, legal_identifier=identifier)
+    row = input_row()
+
+    assert precleaned_values(cleaned_data, row) == {
+        "cleaned_date": "1899.05.31.",
+        "legal_identifier": "3476. sz. 81/3"
+    }
+    # Replaced anyway, so no reason to escalate
+    assert check_result(cleaned_data, row) == {}
+
+
+def test_input_backed_model_date_differing_from_rules_is_kept_and_flagged():
+    # The rules read the first date; the registration date is the second one
+    row = input_row("1899. május 31. 3476. sz. 81/3, bejegyezve 1899. június 3.")
+    cleaned_data = model_output(cleaned_date="1899.06.03.")
+
+    assert precleaned_values(cleaned_data, row) == {"legal_identifier": "3476. sz. 81/3"}
+    assert check_result(cleaned_data, row) == {
+        "cleaned_date": "disagrees with the recognized value 1899.05.31."
+    }
+
+
+def test_input_backed_model_identifier_differing_from_rules_is_kept_and_flagged():
+    row = input_row("1899. május 31. 3476. sz. 81/3 helyesen 3467. sz. 81/3")
+    cleaned_data = model_output(legal_identifier="3467. sz. 81/3")
+
+    assert precleaned_values(cleaned_data, row) == {"cleaned_date": "1899.05.31."}
+    assert check_result(cleaned_data, row) == {
+        "legal_identifier": "disagrees with the recognized value 3476. sz. 81/3"
+    }
+
+
+def test_implausible_rule_date_is_ignored():
+    row = input_row("1699. május 31. 3476. sz. 81/3", rule_date="1699.05.31.")
+    cleaned_data = model_output(cleaned_date="")
+
+    assert "cleaned_date" not in precleaned_values(cleaned_data, row)
+    assert check_result(cleaned_data, row)["cleaned_date"] == "not in YYYY.MM.DD. format"
+
+
+def test_schema_problems_are_not_hidden_by_rule_values():
+    cleaned_data = model_output()
+    del cleaned_data["legal_identifier"]
+
+    assert check_result(cleaned_data, input_row()) == {"legal_identifier": "missing"}
+
+
+@pytest.mark.parametrize("names", [
+    "",
+    "Kovács János",
+    "Kovács János; Nagy Péter",
+    "Weisz Mór, kereskedő",
+    "Kovács János, Budapest, Váci utca 5",
+    "ifj. Kohn Adolf, Pozsony"
+])
+def test_valid_name_lists(names):
+    assert validate_name_list(names) is None
+
+
+@pytest.mark.parametrize("names, problem", [
+    ("Kovács János, Nagy Péter", "names separated by commas instead of semicolons"),
+    ("ifj. Kohn Adolf, özv. Weisz Mórné", "names separated by commas instead of semicolons"),
+    ("Kovács János;; Nagy Péter", "empty item in the semicolon-separated list"),
+    ("Kovács János\nNagy Péter", "contains a line break"),
+    ("Kovács János; 12", "item without a name: '12'"),
+    (None, "expected string, got NoneType")
+])
+def test_invalid_name_lists(names, problem):
+    assert validate_name_list(names) == problem
+
+
+def test_validate_fields_reports_failing_fields():
+    cleaned_data = model_output(
+        cleaned_date="31/05/1899",
+        event_classification=9,
+        cleaned_owners="Kovács János, Nagy Péter"
+    )
+    del cleaned_data["names_outgoing"]
+
+    assert set(validate_fields(cleaned_data)) == {
+        "cleaned_date", "event_classification", "cleaned_owners", "names_outgoing"
+    }
+
+
+def test_validate_fields_skips_fields_the_rules_recognized():
+    cleaned_data = model_output(cleaned_date="31/05/1899")
+
+    assert validate_fields(cleaned_data, input_row()) == {}
+
+
+def test_partial_response_format_asks_for_the_given_fields_only():
+    schema = partial_response_format(["cleaned_date", "event_classification"])["json_schema"]["schema"]
+
+    assert schema["required"] == ["cleaned_date", "event_classification"]
+    assert set(schema["properties"]) == {"cleaned_date", "event_classification"}
+    assert schema["additionalProperties"] is False
+
+
+class FakeClient:
+    """Stand-in for the OpenAI client, answering with the given JSON objects in turn"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **request_body):
+        self.requests.append(request_body)
+        content = json.dumps(self.answers.pop(0), ensure_ascii=False)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_reask_replaces_only_the_failing_fields():
+    client = FakeClient({"cleaned_owners": "Kovács János; Nagy Péter", "event_classification": 12})
+    processor = LLMProcessor(client=client)
+    cleaned_data = model_output(event_classification=9, cleaned_owners="Kovács János, Nagy Péter")
+    row = input_row(rule_date="", rule_identifier="")
+
+    processor._reask_invalid_fields(cleaned_data, row, "gpt-4o-mini")
+
+    schema = client.requests[0]["response_format"]["json_schema"]["schema"]
+    assert set(schema["required"]) == {"cleaned_owners", "event_classification"}
+    assert cleaned_data["cleaned_owners"] == "Kovács János; Nagy Péter"
+    assert cleaned_data["event_classification"] == 9      # still invalid: kept
+    assert processor.reask_stats == {"rows": 1, "repaired": 0}
+
+
+def test_valid_row_is_not_reasked():
+    client = FakeClient()
+    processor = LLMProcessor(client=client)
+    cleaned_data = model_output(cleaned_owners="Kovács János, Budapest, Váci utca 5")
+
+    processor._reask_invalid_fields(cleaned_data, input_row(), "gpt-4o-mini")
+
+    assert client.requests == []
+    assert processor.reask_stats == {"rows": 0, "repaired": 0}
@@ -0,0 +1,139 @@
+"""
+Work Queue Tests
+Leases, hand-over and results of the SQLite row queue
+"""
+
+import sqlite3
+import pytest
+from src import work_queue
+from src.work_queue import WorkQueue, QueueWorker
+
+WORKBOOK = "registry_1899"
+
+
+class Clock:
+    """Stand-in for the time module, advanced by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(work_queue, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), lease_seconds=60)
+    queue.enqueue(WORKBOOK, range(10))
+    yield queue
+    queue.close()
+
+
+def test_enqueue_adds_rows_once(queue):
+    assert queue.enqueue(WORKBOOK, range(12)) == 2
+    assert queue.counts(WORKBOOK)["pending"] == 12
+
+
+def test_workers_claim_disjoint_ranges(queue):
+    first = queue.claim(WORKBOOK, "a", limit=4)
+    second = queue.claim(WORKBOOK, "b", limit=4)
+
+    assert first == [0, 1, 2, 3]
+    assert second == [4, 5, 6, 7]
+    assert queue.counts(WORKBOOK) == {"pending": 2, "leased": 8, "done": 0, "failed": 0}
+    assert queue.leased_by_others(WORKBOOK, "a") == 4
+
+
+def test_expired_lease_is_handed_on(queue, clock):
+    queue.claim(WORKBOOK, "a", limit=4)
+    clock.now += 30
+    queue.heartbeat("a")
+
+    # Renewed 30 s ago: still a's
+    clock.now += 59
+    assert queue.claim(WORKBOOK, "b", limit=4) == [4, 5, 6, 7]
+
+    # Not renewed for a whole lease period: handed on
+    clock.now += 2
+    assert queue.claim(WORKBOOK, "c", limit=4) == [0, 1, 2, 3]
+
+
+def test_late_complete_is_ignored(queue, clock):
+    queue.claim(WORKBOOK, "a", limit=1)
+    clock.now += 61
+    assert queue.claim(WORKBOOK, "b", limit=1) == [0]
+
+    assert queue.complete(WORKBOOK, 0, "b", {"cleaned_firm_name": "Kohn Adolf"})
+    assert not queue.complete(WORKBOOK, 0, "a", {"cleaned_firm_name": "Kohn A."})
+    assert queue.unmerged_results(WORKBOOK) == [(0, {"cleaned_firm_name": "Kohn Adolf"})]
+
+
+def test_release_returns_leased_rows(queue):
+    queue.claim(WORKBOOK, "a", limit=4)
+    queue.complete(WORKBOOK, 0, "a", {"cleaned_firm_name": "Kohn Adolf"})
+
+    assert queue.release("a") == 3
+    assert queue.claim(WORKBOOK, "b", limit=4) == [1, 2, 3, 4]
+
+
+def test_failed_rows_return_to_pending(queue):
+    queue.claim(WORKBOOK, "a", limit=2)
+    queue.complete(WORKBOOK, 0, "a", {"error": "timeout"})
+    queue.complete(WORKBOOK, 1, "a", {"cleaned_firm_name": "Kohn Adolf"})
+    assert queue.counts(WORKBOOK)["failed"] == 1
+
+    # A plain enqueue leaves failed rows alone
+    queue.enqueue(WORKBOOK, range(10))
+    assert queue.counts(WORKBOOK)["failed"] == 1
+
+    assert queue.enqueue(WORKBOOK, range(10), retry_failed=True) == 1
+    assert queue.counts(WORKBOOK) == {"pending": 9, "leased": 0, "done": 1, "failed": 0}
+    assert queue.claim(WORKBOOK, "b", limit=1) == [0]
+
+
+class Workbook:
+    """Stand-in for a read-only DataHandler"""
+
+    file_path = f"input/{WORKBOOK}.xlsx"
+
+    def get_input_row(self, index):
+        return {"firm_name": f"Firm {index}"}
+
+
+class FailingProcessor:
+    """Stand-in for an LLMProcessor whose requests fail"""
+
+    def process_rows_packed(self, rows, submitted_at=None, pack_size=None):
+        raise RuntimeError("connection reset")
+
+
+def test_worker_completes_rows_of_failed_requests(queue):
+    worker = QueueWorker(FailingProcessor(), Workbook(), queue, worker_id="a",
+                         max_workers=2, pack_size=3)
+    stats = worker.run()
+
+    assert stats == {"processed": 0, "failed": 10, "stopped": False, "heartbeat_errors": 0}
+    assert queue.counts(WORKBOOK) == {"pending": 0, "leased": 0, "done": 0, "failed": 10}
+    assert queue.unmerged_results(WORKBOOK)[0] == (0, {"error": "connection reset"})
+
+
+def test_worker_counts_failed_lease_renewals(queue, monkeypatch):
+    worker = QueueWorker(FailingProcessor(), Workbook(), queue, worker_id="a")
+    queue.lease_seconds = 0.03
+
+    def locked_heartbeat(worker_id):
+        worker._heartbeat_stop.set()
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(queue, "heartbeat", locked_heartbeat)
+    worker._keep_leases()
+
+    assert worker.heartbeat_errors == 1
+    assert worker.last_heartbeat_error == "database is locked"